@@ -0,0 +1,155 @@
+"""
+Compares the decoders and encoders of the generated C++ headers on the `test_cases` corpora.
+
+For every `test_cases/*/schema.json`, generates the C++ header, draws sample
+records from the schema with Hypothesis and compiles a driver (`-O2`) that
+reports messages per second of
+
+* decoding with the DOM path, `nlohmann::json::parse(text).get<T>()`, against
+  `rgs_runtime::decode<T>(text)`, which fills the struct straight from the input
+  bytes, and
+* encoding with `nlohmann::json(message).dump()` against `write_json(buffer, message)`,
+  which appends to a reused `std::string` without building a `nlohmann::json`.
+
+The driver first checks that both decoders and both encoders agree.
+
+Usage:
+    JSON_INCLUDE_DIR=/path/to/nlohmann/include \\
+        poetry run python benchmarks/bench_cpp_codec.py --records 200 --repeat 200
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_python_codec import draw_samples
+from rgs_types.parser import parse_schema_file
+from rgs_types.generators.cpp import CppGenerator
+from rgs_types.generators.utils import pascal_case, snake_case
+
+DRIVER = """
+#include "{header}"
+#include <chrono>
+#include <fstream>
+#include <iostream>
+
+using Message = {qualified_name};
+
+template <typename Items, typename F>
+double seconds(int repeat, const Items& items, F&& run) {{
+    auto start = std::chrono::steady_clock::now();
+    for (int i = 0; i < repeat; ++i) {{
+        for (const auto& item : items) {{
+            auto result = run(item);
+            // Keep the optimizer from dropping the result
+            asm volatile("" : : "g"(&result) : "memory");
+        }}
+    }}
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}}
+
+int main(int argc, char** argv) {{
+    std::ifstream f(argv[1]);
+    int repeat = std::atoi(argv[2]);
+    std::vector<std::string> lines;
+    std::size_t bytes = 0;
+    for (std::string line; std::getline(f, line);) {{
+        bytes += line.size();
+        lines.push_back(line);
+    }}
+    auto dom = [](const std::string& line) {{ return nlohmann::json::parse(line).get<Message>(); }};
+    auto streaming = [](const std::string& line) {{ return rgs_runtime::decode<Message>(line); }};
+    std::vector<Message> messages;
+    for (const std::string& line : lines) {{
+        nlohmann::json expected = dom(line);
+        messages.push_back(streaming(line));
+        if (nlohmann::json(messages.back()) != expected || nlohmann::json::parse(rgs_runtime::encode(messages.back())) != expected) {{
+            std::cerr << "codecs differ on " << line << std::endl;
+            return 1;
+        }}
+    }}
+    auto dump = [](const Message& message) {{ return nlohmann::json(message).dump(); }};
+    std::string buffer;
+    auto write = [&buffer](const Message& message) {{
+        buffer.clear();
+        write_json(buffer, message);
+        return buffer.size();
+    }};
+    std::cout << bytes << " " << seconds(repeat, lines, dom) << " " << seconds(repeat, lines, streaming)
+              << " " << seconds(repeat, messages, dump) << " " << seconds(repeat, messages, write) << std::endl;
+    return 0;
+}}
+"""
+
+def qualified_name(schema) -> str:
+    # Same namespace rules as CppGenerator.generate
+    namespace = schema.cpp_namespace
+    if not namespace and schema.id:
+        namespace = snake_case(schema.id.split("/")[-1].split(".")[0])
+    name = pascal_case(schema.title or "GeneratedModel")
+    return f"{namespace}::{name}" if namespace else name
+
+def build_driver(schema, out_dir: Path, compiler: str) -> Path:
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = CppGenerator(schema, out_dir)
+        generator.generate()
+    header = next(iter(generator.outputs))
+    (out_dir / "driver.cpp").write_text(DRIVER.format(header=header.name, qualified_name=qualified_name(schema)))
+    include_paths = ["-I/usr/include", "-I/usr/local/include"]
+    if "JSON_INCLUDE_DIR" in os.environ:
+        include_paths.append(f"-I{os.environ['JSON_INCLUDE_DIR']}")
+    subprocess.run(
+        [compiler, "-std=c++17", "-O2", "-DNDEBUG"] + include_paths + ["driver.cpp", "-o", "driver"],
+        cwd=out_dir, check=True,
+    )
+    return out_dir / "driver"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200, help="Sample records drawn per schema.")
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the records per measurement.")
+    parser.add_argument("--compiler", default=shutil.which("clang++") or shutil.which("g++"), help="C++17 compiler.")
+    args = parser.parse_args()
+    if not args.compiler:
+        sys.exit("No C++ compiler found; pass --compiler.")
+
+    print(
+        f"{'test case':<22}{'records':>8}{'avg B':>7}{'DOM msg/s':>12}{'stream msg/s':>14}{'speedup':>9}"
+        f"{'dump msg/s':>13}{'write msg/s':>13}{'speedup':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, schema_path in enumerate(sorted((ROOT / "test_cases").glob("*/schema.json"))):
+            schema = parse_schema_file(schema_path)
+            try:
+                records = draw_samples(schema, args.records)
+            except Exception as e:
+                print(f"{schema_path.parent.name:<22} skipped: cannot draw samples ({type(e).__name__})")
+                continue
+
+            out_dir = Path(tmp) / str(index)
+            driver = build_driver(schema, out_dir, args.compiler)
+            (out_dir / "records.jsonl").write_text("\n".join(json.dumps(record) for record in records))
+            result = subprocess.run(
+                [str(driver), "records.jsonl", str(args.repeat)], cwd=out_dir, check=True, capture_output=True, text=True,
+            )
+            size, dom, streaming, dump, write = result.stdout.split()
+            dom, streaming, dump, write = float(dom), float(streaming), float(dump), float(write)
+            count = len(records) * args.repeat
+            print(
+                f"{schema_path.parent.name:<22}{len(records):>8}{int(size) / len(records):>7.0f}"
+                f"{count / dom:>12,.0f}{count / streaming:>14,.0f}{dom / streaming:>8.1f}x"
+                f"{count / dump:>13,.0f}{count / write:>13,.0f}{dump / write:>8.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Measures the import time of the rgs-gen CLI with `python -X importtime` and checks it
+against the budget tracked in `benchmarks/import_budget.json`.
+
+Imports `rgs_types.main` the way the `rgs-gen` entry point does for non-interactive
+output (rich blocked), takes the median over several fresh interpreters and reports
+the total, the share of rgs_types itself (everything except typer/click) and the
+slowest modules. Exits with status 1 if a budget is exceeded or if a module that
+must be loaded lazily (pydantic, jinja2, rich, the generators) is imported.
+
+Usage:
+    poetry run python benchmarks/bench_import.py --runs 15
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARK_DIR.parent / "src"
+BUDGET_FILE = BENCHMARK_DIR / "import_budget.json"
+
+# The CLI framework, whose cost is outside our control (typer imports click itself)
+FRAMEWORK_MODULES = ("typer",)
+LAZY_MODULES = (
+    "rich", "pydantic", "jinja2",
+    "rgs_types.generators.cpp", "rgs_types.generators.python", "rgs_types.generators.typescript",
+)
+
+PROBE = (
+    "import sys; sys.modules['rich'] = None; import rgs_types.main; "
+    "print(','.join(m for m in {lazy!r} if sys.modules.get(m)))"
+)
+
+def parse_importtime(stderr: str):
+    """Returns {module: (self_us, cumulative_us)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure_once():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(lazy=LAZY_MODULES)],
+        capture_output=True, text=True, check=True,
+        env={"PYTHONPATH": str(SRC_DIR), "PATH": ""},
+    )
+    modules = parse_importtime(result.stderr)
+    total = modules["rgs_types.main"][1]
+    framework = sum(modules[name][1] for name in FRAMEWORK_MODULES if name in modules)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total / 1000, (total - framework) / 1000, modules, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=9, help="Number of fresh interpreters to measure.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list.")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text())
+    totals, owns = [], []
+    for _ in range(args.runs):
+        total, own, modules, loaded = measure_once()
+        totals.append(total)
+        owns.append(own)
+
+    total, own = statistics.median(totals), statistics.median(owns)
+    print(f"rgs_types.main import (median of {args.runs} runs)")
+    print(f"  total:                 {total:8.1f} ms (budget {budget['total_ms']} ms)")
+    print(f"  excluding typer/click: {own:8.1f} ms (budget {budget['own_ms']} ms)")
+    print(f"  slowest modules (self time, last run):")
+    for name, (self_us, _) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: modules that must load lazily were imported: {', '.join(loaded)}")
+        failed = True
+    if total > budget["total_ms"] or own > budget["own_ms"]:
+        print("FAIL: import time over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
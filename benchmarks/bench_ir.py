@@ -0,0 +1,195 @@
+"""
+Compares the pydantic model tree against the compact SchemaNode IR.
+
+Builds a synthetic bundle with many `$defs`, then reports parse/IR-build wall time and
+the retained memory of each representation, and the wall time and peak RSS of a full
+parse+generate run (all languages) of:
+
+* the baseline: the generators from before the IR, walking the pydantic models. Their
+  sources are taken from `--baseline-rev` (by default the parent of the commit that
+  added `rgs_types/ir.py`) with `git archive`, so this needs a git checkout;
+* the current generators, which walk the IR and drop the pydantic tree once it is built.
+
+Usage:
+    poetry run python benchmarks/bench_ir.py --defs 40000
+    poetry run python benchmarks/bench_ir.py --defs 40000 --baseline-rev v0.4.0
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from rgs_types.parser import parse_schema_file
+from rgs_types.ir import IRBuilder, build_ir
+from rgs_types.generators.base import SchemaContext
+from rgs_types.generators.python import PythonGenerator
+from rgs_types.generators.cpp import CppGenerator
+from rgs_types.generators.typescript import TypeScriptGenerator
+
+GENERATORS = (PythonGenerator, CppGenerator, TypeScriptGenerator)
+
+def make_bundle(defs: int) -> dict:
+    definitions = {}
+    for i in range(defs):
+        definitions[f"type{i}"] = {
+            "title": f"Type{i}",
+            "description": "A generated definition used for benchmarking.",
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "description": "Identifier", "minimum": 0},
+                "name": {"type": "string", "description": "Display name", "maxLength": 64},
+                "score": {"type": "number", "default": 0.0},
+                "enabled": {"type": "boolean", "default": True},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "level": {"type": "string", "enum": ["low", "medium", "high"]},
+                "position": {
+                    "title": "Position",
+                    "type": "object",
+                    "properties": {"x": {"type": "number"}, "y": {"type": "number"}},
+                    "required": ["x", "y"],
+                },
+                # Binary-tree shaped refs keep generator recursion depth logarithmic
+                "parent": {"$ref": f"#/$defs/type{i // 2}"},
+            },
+            "required": ["id", "name"],
+        }
+    return {
+        "title": "Bundle",
+        "type": "object",
+        "properties": {f"field{i}": {"$ref": f"#/$defs/type{i}"} for i in range(defs)},
+        "$defs": definitions,
+    }
+
+def retained_bytes(factory):
+    """Returns (object, bytes still allocated once `factory` returns)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = factory()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+# Parse + generate with the pre-IR generators, which take the pydantic model and an
+# output directory. Run with the baseline sources first on sys.path.
+BASELINE_PIPELINE = """
+import json, resource, sys, time
+from pathlib import Path
+from rgs_types.parser import parse_schema_file
+from rgs_types.generators.python import PythonGenerator
+from rgs_types.generators.cpp import CppGenerator
+from rgs_types.generators.typescript import TypeScriptGenerator
+start = time.perf_counter()
+model = parse_schema_file(Path(sys.argv[1]))
+for generator_cls in (PythonGenerator, CppGenerator, TypeScriptGenerator):
+    generator_cls(model, Path(sys.argv[2])).generate()
+elapsed = time.perf_counter() - start
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_kb / 1024}))
+"""
+
+def run_pipeline(schema_path: Path, out_dir: Path):
+    """Parse + generate every language through the IR; prints wall time and peak RSS as JSON."""
+    start = time.perf_counter()
+    model = parse_schema_file(schema_path)
+    schema = build_ir(model)
+    del model
+    gc.collect()
+    context = SchemaContext(schema)
+    for generator_cls in GENERATORS:
+        generator_cls(schema, out_dir, context=context).generate()
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_kb / 1024}))
+
+def git(*args: str) -> bytes:
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True).stdout
+
+def default_baseline_rev() -> str:
+    """The revision just before the IR was introduced."""
+    added = git("log", "--diff-filter=A", "--format=%H", "--", "src/rgs_types/ir.py").split()
+    if not added:
+        sys.exit("src/rgs_types/ir.py has no history; pass --baseline-rev")
+    return added[-1].decode() + "^"
+
+def extract_sources(rev: str, target: Path) -> Path:
+    """Writes the `src` tree of `rev` below `target` and returns it."""
+    with tarfile.open(fileobj=io.BytesIO(git("archive", rev, "src"))) as archive:
+        archive.extractall(target)
+    return target / "src"
+
+def measure(command, out_dir: Path, env=None) -> dict:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    result = subprocess.run(command, check=True, capture_output=True, text=True, env=env)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--defs", type=int, default=5000, help="Number of $defs in the synthetic bundle.")
+    parser.add_argument(
+        "--baseline-rev",
+        help="git revision of the pre-IR generators (default: before rgs_types/ir.py was added).",
+    )
+    parser.add_argument("--pipeline", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--schema", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.pipeline:
+        run_pipeline(args.schema, args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        schema_path = tmp_path / "bundle.json"
+        schema_path.write_text(json.dumps(make_bundle(args.defs)))
+
+        start = time.perf_counter()
+        model = parse_schema_file(schema_path)
+        parse_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        IRBuilder().build(model)
+        ir_seconds = time.perf_counter() - start
+        del model
+
+        # Memory is measured in a separate pass so tracing does not skew the timings
+        model, model_bytes = retained_bytes(lambda: parse_schema_file(schema_path))
+        node, ir_bytes = retained_bytes(lambda: build_ir(model))
+
+        print(f"Bundle with {args.defs} definitions ({schema_path.stat().st_size / 1e6:.1f} MB)")
+        print(f"  parse (json + pydantic): {parse_seconds:8.2f} s, retained {model_bytes / 1e6:8.1f} MB")
+        print(f"  IR build:                {ir_seconds:8.2f} s, retained {ir_bytes / 1e6:8.1f} MB")
+
+        rev = git("rev-parse", "--short", args.baseline_rev or default_baseline_rev()).decode().strip()
+        baseline_src = extract_sources(rev, tmp_path / "baseline")
+        pythonpath = [str(baseline_src), os.environ.get("PYTHONPATH")]
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, pythonpath))}
+        runs = [
+            (f"pre-IR generators ({rev})", measure(
+                [sys.executable, "-c", BASELINE_PIPELINE, str(schema_path), str(tmp_path / "baseline_out")],
+                tmp_path / "baseline_out", env,
+            )),
+            ("IR generators", measure(
+                [sys.executable, __file__, "--pipeline", "--schema", str(schema_path),
+                 "--output", str(tmp_path / "ir")],
+                tmp_path / "ir",
+            )),
+        ]
+        print("  parse+generate (all languages):")
+        for label, stats in runs:
+            print(f"    {label:40s} {stats['seconds']:8.2f} s, peak RSS {stats['peak_rss_mb']:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
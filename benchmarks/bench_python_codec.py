@@ -0,0 +1,171 @@
+"""
+Measures the generated Python classes on the `test_cases` corpora.
+
+For every `test_cases/*/schema.json`, generates the Python module, draws sample
+records from the schema with Hypothesis and reports:
+
+* `from_dict` throughput of the generated per-class decoders against a generic
+  converter driven by type hints (what callers had to write themselves),
+* `to_dict` throughput of the generated per-field encoders against
+  `dataclasses.asdict` (the previous implementation), and
+* memory per decoded record with slotted dataclasses against the same classes
+  without slots, and
+* the columnar batch decoder `from_dicts` (time and memory per record) against
+  decoding one instance per record.
+
+Usage:
+    poetry run python benchmarks/bench_python_codec.py --records 200 --repeat 50
+"""
+import argparse
+import contextlib
+import dataclasses
+import gc
+import importlib.util
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+import warnings
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from hypothesis import HealthCheck, given, settings
+from rgs_types.parser import parse_schema_file
+from rgs_types.generators.python import PythonGenerator
+from rgs_types.generators.json_data import JsonDataGenerator
+from rgs_types.generators.utils import pascal_case
+
+SLOTS_OPTION = '_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}'
+
+def draw_samples(schema, count: int) -> list:
+    """Deterministically draws up to `count` records valid against `schema`."""
+    samples = []
+
+    @settings(
+        max_examples=count, derandomize=True, database=None, deadline=None,
+        suppress_health_check=list(HealthCheck),
+    )
+    @given(JsonDataGenerator(schema).get_strategy())
+    def collect(sample):
+        samples.append(sample)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        collect()
+    return samples
+
+@lru_cache(maxsize=None)
+def type_hints(cls) -> dict:
+    return typing.get_type_hints(cls)
+
+def reflective_from_dict(cls, data: dict):
+    """Generic decoder: converts each field from its type hint at runtime."""
+    hints = type_hints(cls)
+    kwargs = {}
+    for field in dataclasses.fields(cls):
+        if field.name in data:
+            kwargs[field.name] = convert(hints[field.name], data[field.name])
+    return cls(**kwargs)
+
+def convert(hint, value):
+    if value is None:
+        return None
+    origin = typing.get_origin(hint)
+    if origin is typing.Union:
+        hint = next(arg for arg in typing.get_args(hint) if arg is not type(None))
+        return convert(hint, value)
+    if origin is list:
+        (item,) = typing.get_args(hint) or (typing.Any,)
+        return [convert(item, v) for v in value]
+    if dataclasses.is_dataclass(hint):
+        return reflective_from_dict(hint, value)
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        return hint(value)
+    return value
+
+def load_module(path: Path, name: str, source: str = None):
+    if source is not None:
+        path = path.with_name(f"{name}.py")
+        path.write_text(source)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def generate_module(schema, out_dir: Path) -> Path:
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = PythonGenerator(schema, out_dir)
+        generator.generate()
+    return next(iter(generator.outputs))
+
+def per_record(seconds: float, count: int) -> float:
+    return seconds / count * 1e6
+
+def timed(function, items, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            function(item)
+    return time.perf_counter() - start
+
+def bytes_per_record(decode_batch, records) -> float:
+    gc.collect()
+    tracemalloc.start()
+    objects = decode_batch(records)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / len(records)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200, help="Sample records drawn per schema.")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the records per measurement.")
+    args = parser.parse_args()
+
+    print(
+        f"{'test case':<22}{'records':>8}{'from_dict us':>14}{'reflective us':>15}"
+        f"{'to_dict us':>12}{'asdict us':>11}{'slots B':>9}{'no slots B':>12}"
+        f"{'from_dicts us':>15}{'columns B':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, schema_path in enumerate(sorted((ROOT / "test_cases").glob("*/schema.json"))):
+            schema = parse_schema_file(schema_path)
+            class_name = pascal_case(schema.title or "GeneratedModel")
+            try:
+                records = draw_samples(schema, args.records)
+            except Exception as e:
+                print(f"{schema_path.parent.name:<22} skipped: cannot draw samples ({type(e).__name__})")
+                continue
+
+            module_path = generate_module(schema, Path(tmp) / str(index))
+            source = module_path.read_text()
+            module = load_module(module_path, f"bench_case_{index}")
+            unslotted = load_module(module_path, f"bench_case_{index}_unslotted", source.replace(SLOTS_OPTION, "_DATACLASS_OPTIONS = {}"))
+            cls, unslotted_cls = getattr(module, class_name), getattr(unslotted, class_name)
+
+            objects = [cls.from_dict(record) for record in records]
+            decode = timed(cls.from_dict, records, args.repeat)
+            reflective = timed(lambda record: reflective_from_dict(cls, record), records, args.repeat)
+            encode = timed(cls.to_dict, objects, args.repeat)
+            asdict = timed(dataclasses.asdict, objects, args.repeat)
+            columns = timed(cls.from_dicts, [records], args.repeat)
+            count = len(objects) * args.repeat
+            print(
+                f"{schema_path.parent.name:<22}{len(records):>8}"
+                f"{per_record(decode, count):>14.2f}{per_record(reflective, count):>15.2f}"
+                f"{per_record(encode, count):>12.2f}{per_record(asdict, count):>11.2f}"
+                f"{bytes_per_record(lambda batch: [cls.from_dict(r) for r in batch], records):>9.0f}"
+                f"{bytes_per_record(lambda batch: [unslotted_cls.from_dict(r) for r in batch], records):>12.0f}"
+                f"{per_record(columns, count):>15.2f}{bytes_per_record(cls.from_dicts, records):>11.0f}"
+            )
+
+if __name__ == "__main__":
+    main()
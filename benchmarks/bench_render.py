@@ -0,0 +1,70 @@
+"""
+Compares the peak memory of rendering generated code into one string (the previous
+`template.render(...).strip()` path) against streaming it into the output file.
+
+Builds the synthetic bundle of `bench_ir.py`, collects its types once, then runs
+each generator both ways and reports the size of the output and the tracemalloc
+peak of the rendering step.
+
+Usage:
+    poetry run python benchmarks/bench_render.py --defs 40000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bench_ir import GENERATORS, make_bundle
+from rgs_types.parser import parse_schema_string
+from rgs_types.generators.base import SchemaContext
+
+def buffered(generator_cls):
+    """The generator with the previous whole-string rendering."""
+    class Buffered(generator_cls):
+        def write_template(self, path, template, **context):
+            return self.write_output(path, template.render(**context).strip() + "\n")
+    return Buffered
+
+def measure(generator_cls, context, out_dir):
+    generator = generator_cls(context.schema, out_dir, context=context)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.generate()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = sum(path.stat().st_size for path in generator.outputs)
+    return size, peak, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--defs", type=int, default=20000, help="Number of $defs in the synthetic schema.")
+    args = parser.parse_args()
+
+    context = SchemaContext(parse_schema_string(json.dumps(make_bundle(args.defs))))
+    context.types  # collected once, outside the measurements
+    context.graph
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'generator':<22}{'output':>10}{'render peak':>14}{'stream peak':>14}{'render s':>10}{'stream s':>10}")
+        for generator_cls in GENERATORS:
+            measure(generator_cls, context, Path(tmp) / "warmup")  # compile the template
+            size, render_peak, render_time = measure(buffered(generator_cls), context, Path(tmp) / "render")
+            _, stream_peak, stream_time = measure(generator_cls, context, Path(tmp) / "stream")
+            print(
+                f"{generator_cls.__name__:<22}{size / 2**20:>8.1f}MB"
+                f"{render_peak / 2**20:>12.1f}MB{stream_peak / 2**20:>12.1f}MB"
+                f"{render_time:>10.2f}{stream_time:>10.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
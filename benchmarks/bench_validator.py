@@ -0,0 +1,70 @@
+"""
+Compares `rgs_types.validator` with the `jsonschema` package on the `test_cases` corpora.
+
+For every `test_cases/*/schema.json`, draws sample records from the schema with
+Hypothesis and reports the time per record of:
+
+* `compile_validator(schema)` functions, and
+* the `jsonschema` validator class for the schema's draft (`validate` and `is_valid`),
+
+plus the time to compile the validator once and to look it up again in the cache.
+
+Usage:
+    poetry run python benchmarks/bench_validator.py --records 200 --repeat 50
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import jsonschema
+from bench_python_codec import draw_samples, per_record, timed
+from rgs_types.parser import parse_schema_file
+from rgs_types.validator import clear_validator_cache, compile_validator
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200, help="Sample records drawn per schema.")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the records per measurement.")
+    args = parser.parse_args()
+
+    print(
+        f"{'test case':<22}{'records':>8}{'rgs us':>9}{'jsonschema us':>15}{'is_valid us':>13}"
+        f"{'speedup':>9}{'compile ms':>12}{'cached us':>11}"
+    )
+    for schema_path in sorted((ROOT / "test_cases").glob("*/schema.json")):
+        schema = parse_schema_file(schema_path)
+        try:
+            records = draw_samples(schema, args.records)
+        except Exception as e:
+            print(f"{schema_path.parent.name:<22} skipped: cannot draw samples ({type(e).__name__})")
+            continue
+
+        raw = json.loads(schema_path.read_text())
+        reference = jsonschema.validators.validator_for(raw)(raw)
+
+        clear_validator_cache()
+        start = time.perf_counter()
+        validate = compile_validator(schema)
+        compile_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        compile_validator(schema)
+        cached_seconds = time.perf_counter() - start
+
+        ours = timed(validate, records, args.repeat)
+        theirs = timed(reference.validate, records, args.repeat)
+        is_valid = timed(reference.is_valid, records, args.repeat)
+        count = len(records) * args.repeat
+        print(
+            f"{schema_path.parent.name:<22}{len(records):>8}"
+            f"{per_record(ours, count):>9.2f}{per_record(theirs, count):>15.2f}{per_record(is_valid, count):>13.2f}"
+            f"{theirs / ours:>8.0f}x{compile_seconds * 1e3:>12.2f}{cached_seconds * 1e6:>11.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
 #!/bin/bash
 
-poetry run rgs-gen test_cases/**/*.json --lang cpp --output build/cpp
-poetry run rgs-gen test_cases/**/*.json --lang typescript --output build/typescript
-poetry run rgs-gen test_cases/**/*.json --lang python --output build/python
\ No newline at end of file
+poetry run rgs-gen test_cases/**/*.json --lang all --output build
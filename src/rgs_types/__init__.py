@@ -1,5 +1,35 @@
-from .parser import parse_schema_file, parse_schema_string
-from .schema_models import JSONSchema
-from .resolver import SchemaResolver
+import importlib
 
-__all__ = ["parse_schema_file", "parse_schema_string", "JSONSchema", "SchemaResolver"]
+# Kept in sync with pyproject.toml (checked by tests/test_cli.py); reading the
+# installed package metadata instead costs more than the rest of CLI startup.
+__version__ = "0.4.4"
+
+# Public API, imported on first access so `import rgs_types` (and the rgs-gen CLI)
+# does not load pydantic, jinja2 or the generators until they are used.
+_EXPORTS = {
+    "parse_schema_file": ".parser",
+    "parse_schema_string": ".parser",
+    "load_schema_ir": ".parser",
+    "JSONSchema": ".schema_models",
+    "SchemaResolver": ".resolver",
+    "SchemaNode": ".ir",
+    "build_ir": ".ir",
+    "SchemaCache": ".cache",
+    "DocumentRegistry": ".registry",
+    "TypeGraph": ".graph",
+    "compile_validator": ".validator",
+    "ValidationError": ".validator",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Optional, Union
+from . import __version__
+from .files import atomic_write
+from .ir import SCHEMA_FIELDS, SchemaNode
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def default_cache_dir() -> Path:
+    """
+    Returns the rgs_types cache directory.
+
+    Uses $RGS_CACHE_DIR if set, otherwise $XDG_CACHE_HOME/rgs_types (~/.cache/rgs_types).
+    """
+    if os.environ.get("RGS_CACHE_DIR"):
+        return Path(os.environ["RGS_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "rgs_types"
+
+class SchemaCache:
+    """
+    Persistent cache of parsed schemas (as SchemaNode IR), keyed by the hash of the
+    schema file content and the rgs_types version.
+
+    Entries are pickles under `<cache_dir>/schemas`. Reading an entry refreshes its
+    mtime, and once the total size exceeds `max_bytes` the least recently used
+    entries are evicted.
+    """
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.schema_dir = self.cache_dir / "schemas"
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None  # computed lazily on the first write
+
+    def key(self, content: bytes, base_uri: Optional[str] = None) -> str:
+        """Computes the cache key for raw schema file content loaded from `base_uri`."""
+        digest = hashlib.sha256()
+        # The IR layout is part of the key so stale pickles are never loaded, and
+        # the base URI because refs in the IR are made absolute against it
+        digest.update(f"{__version__}\0{','.join(SCHEMA_FIELDS)}\0{base_uri or ''}\0".encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.schema_dir / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[SchemaNode]:
+        """Returns the cached schema for `key`, or None on a miss."""
+        path = self._entry(key)
+        try:
+            with open(path, "rb") as f:
+                node = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or incompatible entry: drop it and treat as a miss
+            path.unlink(missing_ok=True)
+            self._total_bytes = None
+            return None
+
+        if not isinstance(node, SchemaNode):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return node
+
+    def put(self, key: str, node: SchemaNode):
+        """Stores a schema, evicting least recently used entries if over the size cap."""
+        self.schema_dir.mkdir(parents=True, exist_ok=True)
+        data = pickle.dumps(node, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._entry(key)
+
+        # Write atomically so concurrent rgs-gen runs never observe partial entries
+        atomic_write(path, data)
+
+        if self._total_bytes is None:
+            self._total_bytes = self.size()
+        else:
+            self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        """Returns the total size in bytes of all cached entries."""
+        if not self.schema_dir.exists():
+            return 0
+        return sum(entry.stat().st_size for entry in self.schema_dir.glob("*.pickle"))
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits within `max_bytes`."""
+        if not self.schema_dir.exists():
+            self._total_bytes = 0
+            return
+        entries = []
+        for entry in self.schema_dir.glob("*.pickle"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort(key=lambda e: e[0])
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+    def clear(self):
+        """Removes every cached schema."""
+        if self.schema_dir.exists():
+            for entry in self.schema_dir.iterdir():
+                entry.unlink(missing_ok=True)
+        self._total_bytes = 0
@@ -0,0 +1,17 @@
+import sys
+
+def main():
+    """
+    Entry point of the `rgs-gen` command.
+
+    Typer imports rich whenever it is installed. rich only pays off on an interactive
+    terminal, so for redirected output (CI logs, build systems) it is blocked before
+    the app is imported and Typer falls back to plain help and error messages.
+    """
+    if not sys.stdout.isatty():
+        sys.modules.setdefault("rich", None)
+    from .main import app
+    app()
+
+if __name__ == "__main__":
+    main()
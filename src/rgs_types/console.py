@@ -0,0 +1,27 @@
+import builtins
+import re
+import sys
+
+# Style tags as used in our messages, e.g. "[bold green]" / "[/bold green]"
+_MARKUP = re.compile(r"\[/?[a-z]+(?: [a-z]+)*\]")
+
+def _use_rich() -> bool:
+    if not sys.stdout.isatty():
+        return False
+    try:
+        import rich  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def print(*objects, **kwargs):
+    """
+    Prints rich console markup. rich is only imported (and the markup rendered) when
+    stdout is a terminal; otherwise the style tags are stripped and the text is
+    printed plainly, which keeps non-interactive runs (CI, pipes, workers) cheap.
+    """
+    if _use_rich():
+        from rich import print as rich_print
+        rich_print(*objects, **kwargs)
+    else:
+        builtins.print(*(_MARKUP.sub("", str(obj)) for obj in objects), **kwargs)
@@ -0,0 +1,107 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Tuple, Union
+
+# Size of the blocks copied from an existing file and of the write buffer
+BLOCK_SIZE = 1 << 16
+
+def digest_bytes(data: bytes) -> str:
+    """Returns the hex SHA-256 digest of `data`."""
+    return hashlib.sha256(data).hexdigest()
+
+def digest_file(path: Union[str, Path]) -> str:
+    """Returns the hex SHA-256 digest of a file's content."""
+    return digest_bytes(Path(path).read_bytes())
+
+@contextlib.contextmanager
+def _replacement_file(path: Path) -> Iterator[BinaryIO]:
+    """Yields a temporary file in `path`'s directory that replaces `path` on success."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb", buffering=BLOCK_SIZE) as f:
+            yield f
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+def atomic_write(path: Union[str, Path], data: bytes):
+    """
+    Writes `data` to `path` through a temporary file in the same directory and a
+    rename, so readers (compilers, concurrent runs) never observe a partial file.
+    """
+    with _replacement_file(Path(path)) as f:
+        f.write(data)
+
+def write_if_changed(path: Union[str, Path], content: Union[str, bytes]) -> bool:
+    """
+    Atomically writes `content` unless the file already holds exactly these bytes,
+    leaving its mtime untouched so build systems do not rebuild its dependents.
+
+    Returns True if the file was written.
+    """
+    data = content.encode() if isinstance(content, str) else content
+    path = Path(path)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    atomic_write(path, data)
+    return True
+
+def write_chunks_if_changed(path: Union[str, Path], chunks: Iterable[Union[str, bytes]]) -> Tuple[bool, str]:
+    """
+    Streaming variant of `write_if_changed`: consumes `chunks` one at a time, so the
+    content is never held in memory as a whole.
+
+    The chunks are compared against the existing file as they arrive. Nothing is
+    written while they match; at the first difference the matching prefix is copied
+    from the old file into a temporary file and the remaining chunks go there, which
+    then atomically replaces `path`.
+
+    Returns (True if the file was written, hex SHA-256 digest of the content).
+    """
+    path = Path(path)
+    hasher = hashlib.sha256()
+    with contextlib.ExitStack() as stack:
+        try:
+            existing = stack.enter_context(open(path, "rb"))
+        except FileNotFoundError:
+            existing = None
+        out = None
+        matched = 0  # bytes identical to the start of the existing file
+        for chunk in chunks:
+            data = chunk.encode() if isinstance(chunk, str) else chunk
+            hasher.update(data)
+            if out is None:
+                if existing is not None and existing.read(len(data)) == data:
+                    matched += len(data)
+                    continue
+                out = stack.enter_context(_replacement_file(path))
+                if existing is not None:
+                    existing.seek(0)
+                    _copy_prefix(existing, out, matched)
+            out.write(data)
+        if out is None and existing is not None and existing.read(1):
+            # The new content is a strict prefix of the existing file
+            out = stack.enter_context(_replacement_file(path))
+            existing.seek(0)
+            _copy_prefix(existing, out, matched)
+        if out is None and existing is None:
+            # No chunks at all: still create the (empty) file
+            out = stack.enter_context(_replacement_file(path))
+        if existing is not None:
+            existing.close()  # before the rename, which Windows refuses on open files
+    return out is not None, hasher.hexdigest()
+
+def _copy_prefix(source: BinaryIO, target: BinaryIO, size: int):
+    while size > 0:
+        block = source.read(min(size, BLOCK_SIZE))
+        if not block:
+            break
+        target.write(block)
+        size -= len(block)
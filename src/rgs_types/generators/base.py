@@ -1,15 +1,156 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from ..schema_models import JSONSchema
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from ..ir import SchemaNode, build_ir
 from ..resolver import SchemaResolver
+from ..graph import TypeGraph
+from ..files import digest_bytes, write_chunks_if_changed, write_if_changed
+from .environment import get_environment
+from .collector import ClassDef, EnumDef, TypeTable, collect_types
+
+if TYPE_CHECKING:
+    import jinja2
+    from ..schema_models import JSONSchema
+    from .shared import SharedTypes
+
+# Template output events joined into one chunk before it is written
+STREAM_BUFFER_SIZE = 64
+
+def strip_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Yields `chunks` with leading and trailing whitespace of the whole text removed
+    and a single final newline, i.e. the streaming form of `text.strip() + "\n"`.
+
+    Only a run of trailing whitespace is held back (it is emitted once more text
+    follows), so memory does not grow with the size of the output.
+    """
+    pending = None  # whitespace not yet known to be inside the text; None before any text
+    for chunk in chunks:
+        body = chunk.rstrip()
+        if not body:
+            if pending is not None:
+                pending += chunk
+            continue
+        if pending is None:
+            body = body.lstrip()
+            yield body
+        else:
+            yield pending + body
+        pending = chunk[len(chunk.rstrip()):]
+    yield "\n"
+
+class SchemaContext:
+    """
+    Language-independent state for one schema: its IR, the resolver for its $refs,
+    the type dependency graph and the table of collected types.
+
+    Generators for several target languages can share one context, so a schema is
+    parsed, resolved and analysed once and only rendering happens per language.
+    """
+    def __init__(
+        self,
+        schema: Union["JSONSchema", SchemaNode],
+        resolver: Optional[SchemaResolver] = None,
+        merge_inline: bool = True,
+    ):
+        # Generators walk the compact IR rather than the pydantic model tree
+        self.schema = build_ir(schema)
+        # A shared resolver (e.g. from a DocumentRegistry) enables external $refs
+        self.resolver = resolver or SchemaResolver(self.schema)
+        # Inline objects of the same shape share a class unless nominal types are requested
+        self.merge_inline = merge_inline
+        self._graph: Optional[TypeGraph] = None
+        self._types: Optional[TypeTable] = None
+        # Types emitted into a common module for several schemas (see plan_shared_types)
+        self.shared: Optional["SharedTypes"] = None
+
+    @property
+    def graph(self) -> TypeGraph:
+        """The type dependency graph of the schema, built on first use."""
+        if self._graph is None:
+            self._graph = TypeGraph(self.schema, self.resolver)
+        return self._graph
+
+    @property
+    def types(self) -> TypeTable:
+        """The named classes and enums of the schema, collected on first use."""
+        if self._types is None:
+            self._types = collect_types(self.schema, self.resolver, self.merge_inline)
+        return self._types
 
 class CodeGenerator(ABC):
-    def __init__(self, schema: JSONSchema, output_dir: Path):
-        self.schema = schema
+    template_name: str  # Jinja template rendered by `generate`
+
+    def __init__(
+        self,
+        schema: Union["JSONSchema", SchemaNode],
+        output_dir: Path,
+        resolver: Optional[SchemaResolver] = None,
+        context: Optional[SchemaContext] = None,
+    ):
+        self.context = context or SchemaContext(schema, resolver)
+        self.schema = self.context.schema
         self.output_dir = output_dir
-        self.resolver = SchemaResolver(schema)
+        self.resolver = self.context.resolver
+        self.outputs: Dict[Path, str] = {}  # generated file -> SHA-256 of its content
+        # Compiled templates are shared by all generators of the process
+        self.env = get_environment()
+
+    @property
+    def graph(self) -> TypeGraph:
+        """The type dependency graph of the schema (shared through the context)."""
+        return self.context.graph
+
+    @property
+    def types(self) -> TypeTable:
+        """The collected classes and enums (shared through the context)."""
+        return self.context.types
+
+    def local_types(self) -> Tuple[List[ClassDef], List[EnumDef]]:
+        """The classes and enums emitted into this schema's own output."""
+        types, shared = self.types, self.context.shared
+        if shared is None:
+            return types.classes, types.enums
+        return (
+            [definition for definition in types.classes if definition not in shared],
+            [enum for enum in types.enums if enum not in shared],
+        )
+
+    def shared_imports(self) -> List[str]:
+        """Names of this schema's types that are imported from the common module."""
+        shared = self.context.shared
+        if shared is None:
+            return []
+        return [definition.name for definition in (*self.types.enums, *self.types.classes) if definition in shared]
+
+    def write_output(self, path: Path, content: str) -> bool:
+        """
+        Writes a generated file unless it already has this exact content, so unchanged
+        outputs keep their mtime. Returns True if the file was written.
+        """
+        data = content.encode()
+        self.outputs[path] = digest_bytes(data)
+        return write_if_changed(path, data)
+
+    def write_template(self, path: Path, template: "jinja2.Template", **context: Any) -> bool:
+        """
+        Renders `template` straight into `path`, stripped like the generated files are.
+
+        The output is streamed chunk by chunk into the file (see
+        `write_chunks_if_changed`), so peak memory does not scale with its size.
+        Returns True if the file was written.
+        """
+        stream = template.stream(**context)
+        stream.enable_buffering(STREAM_BUFFER_SIZE)
+        written, self.outputs[path] = write_chunks_if_changed(path, strip_chunks(stream))
+        return written
 
     @abstractmethod
     def generate(self):
         """Perform the code generation."""
         pass
+
+    @abstractmethod
+    def generate_common(self):
+        """Generate the common module holding the context's shared types."""
+        pass
@@ -0,0 +1,189 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+from ..ir import SCHEMA_FIELDS, SchemaNode, canonical_key
+from ..resolver import SchemaResolver
+from .utils import pascal_case
+
+# TypeRef kinds. Primitives carry no payload, "array" has an `item` (None for
+# untyped or tuple items), "class"/"enum" point at their definition.
+STRING = "string"
+INTEGER = "integer"
+NUMBER = "number"
+BOOLEAN = "boolean"
+ARRAY = "array"
+MAP = "map"  # object without declared properties
+ANY = "any"
+CLASS = "class"
+ENUM = "enum"
+
+_PRIMITIVES = (STRING, INTEGER, NUMBER, BOOLEAN)
+
+@dataclass(eq=False)
+class EnumDef:
+    name: str
+    values: Tuple[Any, ...]
+    schema: SchemaNode
+
+@dataclass(eq=False)
+class TypeRef:
+    kind: str
+    item: Optional["TypeRef"] = None
+    definition: Optional[Union["ClassDef", EnumDef]] = None
+
+@dataclass(eq=False)
+class FieldDef:
+    name: str  # property name as written in the schema
+    schema: SchemaNode
+    type: TypeRef
+    required: bool
+
+@dataclass(eq=False)
+class ClassDef:
+    name: str
+    schema: SchemaNode
+    ref: Optional[str] = None
+    fields: List[FieldDef] = field(default_factory=list)
+
+@dataclass(eq=False)
+class TypeTable:
+    """Language-neutral result of type collection, shared by all generators."""
+    root: ClassDef
+    classes: List[ClassDef]  # dependencies before dependents (except within cycles)
+    enums: List[EnumDef]
+
+_SIMPLE_TYPES = {kind: TypeRef(kind) for kind in _PRIMITIVES + (MAP, ANY)}
+_UNTYPED_ARRAY = TypeRef(ARRAY)
+
+# Documentation does not change the shape of a type
+_SHAPE_FIELDS = tuple(name for name in SCHEMA_FIELDS if name != "description")
+
+class TypeCollector:
+    """
+    Walks a schema from its root and assigns a unique name to every class (the root,
+    `$ref` targets and inline objects with properties) and enum the generators emit.
+
+    A ref is collected once however often it is used. Unless `merge_inline` is
+    False, so is an inline object: objects of the same shape (equal subschemas apart
+    from descriptions, including the title if any) share one class, named after
+    the first one. Colliding names get numeric suffixes (`Name`, `Name_1`,
+    `Name_2`, ...) from a per-base-name counter, so assigning n equal names costs
+    O(n) rather than O(n^2).
+    """
+    def __init__(
+        self,
+        schema: SchemaNode,
+        resolver: Optional[SchemaResolver] = None,
+        merge_inline: bool = True,
+    ):
+        self.schema = schema
+        self.resolver = resolver or SchemaResolver(schema)
+        self.merge_inline = merge_inline
+        self._used_names: set = set()
+        self._next_suffix: Dict[str, int] = {}
+        self._classes: List[ClassDef] = []
+        self._enums: Dict[str, EnumDef] = {}
+        self._ref_map: Dict[str, ClassDef] = {}
+        self._inline_map: Dict[int, ClassDef] = {}  # shape id -> class of an inline object
+        self._node_shapes: Dict[SchemaNode, int] = {}
+        self._shape_ids: Dict[Tuple[Any, ...], int] = {}
+
+    def collect(self) -> TypeTable:
+        root_name = pascal_case(self.schema.title or "GeneratedModel")
+        root = self._collect_class(self.schema, root_name)
+        return TypeTable(root=root, classes=self._classes, enums=list(self._enums.values()))
+
+    def _unique_name(self, base: str) -> str:
+        name = base
+        if name in self._used_names:
+            # Resume from the last suffix handed out for this base; only names that
+            # were taken by an explicit title are probed more than once
+            suffix = self._next_suffix.get(base, 1)
+            name = f"{base}_{suffix}"
+            while name in self._used_names:
+                suffix += 1
+                name = f"{base}_{suffix}"
+            self._next_suffix[base] = suffix + 1
+        self._used_names.add(name)
+        return name
+
+    def _shape_id(self, node: SchemaNode) -> int:
+        """
+        Small integer identifying the shape of `node`, equal for structurally identical
+        subschemas. Children are represented by their own ids, so every node is keyed
+        (and its subtree walked) once.
+        """
+        shape = self._node_shapes.get(node)
+        if shape is None:
+            key = []
+            for name in _SHAPE_FIELDS:
+                value = getattr(node, name)
+                if value is not None:
+                    key.append((name, canonical_key(value, self._shape_id)))
+            shape = self._shape_ids.setdefault(tuple(key), len(self._shape_ids))
+            self._node_shapes[node] = shape
+        return shape
+
+    def _type_of(self, prop: SchemaNode, name: str) -> TypeRef:
+        if prop.ref:
+            definition = self._ref_map.get(prop.ref)
+            if definition is None:
+                resolved = self.resolver.resolve(prop.ref)
+                ref_name = pascal_case(resolved.title or prop.ref.split("/")[-1])
+                definition = self._collect_class(resolved, ref_name, ref=prop.ref)
+            return TypeRef(CLASS, definition=definition)
+
+        if prop.enum:
+            enum_name = pascal_case(name)
+            enum = self._enums.get(enum_name)
+            if enum is None:
+                # Equally named enums are shared, so only a clash with a class renames
+                enum = EnumDef(self._unique_name(enum_name), prop.enum, prop)
+                self._enums[enum_name] = enum
+            return TypeRef(ENUM, definition=enum)
+
+        json_type = prop.type
+        if json_type in _PRIMITIVES:
+            return _SIMPLE_TYPES[json_type]
+        if json_type == ARRAY:
+            if isinstance(prop.items, SchemaNode):
+                item_name = prop.items.title or (name + "Item")
+                return TypeRef(ARRAY, item=self._type_of(prop.items, item_name))
+            return _UNTYPED_ARRAY
+        if json_type == "object":
+            if prop.properties:
+                if not self.merge_inline:
+                    return TypeRef(CLASS, definition=self._collect_class(prop, pascal_case(prop.title or name)))
+                shape = self._shape_id(prop)
+                definition = self._inline_map.get(shape)
+                if definition is None:
+                    definition = self._collect_class(prop, pascal_case(prop.title or name))
+                    self._inline_map[shape] = definition
+                return TypeRef(CLASS, definition=definition)
+            return _SIMPLE_TYPES[MAP]
+        return _SIMPLE_TYPES[ANY]
+
+    def _collect_class(self, schema: SchemaNode, name: str, ref: Optional[str] = None) -> ClassDef:
+        definition = ClassDef(self._unique_name(name), schema, ref)
+        if ref:
+            self._ref_map[ref] = definition
+
+        if schema.properties:
+            required = schema.required or ()
+            for prop_name, prop in schema.properties.items():
+                definition.fields.append(FieldDef(
+                    name=prop_name,
+                    schema=prop,
+                    type=self._type_of(prop, prop_name),
+                    required=prop_name in required,
+                ))
+
+        self._classes.append(definition)
+        return definition
+
+def collect_types(
+    schema: SchemaNode,
+    resolver: Optional[SchemaResolver] = None,
+    merge_inline: bool = True,
+) -> TypeTable:
+    """Collects the classes and enums of a schema (see TypeCollector)."""
+    return TypeCollector(schema, resolver, merge_inline).collect()
@@ -1,157 +1,468 @@
-import jinja2
+import json
+from itertools import groupby
 from pathlib import Path
-from typing import Dict, Any, List, Set, Optional
-from rich import print
-from .base import CodeGenerator
-from ..schema_models import JSONSchema
-from .utils import pascal_case, snake_case
+from typing import TYPE_CHECKING, AbstractSet, Dict, Any, List, Optional, Sequence, Union
+from ..console import print
+from .base import CodeGenerator, SchemaContext
+from ..ir import SchemaNode
+from ..resolver import SchemaResolver
+from .collector import ANY, ARRAY, BOOLEAN, CLASS, ENUM, INTEGER, MAP, NUMBER, STRING, ClassDef, EnumDef, TypeRef
+from .shared import COMMON_MODULE
+from .utils import snake_case
+
+if TYPE_CHECKING:
+    from ..schema_models import JSONSchema
+
+CPP_TYPES = {
+    STRING: "std::string",
+    INTEGER: "int64_t",
+    NUMBER: "double",
+    BOOLEAN: "bool",
+    MAP: "nlohmann::json",
+    ANY: "nlohmann::json",
+}
+
+# Allocator-aware replacements used in pmr mode
+PMR_TYPES = {**CPP_TYPES, STRING: "std::pmr::string"}
+
+# Typical encoded sizes of values, for the buffer reserve hints of the JSON writer
+JSON_SIZES = {
+    STRING: 18,
+    INTEGER: 10,
+    NUMBER: 18,
+    BOOLEAN: 5,
+    MAP: 32,
+    ANY: 32,
+}
+TYPICAL_ITEMS = 4
+TYPICAL_STRING = 64
+
+# Output layouts: one self-contained header per schema, or a header per type with the
+# JSON codecs and runtime kept apart (see CppGenerator)
+SINGLE = "single"
+SPLIT = "split"
+LAYOUTS = (SINGLE, SPLIT)
+
+# Runtime headers shared by every schema generated with the split layout
+RUNTIME_FWD_HEADER = "rgs_runtime_fwd.hpp"
+RUNTIME_HEADER = "rgs_runtime.hpp"
+
+# Suffixes of the constexpr enumerator and string tables generated for each enum
+ENUM_TABLES = ("_values", "_strings")
+
+def cpp_string(text: str) -> str:
+    """Escapes `text` for a C++ string literal (UTF-8, as the JSON keys compared against it)."""
+    escaped = []
+    for char in text:
+        if char in '"\\':
+            escaped.append("\\" + char)
+        elif ord(char) < 0x20:
+            escaped.append(f"\\{ord(char):03o}")
+        else:
+            escaped.append(char)
+    return "".join(escaped)
+
+def cpp_char(byte: int) -> str:
+    """C++ character literal of one byte of a UTF-8 string, as indexing a std::string_view yields it."""
+    if 0x20 <= byte < 0x7f and chr(byte) not in "'\\":
+        return f"'{chr(byte)}'"
+    return f"'\\x{byte:02x}'"
+
+def cpp_namespace(schema: SchemaNode) -> Optional[str]:
+    """The namespace of a schema's types: `x-cpp-namespace`, else derived from its `$id`."""
+    if schema.cpp_namespace:
+        return schema.cpp_namespace
+    if schema.id:
+        return snake_case(schema.id.split("/")[-1].split(".")[0])
+    return None
+
+def qualified_names(context: SchemaContext) -> List[str]:
+    """
+    Qualified C++ names of the types defined in a schema's own output. Codec source
+    files of two schemas sharing one of these names define the same functions.
+    """
+    namespace = cpp_namespace(context.schema)
+    prefix = f"{namespace}::" if namespace else ""
+    shared = context.shared
+    return [
+        prefix + definition.name
+        for definition in (*context.types.enums, *context.types.classes)
+        if shared is None or definition not in shared
+    ]
 
 class CppGenerator(CodeGenerator):
-    def __init__(self, schema: JSONSchema, output_dir: Path):
-        super().__init__(schema, output_dir)
-        template_path = Path(__file__).parent / "templates"
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_path),
-            trim_blocks=True, 
-            lstrip_blocks=True
-        )
+    """
+    Generates a C++17 header per schema.
+
+    With `pmr`, strings and vectors are `std::pmr` containers, structs are
+    allocator-aware (`allocator_type`, allocator-extended constructors) and recursive
+    members are `rgs_runtime::box`es allocated from the struct's memory resource, so
+    a whole message can be decoded into a `std::pmr::monotonic_buffer_resource`.
+
+    The `split` layout keeps the JSON machinery out of the type headers: every type
+    (or reference cycle of types) gets a header under `<schema>/` that only declares
+    its codec functions and includes `nlohmann/json_fwd.hpp`, `<schema>.hpp` includes
+    them all, and the codecs are defined in `<schema>_json.hpp`, or in `<schema>.cpp`
+    with `codec_source`. The runtime lives in the shared `rgs_runtime.hpp`.
+    """
+    template_name = "cpp.hpp.j2"
+
+    def __init__(
+        self,
+        schema: Union["JSONSchema", SchemaNode],
+        output_dir: Path,
+        resolver: Optional[SchemaResolver] = None,
+        context: Optional[SchemaContext] = None,
+        pmr: bool = False,
+        layout: str = SINGLE,
+        codec_source: bool = False,
+    ):
+        super().__init__(schema, output_dir, resolver, context)
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown C++ layout {layout!r}, expected one of {', '.join(LAYOUTS)}")
+        if codec_source and layout != SPLIT:
+            raise ValueError("Codec source files need the split C++ layout")
+        self.layout = layout
+        self.codec_source = codec_source
+        self.pmr = pmr
+        self.cpp_types = PMR_TYPES if pmr else CPP_TYPES
+        self.vector_type = "std::pmr::vector" if pmr else "std::vector"
+        self.box_type = "rgs_runtime::box" if pmr else "std::shared_ptr"
         self.struct_list = []
         self.enum_list = []
-        self.generated_types: Set[str] = set()
-        self.ref_map: Dict[str, str] = {} # Map ref string to generated struct name
-        self.collecting_stack: List[str] = [] # Track current collection to detect recursion
-
-    def _get_cpp_type(self, prop: JSONSchema, name: str) -> str:
-        if prop.ref:
-            if prop.ref in self.ref_map:
-                res_name = self.ref_map[prop.ref]
-                # If we are currently collecting this type, it's recursive!
-                if res_name in self.collecting_stack:
-                    return f"std::shared_ptr<{res_name}>"
-                return res_name
-
-            resolved = self.resolver.resolve(prop.ref)
-            ref_name = resolved.title or prop.ref.split("/")[-1]
-            ref_name = pascal_case(ref_name)
-            return self._collect_type(resolved, ref_name, ref=prop.ref)
-        
-        if prop.enum:
-            enum_name = pascal_case(name)
-            if enum_name not in self.generated_types:
-                # Sanitise enum values: prefix numbers
-                sanitized_values = []
-                for v in prop.enum:
-                    val_str = str(v)
-                    if val_str[0].isdigit():
-                        sanitized_values.append(f"VALUE_{val_str}")
-                    else:
-                        sanitized_values.append(val_str)
-
-                self.enum_list.append({
-                    "name": enum_name,
-                    "enum_values": sanitized_values
-                })
-                self.generated_types.add(enum_name)
-            return enum_name
-
-        json_type = prop.type
-        if json_type == "string":
-            return "std::string"
-        elif json_type == "integer":
-            return "int64_t"
-        elif json_type == "number":
-            return "double"
-        elif json_type == "boolean":
-            return "bool"
-        elif json_type == "array":
-            if prop.items and isinstance(prop.items, JSONSchema):
-                item_name = prop.items.title or (name + "Item")
-                item_type = self._get_cpp_type(prop.items, item_name)
-                return f"std::vector<{item_type}>"
-            return "std::vector<nlohmann::json>"
-        elif json_type == "object":
-            if prop.properties:
-                struct_name = prop.title or name
-                struct_name = pascal_case(struct_name)
-                return self._collect_type(prop, struct_name)
-            return "nlohmann::json"
-        
-        return "nlohmann::json"
+        self.json_sizes: Dict[int, int] = {}  # id(ClassDef) -> estimated JSON size
 
-    def _collect_type(self, schema: JSONSchema, name: str, ref: Optional[str] = None) -> str:
-        if ref and ref in self.ref_map:
-            return self.ref_map[ref]
+    def _get_cpp_type(self, type_ref: TypeRef, owner: ClassDef) -> str:
+        kind = type_ref.kind
+        if kind == CLASS:
+            target = type_ref.definition
+            # Members pointing back into the owner's strongly connected component would
+            # make the struct infinitely large, so they are stored behind a pointer
+            if self.graph.needs_indirection(owner.schema, target.schema):
+                return f"{self.box_type}<{target.name}>"
+            return target.name
+        if kind == ENUM:
+            return type_ref.definition.name
+        if kind == ARRAY:
+            if type_ref.item is None:
+                return f"{self.vector_type}<nlohmann::json>"
+            return f"{self.vector_type}<{self._get_cpp_type(type_ref.item, owner)}>"
+        return self.cpp_types[kind]
 
-        original_name = name
-        counter = 1
-        while name in self.generated_types:
-            name = f"{original_name}_{counter}"
-            counter += 1
-        
-        self.generated_types.add(name)
-        if ref:
-            self.ref_map[ref] = name
-        
-        self.collecting_stack.append(name)
-        
+    def _json_size(self, type_ref: TypeRef, node: Optional[SchemaNode], owner: ClassDef) -> int:
+        """Estimated size of a value's JSON encoding, from the schema's length and item limits."""
+        kind = type_ref.kind
+        if kind == CLASS:
+            target = type_ref.definition
+            # Boxed members close a cycle and are usually null
+            if self.graph.needs_indirection(owner.schema, target.schema):
+                return 4
+            return self._struct_json_size(target)
+        if kind == ENUM:
+            return max(len(json.dumps(str(value))) for value in type_ref.definition.values)
+        if kind == ARRAY:
+            count = TYPICAL_ITEMS
+            if node is not None and node.maxItems is not None:
+                count = min(count, node.maxItems)
+            if node is not None and node.minItems is not None:
+                count = max(count, node.minItems)
+            items = node.items if node is not None and isinstance(node.items, SchemaNode) else None
+            item_size = JSON_SIZES[ANY] if type_ref.item is None else self._json_size(type_ref.item, items, owner)
+            return 2 + count * (item_size + 1)
+        if kind == STRING and node is not None and node.maxLength is not None:
+            return 2 + min(node.maxLength, TYPICAL_STRING)
+        return JSON_SIZES[kind]
+
+    def _struct_json_size(self, definition: ClassDef) -> int:
+        size = self.json_sizes.get(id(definition))
+        if size is None:
+            size = 2
+            for field_def in definition.fields:
+                size += len(json.dumps(field_def.name)) + 2
+                size += self._json_size(field_def.type, field_def.schema, definition)
+            self.json_sizes[id(definition)] = size
+        return size
+
+    def _render_enum(self, enum: EnumDef) -> Dict[str, Any]:
+        # Sanitise enum values: prefix numbers
+        sanitized_values = []
+        for v in enum.values:
+            val_str = str(v)
+            if val_str[0].isdigit():
+                sanitized_values.append(f"VALUE_{val_str}")
+            else:
+                sanitized_values.append(val_str)
+        by_size: Dict[int, List[Any]] = {}
+        for value in sanitized_values:
+            encoded = value.encode("utf-8")
+            by_size.setdefault(len(encoded), []).append((encoded, value.upper(), cpp_string(value)))
+        return {
+            "name": enum.name,
+            "enum_values": sanitized_values,
+            "strings": [cpp_string(value) for value in sanitized_values],
+            # from_string switches on the length, then on distinguishing bytes
+            "dispatch": [(size, self._string_dispatch(entries)) for size, entries in sorted(by_size.items())],
+            # Quoted JSON strings the writer appends as they are
+            "literals": [
+                (cpp_string(quoted), len(quoted.encode("utf-8")))
+                for quoted in (json.dumps(value, ensure_ascii=False) for value in sanitized_values)
+            ],
+        }
+
+    def _string_dispatch(self, entries: List[Any]) -> Dict[str, Any]:
+        """
+        Decision tree for `from_string` over `(utf-8 bytes, enumerator, literal)` entries of
+        one length: switch on the byte that splits them most, until one candidate is left
+        to compare in full. Hundreds of values take a few jumps instead of a linear scan.
+        """
+        if len(entries) > 1:
+            size = len(entries[0][0])
+            spread = [len({value[index] for value, _, _ in entries}) for index in range(size)]
+            position = max(range(size), key=spread.__getitem__)
+            if spread[position] > 1:
+                cases: Dict[int, List[Any]] = {}
+                for entry in entries:
+                    cases.setdefault(entry[0][position], []).append(entry)
+                return {
+                    "position": position,
+                    "cases": [(cpp_char(byte), self._string_dispatch(group)) for byte, group in sorted(cases.items())],
+                }
+        return {"position": None, "values": [(enumerator, literal) for _, enumerator, literal in entries]}
+
+    def _render_struct(self, definition: ClassDef) -> Dict[str, Any]:
         properties = []
-        if schema.properties:
-            for prop_name, prop in schema.properties.items():
-                cpp_type = self._get_cpp_type(prop, prop_name)
-                
-                is_required = schema.required and prop_name in schema.required
-                # If it's already a shared_ptr (recursive), don't wrap in optional
-                if not is_required and not cpp_type.startswith("std::shared_ptr"):
-                    cpp_type = f"std::optional<{cpp_type}>"
-                
-                default = None
-                if prop.default is not None:
-                    if isinstance(prop.default, str):
-                        default = f'"{prop.default}"'
-                    elif isinstance(prop.default, bool):
-                        default = "true" if prop.default else "false"
-                    elif isinstance(prop.default, (int, float)):
-                        default = str(prop.default)
-
-                properties.append({
-                    "name": snake_case(prop_name),
-                    "type": cpp_type,
-                    "default": default,
-                    "description": prop.description
-                })
-        
-        self.struct_list.append({
-            "name": name,
-            "description": schema.description,
-            "properties": properties
-        })
-        
-        self.collecting_stack.pop()
-        return name
+        for index, field_def in enumerate(definition.fields):
+            prop = field_def.schema
+            cpp_type = self._get_cpp_type(field_def.type, definition)
+
+            # If it's already a box (recursive), don't wrap in optional
+            if not field_def.required and not cpp_type.startswith(self.box_type + "<"):
+                cpp_type = f"std::optional<{cpp_type}>"
+
+            default = None
+            if prop.default is not None:
+                if isinstance(prop.default, str):
+                    default = f'"{prop.default}"'
+                elif isinstance(prop.default, bool):
+                    default = "true" if prop.default else "false"
+                elif isinstance(prop.default, (int, float)):
+                    default = str(prop.default)
+
+            fragment = ("{" if index == 0 else ",") + json.dumps(field_def.name, ensure_ascii=False) + ":"
+            properties.append({
+                "name": snake_case(field_def.name),
+                # JSON key, which keeps the schema's spelling of the property name
+                "key": cpp_string(field_def.name),
+                # What the writer appends before the value: separator, quoted key and colon
+                "fragment": cpp_string(fragment),
+                "fragment_size": len(fragment.encode("utf-8")),
+                "type": cpp_type,
+                "default": default,
+                "description": prop.description
+            })
+
+        # The streaming decoder dispatches on the key length before comparing keys
+        keys_by_length: Dict[int, List[Dict[str, Any]]] = {}
+        for field_def, rendered in zip(definition.fields, properties):
+            keys_by_length.setdefault(len(field_def.name.encode("utf-8")), []).append(rendered)
+
+        return {
+            "name": definition.name,
+            "description": definition.schema.description,
+            "properties": properties,
+            "keys_by_length": sorted(keys_by_length.items()),
+            "json_size": self._struct_json_size(definition),
+        }
+
+    def _shared_names(self) -> List[str]:
+        """Names brought in from the common namespace: shared types and the tables of shared enums."""
+        names = self.shared_imports()
+        shared = self.context.shared
+        if shared is not None:
+            names += [enum.name + suffix for enum in self.types.enums if enum in shared for suffix in ENUM_TABLES]
+        return names
 
     def generate(self):
         self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        root_name = self.types.root.name
+        classes, enums = self.local_types()
+
+        # Emit structs in dependency order; recursive ones are also forward declared
+        # since their pointer members may name structs defined later
+        classes = sorted(classes, key=lambda definition: self.graph.component(definition.schema))
+        forward_declarations = [
+            definition.name for definition in classes if self.graph.is_recursive(definition.schema)
+        ]
         
-        root_name = self.schema.title or "GeneratedModel"
-        root_name = pascal_case(root_name)
-        
-        self._collect_type(self.schema, root_name)
-        
-        # Determine namespace
-        namespace = self.schema.cpp_namespace
-        if not namespace and self.schema.id:
-            namespace = self.schema.id.split("/")[-1].split(".")[0]
-            namespace = snake_case(namespace)
-
-        template = self.env.get_template("cpp.hpp.j2")
-        content = template.render(
+        namespace = cpp_namespace(self.schema)
+
+        shared = self.context.shared
+        if self.layout == SPLIT:
+            # Members of a reference cycle need each other's definitions, so they share a header
+            units = [
+                list(unit) for _, unit in groupby(classes, key=lambda definition: self.graph.component(definition.schema))
+            ]
+            self._write_split(
+                root_name.lower(),
+                namespace,
+                units,
+                enums,
+                set(forward_declarations),
+                common_stem=COMMON_MODULE if shared is not None else None,
+                shared_types=self._shared_names(),
+            )
+            return
+
+        output_file = self.output_dir / f"{root_name.lower()}.hpp"
+        self._write_header(
+            output_file,
+            namespace,
+            classes,
+            enums,
+            forward_declarations,
+            common_header=f"{COMMON_MODULE}.hpp" if shared is not None else None,
+            shared_types=self._shared_names(),
+        )
+
+    def generate_common(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        shared = self.context.shared
+        # Shared types are never recursive, so they are already in dependency order
+        if self.layout == SPLIT:
+            units = [[definition] for definition in shared.classes]
+            self._write_split(COMMON_MODULE, COMMON_MODULE, units, shared.enums, set())
+            return
+        self._write_header(self.output_dir / f"{COMMON_MODULE}.hpp", COMMON_MODULE, shared.classes, shared.enums, [])
+
+    def _write_header(
+        self,
+        output_file: Path,
+        namespace: Optional[str],
+        classes: List[ClassDef],
+        enums: List[EnumDef],
+        forward_declarations: List[str],
+        common_header: Optional[str] = None,
+        shared_types: Sequence[str] = (),
+    ):
+        self.struct_list = [self._render_struct(definition) for definition in classes]
+        self.enum_list = [self._render_enum(enum) for enum in enums]
+
+        self._write(
+            output_file,
+            self.template_name,
             namespace=namespace,
             structs=self.struct_list,
-            enums=self.enum_list
+            enums=self.enum_list,
+            forward_declarations=forward_declarations,
+            common_header=common_header,
+            common_namespace=COMMON_MODULE,
+            shared_types=shared_types,
         )
-        
-        output_file = self.output_dir / f"{root_name.lower()}.hpp"
-        with open(output_file, "w") as f:
-            f.write(content.strip() + "\n")
-        
-        print(f"[bold blue]Generated C++ code:[/bold blue] {output_file}")
+
+    def _write_split(
+        self,
+        stem: str,
+        namespace: Optional[str],
+        units: List[List[ClassDef]],
+        enums: List[EnumDef],
+        recursive: AbstractSet[str],
+        common_stem: Optional[str] = None,
+        shared_types: Sequence[str] = (),
+    ):
+        """
+        Writes the split layout of one schema (or of the common module) named `stem`:
+        a header per enum and per unit of classes under `<stem>/`, the umbrella header
+        `<stem>.hpp` and the codec definitions. `units` are in dependency order.
+        """
+        type_dir = self.output_dir / stem
+        type_dir.mkdir(parents=True, exist_ok=True)
+        self._write(self.output_dir / RUNTIME_FWD_HEADER, "cpp_runtime_fwd.hpp.j2", standalone=True)
+        self._write(
+            self.output_dir / RUNTIME_HEADER, "cpp_runtime.hpp.j2", standalone=True, runtime_fwd_header=RUNTIME_FWD_HEADER
+        )
+
+        # Header of every type defined in this output
+        headers: Dict[int, str] = {}
+        for enum in enums:
+            headers[id(enum)] = f"{enum.name.lower()}.hpp"
+        for unit in units:
+            for definition in unit:
+                headers[id(definition)] = f"{unit[0].name.lower()}.hpp"
+
+        self.struct_list = []
+        self.enum_list = []
+        context = {
+            "namespace": namespace,
+            "runtime_fwd_header": f"../{RUNTIME_FWD_HEADER}",
+            "common_namespace": COMMON_MODULE,
+            "shared_types": shared_types,
+        }
+        for enum in enums:
+            rendered = self._render_enum(enum)
+            self.enum_list.append(rendered)
+            self._write(
+                type_dir / headers[id(enum)], "cpp_type.hpp.j2",
+                enums=[rendered], structs=[], forward_declarations=[], includes=[], uses_json=False, **context,
+            )
+        for unit in units:
+            structs = [self._render_struct(definition) for definition in unit]
+            self.struct_list.extend(structs)
+            includes = []
+            for definition in unit:
+                for field_def in definition.fields:
+                    target = self._referenced_type(field_def.type)
+                    if target is None:
+                        continue
+                    # Types not defined here are shared ones
+                    header = headers.get(id(target), f"../{common_stem}.hpp")
+                    if header != headers[id(unit[0])] and header not in includes:
+                        includes.append(header)
+            self._write(
+                type_dir / headers[id(unit[0])], "cpp_type.hpp.j2",
+                enums=[],
+                structs=structs,
+                forward_declarations=[definition.name for definition in unit if definition.name in recursive],
+                includes=includes,
+                # Untyped members hold a nlohmann::json by value
+                uses_json=any("nlohmann::json" in prop["type"] for struct in structs for prop in struct["properties"]),
+                **context,
+            )
+
+        types_header = f"{stem}.hpp"
+        type_headers = [headers[id(enum)] for enum in enums] + [headers[id(unit[0])] for unit in units]
+        self._write(
+            self.output_dir / types_header, "cpp_types.hpp.j2",
+            headers=([f"{common_stem}.hpp"] if common_stem else []) + [f"{stem}/{header}" for header in type_headers],
+        )
+        if self.codec_source:
+            codec_file, specifier, common_codec = f"{stem}.cpp", "", None
+        else:
+            codec_file, specifier = f"{stem}_json.hpp", "inline "
+            common_codec = f"{common_stem}_json.hpp" if common_stem else None
+        self._write(
+            self.output_dir / codec_file, "cpp_codec.j2",
+            source=self.codec_source,
+            specifier=specifier,
+            namespace=namespace,
+            runtime_header=RUNTIME_HEADER,
+            common_codec=common_codec,
+            types_header=types_header,
+            enums=self.enum_list,
+            structs=self.struct_list,
+        )
+
+    def _referenced_type(self, type_ref: TypeRef) -> Optional[Union[ClassDef, EnumDef]]:
+        """The class or enum a member of this type refers to (through arrays), if any."""
+        while type_ref is not None and type_ref.kind == ARRAY:
+            type_ref = type_ref.item
+        if type_ref is not None and type_ref.kind in (CLASS, ENUM):
+            return type_ref.definition
+        return None
+
+    def _write(self, output_file: Path, template_name: str, **context: Any):
+        template = self.env.get_template(template_name)
+        if self.write_template(output_file, template, pmr=self.pmr, **context):
+            print(f"[bold blue]Generated C++ code:[/bold blue] {output_file}")
+        else:
+            print(f"[blue]C++ code unchanged:[/blue] {output_file}")
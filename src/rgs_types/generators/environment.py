@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    import jinja2
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# jinja2 is imported when the first template is needed, not when the CLI starts
+_environment: Optional["jinja2.Environment"] = None
+_bytecode_dir: Optional[Path] = None
+
+def _bytecode_cache(directory: Optional[Path]):
+    if directory is None:
+        return None
+    import jinja2
+    directory.mkdir(parents=True, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(str(directory))
+
+def get_environment() -> "jinja2.Environment":
+    """
+    Returns the Jinja environment shared by all generators of this process.
+
+    Templates are compiled on first use and kept in the environment's cache, so
+    generating many schemas (or languages) compiles each template once. Templates
+    ship with the package and do not change at runtime, so modification checks on
+    every lookup are disabled.
+    """
+    global _environment
+    if _environment is None:
+        import jinja2
+        _environment = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+            bytecode_cache=_bytecode_cache(_bytecode_dir),
+        )
+    return _environment
+
+def get_template(name: str) -> "jinja2.Template":
+    """Returns a compiled template from the shared environment."""
+    return get_environment().get_template(name)
+
+def bytecode_cache_dir(cache_dir: Union[str, Path]) -> Path:
+    """Directory holding compiled template bytecode inside the rgs_types cache dir."""
+    return Path(cache_dir) / "templates"
+
+def use_bytecode_cache(cache_dir: Optional[Union[str, Path]]):
+    """
+    Stores compiled templates under `<cache_dir>/templates` so later processes load
+    bytecode instead of compiling the templates (None disables it).
+
+    Only affects templates that have not been compiled in this process yet. Jinja
+    keys the entries by template source checksum and Python version.
+    """
+    global _bytecode_dir
+    _bytecode_dir = bytecode_cache_dir(cache_dir) if cache_dir is not None else None
+    if _environment is not None:
+        _environment.bytecode_cache = _bytecode_cache(_bytecode_dir)
+
+def clear_bytecode_cache(cache_dir: Union[str, Path]):
+    """Removes compiled template bytecode from `cache_dir`."""
+    directory = bytecode_cache_dir(cache_dir)
+    if directory.exists():
+        import jinja2
+        jinja2.FileSystemBytecodeCache(str(directory)).clear()
@@ -1,132 +1,323 @@
-import jinja2
+import re
 from pathlib import Path
-from typing import Dict, Any, List, Set, Optional
-from rich import print
-from .base import CodeGenerator
-from ..schema_models import JSONSchema
-from .utils import pascal_case
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Sequence, Set, Union
+from ..console import print
+from .base import CodeGenerator, SchemaContext
+from ..ir import SchemaNode
+from ..resolver import SchemaResolver
+from ..validator import NUMERIC_CHECKS
+from .collector import ANY, ARRAY, BOOLEAN, CLASS, ENUM, INTEGER, MAP, NUMBER, STRING, ClassDef, EnumDef, FieldDef, TypeRef
+from .shared import COMMON_MODULE, dependencies
+
+if TYPE_CHECKING:
+    from ..schema_models import JSONSchema
+
+PYTHON_TYPES = {
+    STRING: "str",
+    INTEGER: "int",
+    NUMBER: "float",
+    BOOLEAN: "bool",
+    MAP: "Dict[str, Any]",
+    ANY: "Any",
+}
+
+# array.array typecodes (and NumPy dtypes) of the columns of scalar numeric fields
+COLUMN_TYPES = {
+    INTEGER: ("q", "int64"),
+    NUMBER: ("d", "float64"),
+    BOOLEAN: ("b", "bool"),
+}
+
+# Constraint keywords checked by validate(), per kind of value
+CONSTRAINTS = {
+    INTEGER: ("minimum", "exclusiveMinimum", "maximum", "exclusiveMaximum"),
+    NUMBER: ("minimum", "exclusiveMinimum", "maximum", "exclusiveMaximum"),
+    STRING: ("minLength", "maxLength", "pattern"),
+    ARRAY: ("minItems", "maxItems"),
+}
+
+# Members every generated class (or its Columns batch) defines; fields of the same name
+# would replace them, so they get a trailing underscore (the JSON key is unchanged)
+RESERVED_MEMBERS = frozenset((
+    "validate", "to_dict", "from_dict", "from_dicts", "to_columns", "Columns", "to_dicts", "to_numpy", "_size",
+))
+
+def field_attributes(definition: ClassDef) -> Dict[str, str]:
+    """Python attribute name of each field of `definition`, by property name."""
+    names = {field_def.name for field_def in definition.fields}
+    attributes = {}
+    for field_def in definition.fields:
+        attribute = field_def.name
+        if attribute in RESERVED_MEMBERS:
+            while attribute in RESERVED_MEMBERS or attribute in names:
+                attribute += "_"
+            names.add(attribute)
+        attributes[field_def.name] = attribute
+    return attributes
+
+def presence_masks(definition: ClassDef, attributes: Dict[str, str]) -> Dict[str, str]:
+    """
+    Name of the Columns mask (`<attribute>_present`) of each optional scalar field, by
+    property name. A name taken by a field or a generated member gets a trailing underscore.
+    """
+    taken = set(attributes.values()) | RESERVED_MEMBERS
+    masks = {}
+    for field_def in definition.fields:
+        if field_def.required or field_def.type.kind not in COLUMN_TYPES:
+            continue
+        mask = f"{attributes[field_def.name]}_present"
+        while mask in taken:
+            mask += "_"
+        taken.add(mask)
+        masks[field_def.name] = mask
+    return masks
 
 class PythonGenerator(CodeGenerator):
-    def __init__(self, schema: JSONSchema, output_dir: Path):
-        super().__init__(schema, output_dir)
-        template_path = Path(__file__).parent / "templates"
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_path),
-            trim_blocks=True, 
-            lstrip_blocks=True
-        )
+    template_name = "python.py.j2"
+
+    def __init__(
+        self,
+        schema: Union["JSONSchema", SchemaNode],
+        output_dir: Path,
+        resolver: Optional[SchemaResolver] = None,
+        context: Optional[SchemaContext] = None,
+    ):
+        super().__init__(schema, output_dir, resolver, context)
         self.classes = []
         self.enums = {}
-        self.generated_types: Set[str] = set()
-        self.ref_map: Dict[str, str] = {} # Map ref string to generated class name
+        self.patterns: Dict[str, Optional[str]] = {}  # regex -> module-level name (None if unsupported)
+        self._validated: Set[ClassDef] = set()
 
-    def _get_python_type(self, prop: JSONSchema, name: str) -> str:
-        if prop.ref:
-            if prop.ref in self.ref_map:
-                return self.ref_map[prop.ref]
-            
-            resolved = self.resolver.resolve(prop.ref)
-            ref_name = resolved.title or prop.ref.split("/")[-1]
-            ref_name = pascal_case(ref_name)
-            
-            # Forward the ref string to _collect_class so it can be cached
-            return self._collect_class(resolved, ref_name, ref=prop.ref)
-        
-        if prop.enum:
-            enum_name = pascal_case(name)
-            if enum_name not in self.generated_types:
-                self.enums[enum_name] = prop.enum
-                self.generated_types.add(enum_name)
-            return enum_name
-
-        json_type = prop.type
-        if json_type == "string":
-            return "str"
-        elif json_type == "integer":
-            return "int"
-        elif json_type == "number":
-            return "float"
-        elif json_type == "boolean":
-            return "bool"
-        elif json_type == "array":
-            if prop.items:
-                if isinstance(prop.items, JSONSchema):
-                    item_name = prop.items.title or (name + "Item")
-                    item_type = self._get_python_type(prop.items, item_name)
-                    return f"List[{item_type}]"
-                elif isinstance(prop.items, list):
-                    return "List[Any]"
-            return "List[Any]"
-        elif json_type == "object":
-            if prop.properties:
-                class_name = prop.title or name
-                class_name = pascal_case(class_name)
-                return self._collect_class(prop, class_name)
-            return "Dict[str, Any]"
-        
-        return "Any"
-
-    def _collect_class(self, schema: JSONSchema, name: str, ref: Optional[str] = None) -> str:
-        # Check if we already have this ref mapped (redundant if called from _get_python_type check, 
-        # but safe for direct calls)
-        if ref and ref in self.ref_map:
-            return self.ref_map[ref]
-
-        original_name = name
-        counter = 1
-        while name in self.generated_types:
-            # Check if this existing name is actually this ref?
-            # We don't have that info easily, but ref_map check above handles known refs.
-            # If name is taken but ref is new, it means collision, so rename.
-            name = f"{original_name}_{counter}"
-            counter += 1
-        
-        self.generated_types.add(name)
-        if ref:
-            self.ref_map[ref] = name
-        
+    def _get_python_type(self, type_ref: TypeRef) -> str:
+        kind = type_ref.kind
+        if kind in (CLASS, ENUM):
+            return type_ref.definition.name
+        if kind == ARRAY:
+            if type_ref.item is None:
+                return "List[Any]"
+            return f"List[{self._get_python_type(type_ref.item)}]"
+        return PYTHON_TYPES[kind]
+
+    def _encode(self, type_ref: TypeRef, value: str, depth: int = 0) -> str:
+        """Expression converting `value` of `type_ref` into its JSON value."""
+        kind = type_ref.kind
+        if kind == CLASS:
+            return f"{value}.to_dict()"
+        if kind == ENUM:
+            return f"{value}.value"
+        if kind == ARRAY and type_ref.item is not None:
+            item = f"item{depth}" if depth else "item"
+            encoded = self._encode(type_ref.item, item, depth + 1)
+            if encoded != item:
+                return f"[{encoded} for {item} in {value}]"
+        return value
+
+    def _decode(self, type_ref: TypeRef, value: str, depth: int = 0) -> str:
+        """Expression converting the JSON value `value` into `type_ref`."""
+        kind = type_ref.kind
+        if kind == CLASS:
+            return f"{type_ref.definition.name}.from_dict({value})"
+        if kind == ENUM:
+            return f"{type_ref.definition.name}({value})"
+        if kind == ARRAY and type_ref.item is not None:
+            item = f"item{depth}" if depth else "item"
+            decoded = self._decode(type_ref.item, item, depth + 1)
+            if decoded != item:
+                return f"[{decoded} for {item} in {value}]"
+        return value
+
+    def _decode_field(self, field_def: FieldDef, data: str, get: str) -> str:
+        """Expression reading the field from the dictionary `data` (`get` is its get method)."""
+        default = field_def.schema.default
+        if field_def.required and default is None:
+            return self._decode(field_def.type, f'{data}["{field_def.name}"]')
+        # Missing keys fall back to the JSON default, which is then decoded
+        fallback = "" if default is None else f", {default!r}"
+        source = f'{get}("{field_def.name}"{fallback})'
+        decoded = self._decode(field_def.type, "value")
+        return source if decoded == "value" else f"None if (value := {source}) is None else {decoded}"
+
+    def _constrained(self, node: SchemaNode, type_ref: TypeRef, validated: Set[ClassDef]) -> bool:
+        """Whether a value of `type_ref` described by `node` has anything to validate."""
+        if type_ref.kind == CLASS:
+            return type_ref.definition in validated
+        if any(getattr(node, keyword) is not None for keyword in CONSTRAINTS.get(type_ref.kind, ())):
+            return True
+        if type_ref.kind == ARRAY and type_ref.item is not None and isinstance(node.items, SchemaNode):
+            return self._constrained(node.items, type_ref.item, validated)
+        return False
+
+    def _validated_classes(self, classes: List[ClassDef]) -> Set[ClassDef]:
+        """The classes reachable from `classes` whose validate() checks anything."""
+        reachable: List[ClassDef] = []
+        seen: Set[ClassDef] = set()
+        stack = list(classes)
+        while stack:
+            definition = stack.pop()
+            if definition not in seen:
+                seen.add(definition)
+                reachable.append(definition)
+                stack.extend(dep for dep in dependencies(definition) if isinstance(dep, ClassDef))
+
+        # Fixpoint, since a class is validated if any class it contains is (cycles included)
+        validated: Set[ClassDef] = set()
+        changed = True
+        while changed:
+            changed = False
+            for definition in reachable:
+                if definition not in validated and any(
+                    self._constrained(field_def.schema, field_def.type, validated)
+                    for field_def in definition.fields
+                ):
+                    validated.add(definition)
+                    changed = True
+        return validated
+
+    def _pattern_name(self, pattern: str, label: str) -> Optional[str]:
+        """Module-level name of the compiled `pattern`, or None if Python cannot compile it."""
+        if pattern not in self.patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                print(f"[bold yellow]Warning:[/bold yellow] the pattern of {label} is not supported by Python's re module and is not validated ({e})")
+                self.patterns[pattern] = None
+            else:
+                self.patterns[pattern] = f"_PATTERN_{len(self.patterns)}"
+        return self.patterns[pattern]
+
+    def _checks(self, node: SchemaNode, type_ref: TypeRef, value: str, label: str, depth: int = 0) -> List[str]:
+        """Statements raising ValueError if `value` violates a constraint of `node`."""
+        failures = []  # (condition, message)
+        kind = type_ref.kind
+        if kind in (INTEGER, NUMBER):
+            for keyword, (failed, expected) in NUMERIC_CHECKS.items():
+                limit = getattr(node, keyword)
+                if limit is not None:
+                    failures.append((f"{value} {failed} {limit!r}", f"must be {expected} {limit!r}, got {{{value}!r}}"))
+        elif kind == STRING:
+            if node.minLength is not None:
+                failures.append((f"len({value}) < {node.minLength}", f"length must be >= {node.minLength}, got {{len({value})}}"))
+            if node.maxLength is not None:
+                failures.append((f"len({value}) > {node.maxLength}", f"length must be <= {node.maxLength}, got {{len({value})}}"))
+            name = None if node.pattern is None else self._pattern_name(node.pattern, label)
+            if name is not None:
+                failures.append((f"{name}.search({value}) is None", f"must match {{{name}.pattern!r}}, got {{{value}!r}}"))
+        elif kind == ARRAY:
+            if node.minItems is not None:
+                failures.append((f"len({value}) < {node.minItems}", f"item count must be >= {node.minItems}, got {{len({value})}}"))
+            if node.maxItems is not None:
+                failures.append((f"len({value}) > {node.maxItems}", f"item count must be <= {node.maxItems}, got {{len({value})}}"))
+
+        lines = []
+        prefix = label.replace("{", "{{").replace("}", "}}")
+        for condition, message in failures:
+            lines.append(f"if {condition}:")
+            lines.append(f"    raise ValueError(f{prefix + ': ' + message!r})")
+        if kind == CLASS and type_ref.definition in self._validated:
+            lines.append(f"{value}.validate()")
+        elif kind == ARRAY and type_ref.item is not None and isinstance(node.items, SchemaNode):
+            item = f"item{depth}" if depth else "item"
+            item_checks = self._checks(node.items, type_ref.item, item, f"{label}[]", depth + 1)
+            if item_checks:
+                lines.append(f"for {item} in {value}:")
+                lines.extend(f"    {line}" for line in item_checks)
+        return lines
+
+    def _render_column(self, field_def: FieldDef, type_hint: str, index: int, mask: Optional[str]) -> Dict[str, Any]:
+        """How the field is stored, decoded and encoded in the class's Columns batch."""
+        value = f"value{index}"
+        encode = self._encode(field_def.type, value)
+        if not field_def.required and encode != value:
+            encode = f"None if {value} is None else {encode}"
+        column = {
+            "typecode": None,
+            "type_hint": f"List[{type_hint}]",
+            "decode": self._decode_field(field_def, "record", "record.get"),
+            "value": value,
+            "encode": encode,
+            # Optional scalar columns are collected into this local before being split
+            # into values and the `_present` mask
+            "local": f"column{index}",
+            "nullable": not field_def.required,
+            "mask": mask,
+        }
+        if field_def.type.kind in COLUMN_TYPES:
+            column["typecode"], column["dtype"] = COLUMN_TYPES[field_def.type.kind]
+            column["type_hint"] = f"Union[array, List[{PYTHON_TYPES[field_def.type.kind]}]]"
+            # array("b") holds booleans as 0/1
+            column["item"] = "bool(value)" if field_def.type.kind == BOOLEAN else "value"
+        return column
+
+    def _render_class(self, definition: ClassDef) -> Dict[str, Any]:
         properties = {}
-        if schema.properties:
-            for prop_name, prop in schema.properties.items():
-                type_hint = self._get_python_type(prop, prop_name)
-                
-                is_required = schema.required and prop_name in schema.required
-                if not is_required:
-                    type_hint = f"Optional[{type_hint}]"
-                
-                default = None
-                if prop.default is not None:
-                    if isinstance(prop.default, str):
-                        default = f'"{prop.default}"'
-                    elif isinstance(prop.default, bool):
-                        default = "True" if prop.default else "False"
-                    elif isinstance(prop.default, list) and not prop.default:
-                        default = "field(default_factory=list)"
-                    else:
-                        default = str(prop.default)
-                elif not is_required:
-                    default = "None"
-
-                properties[prop_name] = {
-                    "type_hint": type_hint,
-                    "default": default,
-                    "description": prop.description
-                }
-        
+        uses_get = False  # whether from_dict reads any key with data.get
+        checks = []  # body of validate(), unrolled per field
+        attributes = field_attributes(definition)
+        masks = presence_masks(definition, attributes)
+        for field_def in definition.fields:
+            name = attributes[field_def.name]
+            prop = field_def.schema
+            type_hint = self._get_python_type(field_def.type)
+            if not field_def.required:
+                type_hint = f"Optional[{type_hint}]"
+
+            default = None
+            if prop.default is not None:
+                if isinstance(prop.default, str):
+                    default = f'"{prop.default}"'
+                elif isinstance(prop.default, bool):
+                    default = "True" if prop.default else "False"
+                elif isinstance(prop.default, list) and not prop.default:
+                    default = "field(default_factory=list)"
+                else:
+                    default = str(prop.default)
+                if field_def.type.kind == ENUM:
+                    # The default is the enum member, like the decoded value would be
+                    default = f"{field_def.type.definition.name}({default})"
+            elif not field_def.required:
+                default = "None"
+
+            # Conversions are unrolled per field; untyped values are passed through as-is
+            attribute = f"self.{name}"
+            encode = self._encode(field_def.type, attribute)
+            if not field_def.required and encode != attribute:
+                encode = f"None if {attribute} is None else {encode}"
+
+            decode = self._decode_field(field_def, "data", "get")
+            # Missing keys are read with data.get and fall back to the JSON default
+            uses_get = uses_get or not (field_def.required and prop.default is None)
+
+            field_checks = self._checks(prop, field_def.type, "value", f"{definition.name}.{name}")
+            if field_checks:
+                checks.append(f"value = self.{name}")
+                if not field_def.required:
+                    checks.append("if value is not None:")
+                    field_checks = [f"    {line}" for line in field_checks]
+                checks.extend(field_checks)
+
+            properties[name] = {
+                "key": field_def.name,
+                "type_hint": type_hint,
+                "default": default,
+                "description": prop.description,
+                "encode": encode,
+                "decode": decode,
+                "column": self._render_column(field_def, type_hint, len(properties), masks.get(field_def.name)),
+            }
+
         # Sort properties: non-default fields first, then default fields
         sorted_props = dict(sorted(properties.items(), key=lambda item: item[1]['default'] is not None))
 
-        self.classes.append({
-            "name": name,
-            "description": schema.description,
-            "properties": sorted_props
-        })
-        
-        return name
+        return {
+            "name": definition.name,
+            "description": definition.schema.description,
+            "properties": sorted_props,
+            "uses_get": uses_get,
+            "checks": checks,
+        }
 
     def generate(self):
-        root_name = self.schema.title or "GeneratedModel"
-        root_name = pascal_case(root_name)
+        root_name = self.types.root.name
         
         # Determine output directory (if x-python-namespace is present)
         final_output_dir = self.output_dir
@@ -146,16 +337,38 @@ class PythonGenerator(CodeGenerator):
                 init_file.touch()
             curr = curr.parent
 
-        self._collect_class(self.schema, root_name)
-        
-        template = self.env.get_template("python.py.j2")
-        content = template.render(
-            classes=self.classes,
-            enums=self.enums
-        )
-        
+        classes, enums = self.local_types()
         output_file = final_output_dir / f"{root_name.lower()}.py"
-        with open(output_file, "w") as f:
-            f.write(content.strip() + "\n")
+        self._write_module(output_file, classes, enums, self.shared_imports())
+
+    def generate_common(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Imported by the per-schema modules as a top-level module of the output directory
+        shared = self.context.shared
+        self._write_module(self.output_dir / f"{COMMON_MODULE}.py", shared.classes, shared.enums)
+
+    def _write_module(
+        self,
+        output_file: Path,
+        classes: List[ClassDef],
+        enums: List[EnumDef],
+        shared_imports: Sequence[str] = (),
+    ):
+        self.patterns = {}
+        self._validated = self._validated_classes(classes)
+        self.classes = [self._render_class(definition) for definition in classes]
+        self.enums = {enum.name: enum.values for enum in enums}
         
-        print(f"[bold blue]Generated Python code:[/bold blue] {output_file}")
\ No newline at end of file
+        template = self.env.get_template(self.template_name)
+        if self.write_template(
+            output_file,
+            template,
+            classes=self.classes,
+            enums=self.enums,
+            common_module=COMMON_MODULE,
+            shared_imports=shared_imports,
+            patterns={pattern: name for pattern, name in self.patterns.items() if name is not None},
+        ):
+            print(f"[bold blue]Generated Python code:[/bold blue] {output_file}")
+        else:
+            print(f"[blue]Python code unchanged:[/blue] {output_file}")
@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from ..files import digest_bytes
+from ..ir import SCHEMA_FIELDS, SchemaNode, canonical_key
+from .collector import ARRAY, CLASS, ENUM, ClassDef, EnumDef, TypeRef
+
+if TYPE_CHECKING:
+    from .base import SchemaContext
+
+# Name of the module/header holding the shared types, next to the per-schema outputs
+COMMON_MODULE = "rgs_common"
+
+Definition = Union[ClassDef, EnumDef]
+
+# Attributes that locate a schema rather than describe the type generated from it
+_LOCATION_FIELDS = frozenset(("schema_uri", "id", "cpp_namespace", "python_namespace", "ref", "anchor", "defs"))
+
+def _node_key(node: SchemaNode) -> Tuple[Any, ...]:
+    """The content of a subschema, without its location. Refs are covered by TypeRefs."""
+    return tuple(
+        (name, canonical_key(getattr(node, name), _node_key))
+        for name in SCHEMA_FIELDS
+        if name not in _LOCATION_FIELDS and getattr(node, name) is not None
+    )
+
+class TypeHasher:
+    """
+    Content digests of the classes and enums of one schema's TypeTable.
+
+    A class digest covers its name, its subschema and the digests of the types its
+    fields refer to, so two definitions from different schemas have equal digests
+    exactly when they generate the same code. Classes in a reference cycle (and the
+    classes referring to them) get no digest: they stay in their schema's output.
+    """
+    def __init__(self, context: "SchemaContext"):
+        self.context = context
+        self._digests: Dict[Definition, Optional[str]] = {}
+
+    def digest(self, definition: Definition) -> Optional[str]:
+        if definition in self._digests:
+            return self._digests[definition]
+        if isinstance(definition, EnumDef):
+            digest = digest_bytes(repr(("enum", definition.name, canonical_key(definition.values, _node_key))).encode())
+        else:
+            self._digests[definition] = None
+            digest = self._class_digest(definition)
+        self._digests[definition] = digest
+        return digest
+
+    def _class_digest(self, definition: ClassDef) -> Optional[str]:
+        if self.context.graph.is_recursive(definition.schema):
+            return None
+        field_types = []
+        for field_def in definition.fields:
+            type_key = self._type_key(field_def.type)
+            if type_key is None:
+                return None
+            field_types.append(type_key)
+        key = ("class", definition.name, _node_key(definition.schema), tuple(field_types))
+        return digest_bytes(repr(key).encode())
+
+    def _type_key(self, type_ref: TypeRef) -> Optional[Tuple[Any, ...]]:
+        if type_ref.kind in (CLASS, ENUM):
+            digest = self.digest(type_ref.definition)
+            return None if digest is None else (type_ref.kind, digest)
+        if type_ref.kind == ARRAY and type_ref.item is not None:
+            item = self._type_key(type_ref.item)
+            return None if item is None else (ARRAY, item)
+        return (type_ref.kind,)
+
+def dependencies(definition: Definition) -> List[Definition]:
+    """The classes and enums the fields of `definition` refer to."""
+    found: List[Definition] = []
+    for field_def in getattr(definition, "fields", ()):
+        type_ref = field_def.type
+        while type_ref is not None and type_ref.kind == ARRAY:
+            type_ref = type_ref.item
+        if type_ref is not None and type_ref.definition is not None and type_ref.definition not in found:
+            found.append(type_ref.definition)
+    return found
+
+@dataclass(eq=False)
+class SharedTypes:
+    """
+    Types defined identically in several schemas, emitted once into COMMON_MODULE.
+
+    `classes` (dependencies first) and `enums` hold one representative per shared
+    type; `members` holds every occurrence in every schema, so generators can tell
+    which of their definitions to import instead of emitting.
+    """
+    classes: List[ClassDef] = field(default_factory=list)
+    enums: List[EnumDef] = field(default_factory=list)
+    members: Set[Definition] = field(default_factory=set)
+
+    def __contains__(self, definition: Definition) -> bool:
+        return definition in self.members
+
+def plan_shared_types(contexts: Sequence["SchemaContext"]) -> SharedTypes:
+    """
+    Finds the classes and enums that occur with equal content digests in at least two
+    of `contexts` and can be moved into a common module:
+
+    * per name, only the most widespread definition is shared, so the common module
+      has unique names (others stay in their schemas);
+    * a type is only shared if everything it refers to is shared too.
+    """
+    occurrences: Dict[str, List[Definition]] = {}
+    deps: Dict[str, List[str]] = {}
+    for context in contexts:
+        hasher = TypeHasher(context)
+        table = context.types
+        for definition in [*table.enums, *table.classes]:
+            digest = hasher.digest(definition)
+            if digest is None:
+                continue
+            occurrences.setdefault(digest, []).append(definition)
+            if digest not in deps:
+                deps[digest] = [hasher.digest(dependency) for dependency in dependencies(definition)]
+
+    # Digests include the name, so a digest occurs at most once per schema
+    candidates = [digest for digest, found in occurrences.items() if len(found) > 1]
+    by_name: Dict[str, str] = {}
+    for digest in candidates:
+        name = occurrences[digest][0].name
+        current = by_name.get(name)
+        if current is None or len(occurrences[digest]) > len(occurrences[current]):
+            by_name[name] = digest
+    shared = set(by_name.values())
+
+    changed = True
+    while changed:
+        changed = False
+        for digest in list(shared):
+            if any(dependency not in shared for dependency in deps[digest]):
+                shared.discard(digest)
+                changed = True
+
+    result = SharedTypes()
+    ordered: Set[str] = set()
+
+    def add(digest: str):
+        # Dependencies first; shared types form a DAG since cycles are never shared
+        if digest in ordered:
+            return
+        ordered.add(digest)
+        for dependency in deps[digest]:
+            add(dependency)
+        representative = occurrences[digest][0]
+        if isinstance(representative, EnumDef):
+            result.enums.append(representative)
+        else:
+            result.classes.append(representative)
+        result.members.update(occurrences[digest])
+
+    for digest in occurrences:
+        if digest in shared:
+            add(digest)
+    return result
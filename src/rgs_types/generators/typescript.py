@@ -1,130 +1,111 @@
-import jinja2
 from pathlib import Path
-from typing import Dict, Any, List, Set, Optional
-from rich import print
-from .base import CodeGenerator
-from ..schema_models import JSONSchema
-from .utils import pascal_case
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Sequence, Union
+from ..console import print
+from .base import CodeGenerator, SchemaContext
+from ..ir import SchemaNode
+from ..resolver import SchemaResolver
+from .collector import ANY, ARRAY, BOOLEAN, CLASS, ENUM, INTEGER, MAP, NUMBER, STRING, ClassDef, EnumDef, TypeRef
+from .shared import COMMON_MODULE
+
+if TYPE_CHECKING:
+    from ..schema_models import JSONSchema
+
+TS_TYPES = {
+    STRING: "string",
+    INTEGER: "number",
+    NUMBER: "number",
+    BOOLEAN: "boolean",
+    MAP: "{ [key: string]: any }",
+    ANY: "any",
+}
 
 class TypeScriptGenerator(CodeGenerator):
-    def __init__(self, schema: JSONSchema, output_dir: Path):
-        super().__init__(schema, output_dir)
-        template_path = Path(__file__).parent / "templates"
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_path),
-            trim_blocks=True, 
-            lstrip_blocks=True
-        )
+    template_name = "typescript.ts.j2"
+
+    def __init__(
+        self,
+        schema: Union["JSONSchema", SchemaNode],
+        output_dir: Path,
+        resolver: Optional[SchemaResolver] = None,
+        context: Optional[SchemaContext] = None,
+    ):
+        super().__init__(schema, output_dir, resolver, context)
         self.class_list = []
         self.enum_list = []
-        self.generated_types: Set[str] = set()
-        self.ref_map: Dict[str, str] = {} # Map ref string to generated class name
 
-    def _get_ts_type(self, prop: JSONSchema, name: str) -> str:
-        if prop.ref:
-            if prop.ref in self.ref_map:
-                return self.ref_map[prop.ref]
-            
-            resolved = self.resolver.resolve(prop.ref)
-            ref_name = resolved.title or prop.ref.split("/")[-1]
-            ref_name = pascal_case(ref_name)
-            return self._collect_class(resolved, ref_name, ref=prop.ref)
-        
-        if prop.enum:
-            enum_name = pascal_case(name)
-            if enum_name not in self.generated_types:
-                self.enum_list.append({
-                    "name": enum_name,
-                    "enum_values": prop.enum
-                })
-                self.generated_types.add(enum_name)
-            return enum_name
+    def _get_ts_type(self, type_ref: TypeRef) -> str:
+        kind = type_ref.kind
+        if kind in (CLASS, ENUM):
+            return type_ref.definition.name
+        if kind == ARRAY:
+            if type_ref.item is None:
+                return "Array<any>"
+            return f"Array<{self._get_ts_type(type_ref.item)}>"
+        return TS_TYPES[kind]
 
-        json_type = prop.type
-        if json_type == "string":
-            return "string"
-        elif json_type in ("integer", "number"):
-            return "number"
-        elif json_type == "boolean":
-            return "boolean"
-        elif json_type == "array":
-            if prop.items and isinstance(prop.items, JSONSchema):
-                item_name = prop.items.title or (name + "Item")
-                item_type = self._get_ts_type(prop.items, item_name)
-                return f"Array<{item_type}>"
-            return "Array<any>"
-        elif json_type == "object":
-            if prop.properties:
-                struct_name = prop.title or name
-                struct_name = pascal_case(struct_name)
-                return self._collect_class(prop, struct_name)
-            return "{ [key: string]: any }"
-        
-        return "any"
+    def _render_class(self, definition: ClassDef) -> Dict[str, Any]:
+        properties = []
+        for field_def in definition.fields:
+            prop = field_def.schema
 
-    def _collect_class(self, schema: JSONSchema, name: str, ref: Optional[str] = None) -> str:
-        if ref and ref in self.ref_map:
-            return self.ref_map[ref]
+            default = None
+            if prop.default is not None:
+                if isinstance(prop.default, str):
+                    default = f'"{prop.default}"'
+                elif isinstance(prop.default, bool):
+                    default = "true" if prop.default else "false"
+                elif isinstance(prop.default, (int, float)):
+                    default = str(prop.default)
+                elif isinstance(prop.default, list) and not prop.default:
+                    default = "[]"
 
-        original_name = name
-        counter = 1
-        while name in self.generated_types:
-            name = f"{original_name}_{counter}"
-            counter += 1
-        
-        self.generated_types.add(name)
-        if ref:
-            self.ref_map[ref] = name
-        
-        properties = []
-        if schema.properties:
-            for prop_name, prop in schema.properties.items():
-                ts_type = self._get_ts_type(prop, prop_name)
-                is_required = schema.required and prop_name in schema.required
-                
-                default = None
-                if prop.default is not None:
-                    if isinstance(prop.default, str):
-                        default = f'"{prop.default}"'
-                    elif isinstance(prop.default, bool):
-                        default = "true" if prop.default else "false"
-                    elif isinstance(prop.default, (int, float)):
-                        default = str(prop.default)
-                    elif isinstance(prop.default, list) and not prop.default:
-                        default = "[]"
+            properties.append({
+                "name": field_def.name,
+                "type": self._get_ts_type(field_def.type),
+                "required": field_def.required,
+                "default": default,
+                "description": prop.description
+            })
 
-                properties.append({
-                    "name": prop_name,
-                    "type": ts_type,
-                    "required": is_required,
-                    "default": default,
-                    "description": prop.description
-                })
-        
-        self.class_list.append({
-            "name": name,
-            "description": schema.description,
+        return {
+            "name": definition.name,
+            "description": definition.schema.description,
             "properties": properties
-        })
-        
-        return name
+        }
 
     def generate(self):
-        root_name = self.schema.title or "GeneratedModel"
-        root_name = pascal_case(root_name)
+        root_name = self.types.root.name
         
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        self._collect_class(self.schema, root_name)
-        
-        template = self.env.get_template("typescript.ts.j2")
-        content = template.render(
-            classes=self.class_list,
-            enums=self.enum_list
-        )
-        
+        classes, enums = self.local_types()
         output_file = self.output_dir / f"{root_name.lower()}.ts"
-        with open(output_file, "w") as f:
-            f.write(content.strip() + "\n")
+        self._write_module(output_file, classes, enums, self.shared_imports())
+
+    def generate_common(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        shared = self.context.shared
+        self._write_module(self.output_dir / f"{COMMON_MODULE}.ts", shared.classes, shared.enums)
+
+    def _write_module(
+        self,
+        output_file: Path,
+        classes: List[ClassDef],
+        enums: List[EnumDef],
+        shared_imports: Sequence[str] = (),
+    ):
+        self.class_list = [self._render_class(definition) for definition in classes]
+        self.enum_list = [{"name": enum.name, "enum_values": enum.values} for enum in enums]
         
-        print(f"[bold blue]Generated TypeScript code:[/bold blue] {output_file}")
+        template = self.env.get_template(self.template_name)
+        if self.write_template(
+            output_file,
+            template,
+            classes=self.class_list,
+            enums=self.enum_list,
+            common_module=COMMON_MODULE,
+            shared_imports=shared_imports,
+        ):
+            print(f"[bold blue]Generated TypeScript code:[/bold blue] {output_file}")
+        else:
+            print(f"[blue]TypeScript code unchanged:[/blue] {output_file}")
@@ -1,5 +1,9 @@
 import re
+from functools import lru_cache
 
+# Generators convert the same few property and type names over and over, so the
+# (pure) conversions are memoized.
+@lru_cache(maxsize=None)
 def pascal_case(s: str) -> str:
     """Converts a string to PascalCase."""
     # Split by non-alphanumeric characters or by transitions between lowercase and uppercase
@@ -8,6 +12,7 @@ def pascal_case(s: str) -> str:
         return s.capitalize()
     return "".join(word.capitalize() for word in words)
 
+@lru_cache(maxsize=None)
 def snake_case(s: str) -> str:
     """Converts a string to snake_case."""
     s = re.sub(r'(.)([A-Z][a-z]+)', r'\1_\2', s)
@@ -0,0 +1,124 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from .ir import SchemaNode
+from .resolver import SchemaResolver
+
+class TypeGraph:
+    """
+    Dependency graph between the named types of a schema.
+
+    Vertices are the schemas that generators emit as types: the root, every `$ref`
+    target and every inline object with properties. An edge A -> B means that a
+    property of A (possibly through array items) has type B.
+
+    Strongly connected components are computed once with an iterative Tarjan
+    traversal, so recursion checks are O(1) lookups and arbitrarily deep or large
+    graphs do not hit the interpreter recursion limit. Components are numbered in
+    dependency order: a type only depends on types of its own or a lower-numbered
+    component.
+    """
+    def __init__(self, root: SchemaNode, resolver: Optional[SchemaResolver] = None):
+        self.root = root
+        self.resolver = resolver or SchemaResolver(root)
+        self._successors: Dict[SchemaNode, Tuple[SchemaNode, ...]] = {}
+        self._component: Dict[SchemaNode, int] = {}
+        self.components: List[Tuple[SchemaNode, ...]] = []
+
+        self._tarjan(root)
+        # Unreferenced $defs are part of the schema too
+        for definition in (root.defs or {}).values():
+            if definition not in self._component:
+                self._tarjan(definition)
+
+    def successors(self, node: SchemaNode) -> Tuple[SchemaNode, ...]:
+        """Returns the types that properties of `node` depend on."""
+        successors = self._successors.get(node)
+        if successors is None:
+            found: Dict[SchemaNode, None] = {}
+            for prop in (node.properties or {}).values():
+                target = self._type_of(prop)
+                if target is not None:
+                    found[target] = None
+            successors = self._successors[node] = tuple(found)
+        return successors
+
+    def _type_of(self, prop: SchemaNode) -> Optional[SchemaNode]:
+        """Returns the named type a property refers to, mirroring the generators' type mapping."""
+        while True:
+            if prop.ref:
+                return self.resolver.resolve(prop.ref)
+            if prop.enum:
+                return None
+            if prop.type == "array" and isinstance(prop.items, SchemaNode):
+                prop = prop.items
+                continue
+            if prop.type == "object" and prop.properties:
+                return prop
+            return None
+
+    def _tarjan(self, start: SchemaNode):
+        index: Dict[SchemaNode, int] = {}
+        lowlink: Dict[SchemaNode, int] = {}
+        stack: List[SchemaNode] = []
+        on_stack = set()
+
+        def visit(node: SchemaNode) -> Iterator[SchemaNode]:
+            index[node] = lowlink[node] = len(index)
+            stack.append(node)
+            on_stack.add(node)
+            return iter(self.successors(node))
+
+        work = [(start, visit(start))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child in self._component:
+                    continue  # finished in an earlier traversal
+                if child not in index:
+                    work.append((child, visit(child)))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        self._component[member] = len(self.components)
+                        component.append(member)
+                        if member is node:
+                            break
+                    self.components.append(tuple(component))
+
+    def __contains__(self, node: SchemaNode) -> bool:
+        return node in self._component
+
+    def __len__(self) -> int:
+        return len(self._component)
+
+    def component(self, node: SchemaNode) -> int:
+        """Returns the index of the strongly connected component containing `node`."""
+        return self._component[node]
+
+    def same_component(self, a: SchemaNode, b: SchemaNode) -> bool:
+        """True if `a` and `b` depend on each other (directly or transitively)."""
+        component = self._component.get(a)
+        return component is not None and component == self._component.get(b)
+
+    def is_recursive(self, node: SchemaNode) -> bool:
+        """True if `node` is part of a dependency cycle, including a reference to itself."""
+        component = self._component.get(node)
+        if component is None:
+            return False
+        return len(self.components[component]) > 1 or node in self.successors(node)
+
+    def needs_indirection(self, owner: SchemaNode, target: SchemaNode) -> bool:
+        """
+        True if a member of type `target` inside `owner` closes a cycle and must be
+        stored behind a pointer (e.g. `std::shared_ptr`) in value-semantics languages.
+        """
+        return self.same_component(owner, target)
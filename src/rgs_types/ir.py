@@ -0,0 +1,187 @@
+import sys
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Union
+from urllib.parse import urljoin
+
+if TYPE_CHECKING:
+    from .schema_models import JSONSchema
+
+# Field names shared with JSONSchema so generators can read either representation.
+SCHEMA_FIELDS = (
+    "schema_uri", "id", "cpp_namespace", "python_namespace", "title", "description",
+    "type", "properties", "required", "items", "enum", "default", "ref", "anchor", "defs",
+    "readOnly", "writeOnly", "minimum", "exclusiveMinimum", "maximum",
+    "exclusiveMaximum", "minLength", "maxLength", "pattern", "minItems", "maxItems",
+)
+
+_STRING_FIELDS = frozenset((
+    "schema_uri", "id", "cpp_namespace", "python_namespace", "title", "description",
+    "type", "ref", "anchor", "pattern",
+))
+
+class SchemaNode:
+    """
+    Immutable, slotted node of the schema intermediate representation (IR).
+
+    Mirrors the attributes of JSONSchema, but stores `properties`/`defs` as read-only
+    mappings, `required` as a frozenset and `items`/`enum` as tuples. Nodes are
+    hash-consed by IRBuilder, so structurally identical subschemas are the same object.
+    """
+    __slots__ = SCHEMA_FIELDS
+
+    def __init__(self, **fields: Any):
+        set_field = object.__setattr__
+        for name in SCHEMA_FIELDS:
+            set_field(self, name, fields.get(name))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"SchemaNode is immutable (cannot set '{name}')")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"SchemaNode is immutable (cannot delete '{name}')")
+
+    def __reduce__(self):
+        # MappingProxyType cannot be pickled, so ship plain dicts and re-wrap them
+        fields = {}
+        for name in SCHEMA_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                fields[name] = dict(value) if name in ("properties", "defs") else value
+        return (_restore_node, (fields,))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in ("title", "type", "ref")
+            if getattr(self, name) is not None
+        )
+        return f"SchemaNode({fields})"
+
+def _restore_node(fields: Dict[str, Any]) -> SchemaNode:
+    """Unpickling hook for SchemaNode."""
+    for name in ("properties", "defs"):
+        if name in fields:
+            fields[name] = MappingProxyType(fields[name])
+    return SchemaNode(**fields)
+
+def _freeze(value: Any) -> Any:
+    """Returns a hashable equivalent of a JSON value, for use in sharing keys."""
+    if isinstance(value, dict):
+        return ("__dict__", tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("__list__", tuple(_freeze(v) for v in value))
+    # bool/int/float compare equal (True == 1 == 1.0), so keep the type in the key
+    return (type(value).__name__, value)
+
+def canonical_key(value: Any, node_key: Callable[[SchemaNode], Any]) -> Any:
+    """
+    Hashable key of a SchemaNode attribute value, equal exactly for equal values.
+    Nested subschemas are keyed by `node_key`, so callers decide how deep the key goes.
+    """
+    if isinstance(value, SchemaNode):
+        return node_key(value)
+    if isinstance(value, tuple):
+        return tuple(canonical_key(item, node_key) for item in value)
+    if isinstance(value, frozenset):
+        return tuple(sorted(value))
+    if hasattr(value, "items"):
+        return tuple((name, canonical_key(item, node_key)) for name, item in value.items())
+    # repr keeps True, 1 and 1.0 apart and makes lists/dicts hashable
+    return repr(value)
+
+class IRBuilder:
+    """
+    Converts a JSONSchema tree into SchemaNode IR.
+
+    Strings are interned and identical child tuples, mappings and nodes are shared,
+    so large bundles with repetitive definitions collapse into a compact graph.
+
+    With a `base_uri`, every `$ref` is made absolute against it (or against the
+    `$id` of the enclosing nested resource), so refs from different documents to the
+    same target compare equal.
+    """
+    def __init__(self, base_uri: Optional[str] = None):
+        self.base_uri = base_uri
+        self._base = base_uri  # base URI of the resource currently being built
+        self._depth = 0
+        self._shared: Dict[Any, Any] = {}
+
+    def _share(self, key: Any, value: Any) -> Any:
+        return self._shared.setdefault(key, value)
+
+    def _intern(self, value: Any) -> Any:
+        return sys.intern(value) if isinstance(value, str) else value
+
+    def _mapping(self, models: Optional[Dict[str, "JSONSchema"]]) -> Optional[Mapping[str, SchemaNode]]:
+        if models is None:
+            return None
+        nodes = {sys.intern(name): self.build(model) for name, model in models.items()}
+        key = ("__mapping__", tuple((name, id(node)) for name, node in nodes.items()))
+        return self._share(key, MappingProxyType(nodes))
+
+    def build(self, model: "JSONSchema") -> SchemaNode:
+        outer_base = self._base
+        # A nested $id starts a new resource; refs inside it resolve against that id
+        if self._depth and model.id and outer_base:
+            self._base = urljoin(outer_base, model.id)
+        self._depth += 1
+        try:
+            return self._build(model)
+        finally:
+            self._depth -= 1
+            self._base = outer_base
+
+    def _build(self, model: "JSONSchema") -> SchemaNode:
+        fields: Dict[str, Any] = {}
+        key_parts = []
+        # Most of the ~25 fields are unset, so only visit the populated ones
+        for name, value in model.__dict__.items():
+            if value is None:
+                continue
+            if name in ("properties", "defs"):
+                value = self._mapping(value)
+                key_part = id(value)
+            elif name == "items":
+                if isinstance(value, list):
+                    value = tuple(self.build(item) for item in value)
+                    value = self._share(("__items__", tuple(id(v) for v in value)), value)
+                    key_part = ("__items__", id(value))
+                else:
+                    value = self.build(value)
+                    key_part = id(value)
+            elif name == "required":
+                value = frozenset(sys.intern(v) for v in value)
+                value = self._share(("__required__", value), value)
+                key_part = value
+            elif name == "enum":
+                value = tuple(self._intern(v) for v in value)
+                key_part = _freeze(value)
+                value = self._share(("__enum__", key_part), value)
+            elif name in _STRING_FIELDS:
+                if name == "ref" and self._base:
+                    value = urljoin(self._base, value)
+                value = sys.intern(value)
+                key_part = value
+            else:
+                key_part = _freeze(value)
+            fields[name] = value
+            key_parts.append((name, key_part))
+
+        key = ("__node__", tuple(key_parts))
+        node = self._shared.get(key)
+        if node is None:
+            node = self._shared[key] = SchemaNode(**fields)
+        return node
+
+def build_ir(schema: Union["JSONSchema", SchemaNode]) -> SchemaNode:
+    """
+    Returns the IR for a parsed schema.
+
+    The IR of a root JSONSchema is built once and cached on the model, so several
+    generators fed the same parsed schema share a single IR.
+    """
+    if isinstance(schema, SchemaNode):
+        return schema
+    if schema._ir is None:
+        schema._ir = IRBuilder().build(schema)
+    return schema._ir
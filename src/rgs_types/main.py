@@ -1,14 +1,23 @@
 import typer
+import contextlib
+import importlib
+import io
 import json
+import os
+import sys
 from enum import Enum
-from typing import Optional, List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, List, Sequence, Tuple, Type
 from pathlib import Path
-from rich import print
-from pydantic import ValidationError
-from .parser import parse_schema_file
-from .generators.python import PythonGenerator
-from .generators.cpp import CppGenerator
-from .generators.typescript import TypeScriptGenerator
+from .console import print
+from .cache import SchemaCache
+from .files import digest_file
+from .manifest import BuildManifest
+from .parser import path_for_uri
+from .registry import DocumentRegistry
+from .generators.environment import clear_bytecode_cache, get_template, use_bytecode_cache
+
+if TYPE_CHECKING:
+    from .generators.base import CodeGenerator, SchemaContext
 
 app = typer.Typer()
 
@@ -16,11 +25,304 @@ class TargetLanguage(str, Enum):
     cpp = "cpp"
     python = "python"
     typescript = "typescript"
+    all = "all"
+
+class CppLayout(str, Enum):
+    single = "single"
+    split = "split"
+
+# (module, class) per language: a generator and its dependencies are only imported
+# when its language is selected
+GENERATORS = {
+    TargetLanguage.cpp: (".generators.cpp", "CppGenerator"),
+    TargetLanguage.python: (".generators.python", "PythonGenerator"),
+    TargetLanguage.typescript: (".generators.typescript", "TypeScriptGenerator"),
+}
+
+def load_generator(target: TargetLanguage) -> Type["CodeGenerator"]:
+    """Imports and returns the generator class for a target language."""
+    module, name = GENERATORS[target]
+    return getattr(importlib.import_module(module, __package__), name)
+
+def _is_validation_error(error: Exception) -> bool:
+    # pydantic is only loaded once a schema has actually been validated
+    pydantic = sys.modules.get("pydantic")
+    return pydantic is not None and isinstance(error, pydantic.ValidationError)
+
+def report_error(path: Path, error: Exception):
+    """Prints why generating the schema at `path` failed."""
+    if isinstance(error, json.JSONDecodeError):
+        print(f"[bold red]JSON Parse Error:[/bold red] The file '{path}' is not valid JSON.")
+        print(f"Details: {error}")
+    elif _is_validation_error(error):
+        print(f"[bold red]Schema Validation Error:[/bold red] The file '{path}' does not match the expected schema structure.")
+        print(f"Details: {error}")
+    else:
+        print(f"[bold red]Unexpected Error processing '{path}':[/bold red] {error}")
+
+def generator_kwargs(generator_options: Optional[Dict[str, Dict[str, Any]]], target: TargetLanguage) -> Dict[str, Any]:
+    """Keyword arguments for the generator of `target`, from the per-language options."""
+    return dict((generator_options or {}).get(target.value, {}))
+
+def expand_languages(langs: List[TargetLanguage]) -> List[TargetLanguage]:
+    """Expands `all` and drops duplicates, keeping the order given on the command line."""
+    expanded: List[TargetLanguage] = []
+    for lang in langs:
+        for target in (GENERATORS if lang == TargetLanguage.all else (lang,)):
+            if target not in expanded:
+                expanded.append(target)
+    return expanded
+
+def codec_collisions(contexts: Iterable[Tuple[Path, "SchemaContext"]]) -> Dict[str, List[Path]]:
+    """
+    C++ types defined in the own output of several schemas, by qualified name. Their
+    out-of-line codecs (`--cpp-codec-source`) would be defined in several source files.
+    """
+    from .generators.cpp import qualified_names
+    defined: Dict[str, List[Path]] = {}
+    for path, context in contexts:
+        for name in qualified_names(context):
+            defined.setdefault(name, []).append(path)
+    return {name: paths for name, paths in defined.items() if len(paths) > 1}
+
+def describe_collisions(collisions: Dict[str, List[Path]]) -> str:
+    names = ", ".join(f"{name} ({', '.join(path.name for path in paths)})" for name, paths in sorted(collisions.items()))
+    return f"C++ codecs of types defined by several schemas would be defined in several source files: {names}"
+
+def _load_contexts(
+    schema_paths: List[Path], registry: DocumentRegistry, merge_inline: bool
+) -> Iterator[Tuple[Path, "SchemaContext"]]:
+    """Contexts of the schemas that load; the others are left to the generation to report."""
+    from .generators.base import SchemaContext
+    for path in schema_paths:
+        try:
+            resolver = registry.load(path)
+        except Exception:
+            continue
+        yield path, SchemaContext(resolver.root, resolver, merge_inline)
+
+def generate_schema(
+    path: Path,
+    registry: DocumentRegistry,
+    languages: Sequence[TargetLanguage],
+    output_dir: Path,
+    manifest: Optional[BuildManifest] = None,
+    force: bool = False,
+    merge_inline: bool = True,
+    generator_options: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> bool:
+    """
+    Generates every language for one schema file. Errors are printed; returns False on failure.
+
+    With a manifest, a schema whose inputs and outputs are unchanged since the recorded
+    run is skipped (unless `force`), and the result of generating it is recorded.
+    """
+    split = len(languages) > 1
+    options: Dict[str, Any] = {"split": split, "merge_inline": merge_inline}
+    if generator_options:
+        options["generator_options"] = generator_options
+    if manifest is not None and not force and manifest.is_up_to_date(path, [t.value for t in languages], options):
+        print(f"[bold green]Schema unchanged, skipping:[/bold green] {path}")
+        return True
+
+    print(f"[bold green]Parsing schema:[/bold green] {path}")
+    
+    try:
+        from .generators.base import SchemaContext
+        input_digest = digest_file(path)
+        resolver = registry.load(path)
+        schema = resolver.root
+        print(f"[bold blue]Schema Title:[/bold blue] {schema.title}")
+
+        # Parsing, resolution and analysis are shared; only rendering is per language
+        context = SchemaContext(schema, resolver, merge_inline)
+        outputs = {}
+        for target in languages:
+            target_dir = output_dir / target.value if split else output_dir
+            generator = load_generator(target)(
+                schema, target_dir, resolver, context, **generator_kwargs(generator_options, target)
+            )
+            generator.generate()
+            outputs[target.value] = generator.outputs
+
+        if manifest is not None:
+            dependencies = [
+                path_for_uri(uri) for uri in resolver.dependencies if uri.startswith("file:")
+            ]
+            manifest.record(path, input_digest, dependencies, options, outputs)
+
+    except Exception as e:
+        report_error(path, e)
+        return False
+    return True
+
+def generate_shared(
+    schema_paths: List[Path],
+    registry: DocumentRegistry,
+    languages: Sequence[TargetLanguage],
+    output_dir: Path,
+    manifest: Optional[BuildManifest] = None,
+    force: bool = False,
+    merge_inline: bool = True,
+    generator_options: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> bool:
+    """
+    Generates all schemas together, emitting every type that is defined identically in
+    several of them once into a common module (see plan_shared_types) that the
+    per-schema outputs import. Returns False, without generating anything, if a
+    schema fails to load.
+
+    Which types are shared depends on every input, so each schema's manifest entry
+    depends on all of them and the run is only skipped if none changed.
+    """
+    split = len(languages) > 1
+    lang_names = [t.value for t in languages]
+    options: Dict[str, Any] = {
+        "split": split,
+        "merge_inline": merge_inline,
+        "shared": sorted(str(path) for path in schema_paths),
+    }
+    if generator_options:
+        options["generator_options"] = generator_options
+    if manifest is not None and not force and all(
+        manifest.is_up_to_date(path, lang_names, options) for path in schema_paths
+    ):
+        for path in schema_paths:
+            print(f"[bold green]Schema unchanged, skipping:[/bold green] {path}")
+        return True
+
+    from .generators.base import SchemaContext
+    from .generators.shared import COMMON_MODULE, plan_shared_types
+    contexts = []
+    input_digests = []
+    for path in schema_paths:
+        print(f"[bold green]Parsing schema:[/bold green] {path}")
+        try:
+            input_digests.append(digest_file(path))
+            resolver = registry.load(path)
+            print(f"[bold blue]Schema Title:[/bold blue] {resolver.root.title}")
+            contexts.append(SchemaContext(resolver.root, resolver, merge_inline))
+        except Exception as e:
+            report_error(path, e)
+            return False
+
+    try:
+        shared = plan_shared_types(contexts)
+        print(
+            f"[bold blue]Shared types:[/bold blue] {len(shared.classes) + len(shared.enums)} "
+            f"emitted once into {COMMON_MODULE}"
+        )
+        for context in contexts:
+            context.shared = shared
+        # Types of one name that differ are not shared, so out-of-line codecs can still clash
+        if TargetLanguage.cpp in languages and generator_kwargs(generator_options, TargetLanguage.cpp).get("codec_source"):
+            collisions = codec_collisions(zip(schema_paths, contexts))
+            if collisions:
+                print(
+                    f"[bold red]Error:[/bold red] {describe_collisions(collisions)}; "
+                    "rename them or give the schemas different x-cpp-namespaces."
+                )
+                return False
+
+        outputs: List[Dict[str, Dict[Path, str]]] = [{} for _ in contexts]
+        for target in languages:
+            target_dir = output_dir / target.value if split else output_dir
+            generator_cls = load_generator(target)
+            kwargs = generator_kwargs(generator_options, target)
+            generator = None
+            for context, schema_outputs in zip(contexts, outputs):
+                generator = generator_cls(context.schema, target_dir, context=context, **kwargs)
+                generator.generate()
+                schema_outputs[target.value] = generator.outputs
+            # The common module is an output of every schema
+            generator.outputs = {}
+            generator.generate_common()
+            for schema_outputs in outputs:
+                schema_outputs[target.value].update(generator.outputs)
+    except Exception as e:
+        print(f"[bold red]Unexpected Error generating shared types:[/bold red] {e}")
+        return False
+
+    if manifest is not None:
+        for path, input_digest, context, schema_outputs in zip(schema_paths, input_digests, contexts, outputs):
+            dependencies = [
+                path_for_uri(uri) for uri in context.resolver.dependencies if uri.startswith("file:")
+            ]
+            dependencies.extend(other for other in schema_paths if other != path)
+            manifest.record(path, input_digest, dependencies, options, schema_outputs)
+    return True
+
+# Per-process state of the --jobs workers, set up once by _init_worker
+_worker_args: Optional[
+    Tuple[DocumentRegistry, List[TargetLanguage], Path, BuildManifest, bool, bool, Optional[Dict[str, Dict[str, Any]]]]
+] = None
+
+def _init_worker(
+    search_paths: List[Path],
+    cache_dir: Optional[Path],
+    languages: List[TargetLanguage],
+    output_dir: Path,
+    force: bool,
+    merge_inline: bool,
+    generator_options: Optional[Dict[str, Dict[str, Any]]],
+):
+    global _worker_args
+    # Workers share the on-disk schema and template caches of the parent run
+    cache = SchemaCache(cache_dir) if cache_dir is not None else None
+    use_bytecode_cache(cache_dir)
+    registry = DocumentRegistry(cache=cache, search_paths=search_paths)
+    _worker_args = (
+        registry, languages, output_dir, BuildManifest.load(output_dir), force, merge_inline, generator_options
+    )
+
+def _generate_in_worker(path: Path) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    # Console output is captured and replayed by the parent in input order
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        ok = generate_schema(path, *_worker_args)
+    manifest = _worker_args[3]
+    return ok, output.getvalue(), manifest.entries.get(str(path))
+
+def generate_parallel(
+    schema_paths: List[Path],
+    jobs: int,
+    cache_dir: Optional[Path],
+    languages: List[TargetLanguage],
+    output_dir: Path,
+    manifest: BuildManifest,
+    force: bool = False,
+    merge_inline: bool = True,
+    generator_options: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> bool:
+    """
+    Generates schemas in a pool of `jobs` processes. Every schema is processed even if
+    some fail; their output and errors are reported in input order, and the workers'
+    manifest entries are merged into `manifest`.
+    """
+    # Forked workers inherit the compiled templates; spawned ones load the bytecode cache
+    for target in languages:
+        get_template(load_generator(target).template_name)
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(schema_paths) // (jobs * 4))
+    ok = True
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(schema_paths, cache_dir, languages, output_dir, force, merge_inline, generator_options),
+    ) as pool:
+        results = pool.map(_generate_in_worker, schema_paths, chunksize=chunksize)
+        for path, (schema_ok, output, entry) in zip(schema_paths, results):
+            typer.echo(output, nl=False)
+            ok = ok and schema_ok
+            if entry is not None:
+                manifest.entries[str(path)] = entry
+    return ok
 
 @app.command()
 def generate(
-    schema_paths: List[Path] = typer.Argument(
-        ..., 
+    schema_paths: Optional[List[Path]] = typer.Argument(
+        None, 
         help="Path(s) to the JSON Schema file(s) to be parsed.", 
         exists=True, 
         file_okay=True, 
@@ -37,10 +339,68 @@ def generate(
         writable=True, 
         resolve_path=True
     ),
-    lang: TargetLanguage = typer.Option(
-        TargetLanguage.cpp, 
+    lang: List[TargetLanguage] = typer.Option(
+        [TargetLanguage.cpp], 
         "--lang", "-l", 
-        help="Target programming language for code generation."
+        help="Target programming language for code generation. Repeat it or use 'all' to generate "
+             "several languages from a single parse; each language is then written to <output>/<lang>."
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        "--cache-dir",
+        help="Directory for cached parsed schemas and compiled templates. Defaults to $RGS_CACHE_DIR or ~/.cache/rgs_types.",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Always re-parse schemas and recompile templates instead of using the on-disk caches."
+    ),
+    clear_cache: bool = typer.Option(
+        False,
+        "--clear-cache",
+        help="Remove all cached parsed schemas and compiled templates before generating."
+    ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs", "-j",
+        min=0,
+        help="Number of worker processes generating schemas in parallel (0 = one per CPU)."
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="Regenerate every schema, even those unchanged since the last run recorded in the output directory."
+    ),
+    nominal_types: bool = typer.Option(
+        False,
+        "--nominal-types",
+        help="Generate a separate type for every inline object, instead of one type per distinct object shape."
+    ),
+    shared_types: bool = typer.Option(
+        False,
+        "--shared-types",
+        help="Emit types defined identically in several input schemas once, into a common "
+             "rgs_common module/header that the per-schema outputs import. Runs in a single process."
+    ),
+    cpp_pmr: bool = typer.Option(
+        False,
+        "--cpp-pmr",
+        help="Generate allocator-aware C++ types with std::pmr strings and vectors, so whole "
+             "messages can be decoded into a memory resource such as an arena."
+    ),
+    cpp_layout: CppLayout = typer.Option(
+        CppLayout.single,
+        "--cpp-layout",
+        help="'single' writes one self-contained header per schema. 'split' writes a light header per type, "
+             "the JSON codecs in <schema>_json.hpp and the runtime in a shared rgs_runtime.hpp."
+    ),
+    cpp_codec_source: bool = typer.Option(
+        False,
+        "--cpp-codec-source",
+        help="With --cpp-layout split, define the JSON codecs out of line in <schema>.cpp instead of <schema>_json.hpp."
     )
 ):
     """
@@ -49,36 +409,71 @@ def generate(
     This tool parses standard JSON Schema files and generates corresponding data models
     in the specified target language (C++, Python, or TypeScript).
     """
-    for path in schema_paths:
-        print(f"[bold green]Parsing schema:[/bold green] {path}")
-        
-        try:
-            schema = parse_schema_file(path)
-            print(f"[bold blue]Schema Title:[/bold blue] {schema.title}")
-            
-            if lang == TargetLanguage.python:
-                generator = PythonGenerator(schema, output_dir)
-                generator.generate()
-            elif lang == TargetLanguage.cpp:
-                generator = CppGenerator(schema, output_dir)
-                generator.generate()
-            elif lang == TargetLanguage.typescript:
-                generator = TypeScriptGenerator(schema, output_dir)
-                generator.generate()
-            else:
-                print(f"[yellow]Generating {lang.value} code to {output_dir}... (Not implemented yet)[/yellow]")
-
-        except json.JSONDecodeError as e:
-            print(f"[bold red]JSON Parse Error:[/bold red] The file '{path}' is not valid JSON.")
-            print(f"Details: {e}")
-            raise typer.Exit(code=1)
-        except ValidationError as e:
-            print(f"[bold red]Schema Validation Error:[/bold red] The file '{path}' does not match the expected schema structure.")
-            print(f"Details: {e}")
-            raise typer.Exit(code=1)
-        except Exception as e:
-            print(f"[bold red]Unexpected Error processing '{path}':[/bold red] {e}")
-            raise typer.Exit(code=1)
+    cache = SchemaCache(cache_dir)
+    if clear_cache:
+        cache.clear()
+        clear_bytecode_cache(cache.cache_dir)
+        print(f"[bold yellow]Cleared schema cache:[/bold yellow] {cache.cache_dir}")
+    if not schema_paths:
+        if clear_cache:
+            return
+        raise typer.BadParameter("Missing argument 'SCHEMA_PATHS...'.", param_hint="SCHEMA_PATHS")
+
+    use_bytecode_cache(None if no_cache else cache.cache_dir)
+    languages = expand_languages(lang)
+    jobs = min(jobs or os.cpu_count() or 1, len(schema_paths))
+    # Without caches every schema is regenerated; the manifest is still updated
+    force = force or no_cache
+    merge_inline = not nominal_types
+    # Language-specific options, passed to the generator's constructor
+    if cpp_codec_source and cpp_layout != CppLayout.split:
+        raise typer.BadParameter("--cpp-codec-source needs --cpp-layout split.", param_hint="--cpp-codec-source")
+    generator_options: Dict[str, Dict[str, Any]] = {}
+    cpp_options: Dict[str, Any] = {}
+    if cpp_pmr:
+        cpp_options["pmr"] = True
+    if cpp_layout != CppLayout.single:
+        cpp_options["layout"] = cpp_layout.value
+    if cpp_codec_source:
+        cpp_options["codec_source"] = True
+    if cpp_options:
+        generator_options[TargetLanguage.cpp.value] = cpp_options
+    registry = DocumentRegistry(cache=None if no_cache else cache, search_paths=schema_paths)
+    if cpp_codec_source and TargetLanguage.cpp in languages and not shared_types and len(schema_paths) > 1:
+        collisions = codec_collisions(_load_contexts(schema_paths, registry, merge_inline))
+        if collisions:
+            raise typer.BadParameter(
+                f"{describe_collisions(collisions)}, and would fail to link. Pass --shared-types to define "
+                "identical types once, or give the schemas different x-cpp-namespaces.",
+                param_hint="--cpp-codec-source",
+            )
+    manifest = BuildManifest.load(output_dir)
+
+    try:
+        if shared_types:
+            if not generate_shared(
+                schema_paths, registry, languages, output_dir, manifest, force, merge_inline, generator_options
+            ):
+                raise typer.Exit(code=1)
+            return
+
+        if jobs > 1:
+            cache_root = None if no_cache else cache.cache_dir
+            if not generate_parallel(
+                schema_paths, jobs, cache_root, languages, output_dir, manifest, force, merge_inline,
+                generator_options,
+            ):
+                raise typer.Exit(code=1)
+            return
+
+        # One registry per run: documents referenced by several schemas are parsed once
+        for path in schema_paths:
+            if not generate_schema(
+                path, registry, languages, output_dir, manifest, force, merge_inline, generator_options
+            ):
+                raise typer.Exit(code=1)
+    finally:
+        manifest.save()
 
 if __name__ == "__main__":
     app()
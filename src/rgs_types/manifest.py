@@ -0,0 +1,125 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Sequence, Union
+from . import __version__
+from .files import atomic_write, digest_bytes, digest_file
+
+MANIFEST_NAME = ".rgs-manifest.json"
+MANIFEST_FORMAT = 1
+
+# Files whose content decides the generated output: the generator logic and its templates
+SOURCE_PATTERNS = ("*.py", "*.j2")
+
+def source_fingerprint(root: Path) -> str:
+    """Hash of the Python sources and templates under `root`, with their relative paths."""
+    parts = []
+    for path in sorted(path for pattern in SOURCE_PATTERNS for path in root.rglob(pattern)):
+        parts.append(path.relative_to(root).as_posix().encode())
+        parts.append(path.read_bytes())
+    return digest_bytes(b"\0".join(parts))
+
+@lru_cache(maxsize=None)
+def generator_fingerprint() -> str:
+    """
+    Identifies the code generator: the rgs_types version, its Python sources and its
+    templates, so a change to the generator logic invalidates manifests even when
+    the version is not bumped.
+    """
+    return digest_bytes(b"\0".join([__version__.encode(), source_fingerprint(Path(__file__).parent).encode()]))
+
+class BuildManifest:
+    """
+    Record of a previous `rgs-gen` run, stored as `.rgs-manifest.json` in the output
+    directory.
+
+    For every schema it keeps the hash of the schema file and of each document its
+    refs reached, the generation options and the hash of every file generated per
+    language. A schema whose inputs, options and outputs all still match can be
+    skipped without parsing it. Entries written by a different generator version
+    (or sources) are discarded on load.
+    """
+    def __init__(self, output_dir: Union[str, Path]):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, output_dir: Union[str, Path]) -> "BuildManifest":
+        manifest = cls(output_dir)
+        try:
+            data = json.loads(manifest.path.read_text())
+        except (OSError, ValueError):
+            return manifest
+        if (
+            isinstance(data, dict)
+            and data.get("format") == MANIFEST_FORMAT
+            and data.get("generator") == generator_fingerprint()
+        ):
+            manifest.entries = data.get("schemas", {})
+        return manifest
+
+    def save(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        data = {"format": MANIFEST_FORMAT, "generator": generator_fingerprint(), "schemas": self.entries}
+        atomic_write(self.path, json.dumps(data, indent=2, sort_keys=True).encode())
+
+    def is_up_to_date(self, schema_path: Path, languages: Sequence[str], options: Dict[str, Any]) -> bool:
+        """True if `schema_path` was generated for `languages` from the same inputs and options."""
+        entry = self.entries.get(str(schema_path))
+        if entry is None or entry["options"] != options:
+            return False
+        if any(lang not in entry["outputs"] for lang in languages):
+            return False
+        try:
+            if digest_file(schema_path) != entry["input"]:
+                return False
+            for dependency, digest in entry["dependencies"].items():
+                if digest_file(dependency) != digest:
+                    return False
+            for lang in languages:
+                for output, digest in entry["outputs"][lang].items():
+                    if digest_file(self.output_dir / output) != digest:
+                        return False
+        except OSError:
+            return False
+        return True
+
+    def record(
+        self,
+        schema_path: Path,
+        input_digest: str,
+        dependencies: Iterable[Path],
+        options: Dict[str, Any],
+        outputs: Dict[str, Dict[Path, str]],
+    ):
+        """
+        Stores the result of generating `schema_path`. `outputs` maps each language to
+        the digests of the files written for it; outputs of other languages are kept
+        if the inputs have not changed since they were recorded.
+        """
+        dependency_digests = {}
+        for dependency in sorted(set(dependencies)):
+            try:
+                dependency_digests[str(dependency)] = digest_file(dependency)
+            except OSError:
+                continue  # vanished since it was read; the next run regenerates
+
+        key = str(schema_path)
+        entry = self.entries.get(key)
+        if (
+            entry is None
+            or entry["input"] != input_digest
+            or entry["dependencies"] != dependency_digests
+            or entry["options"] != options
+        ):
+            entry = self.entries[key] = {
+                "input": input_digest,
+                "dependencies": dependency_digests,
+                "options": options,
+                "outputs": {},
+            }
+        for lang, files in outputs.items():
+            entry["outputs"][lang] = {
+                Path(path).relative_to(self.output_dir).as_posix(): digest for path, digest in files.items()
+            }
@@ -1,10 +1,27 @@
 import json
+import os
 from pathlib import Path
-from typing import Union
-from .schema_models import JSONSchema
+from typing import TYPE_CHECKING, Optional, Union
+from urllib.parse import urlparse
+from .ir import IRBuilder, SchemaNode
 
-def parse_schema_file(file_path: Union[str, Path]) -> JSONSchema:
+# Same as urllib.request.url2pathname, without importing urllib.request (and with it
+# http.client, email and ssl) at startup
+if os.name == "nt":
+    from nturl2path import url2pathname
+else:
+    from urllib.parse import unquote as url2pathname
+
+if TYPE_CHECKING:
+    from .cache import SchemaCache
+    from .schema_models import JSONSchema
+
+# pydantic (via schema_models) is imported on first parse only: CLI runs served
+# entirely from the parsed-schema cache never need it.
+
+def parse_schema_file(file_path: Union[str, Path]) -> "JSONSchema":
     """Parses a JSON schema file into a JSONSchema model."""
+    from .schema_models import JSONSchema
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"Schema file not found: {file_path}")
@@ -14,7 +31,43 @@ def parse_schema_file(file_path: Union[str, Path]) -> JSONSchema:
     
     return JSONSchema(**data)
 
-def parse_schema_string(schema_string: str) -> JSONSchema:
+def parse_schema_string(schema_string: str) -> "JSONSchema":
     """Parses a JSON schema string into a JSONSchema model."""
+    from .schema_models import JSONSchema
     data = json.loads(schema_string)
     return JSONSchema(**data)
+
+def schema_uri_for_path(file_path: Union[str, Path]) -> str:
+    """Returns the absolute file:// URI used as the base URI of a schema file."""
+    return Path(file_path).resolve().as_uri()
+
+def path_for_uri(uri: str) -> Path:
+    """Returns the local path of a file:// (or scheme-less) URI."""
+    return Path(url2pathname(urlparse(uri).path))
+
+def load_schema_ir(file_path: Union[str, Path], cache: Optional["SchemaCache"] = None) -> SchemaNode:
+    """
+    Parses a JSON schema file straight into the SchemaNode IR.
+
+    Every `$ref` in the result is absolute, based on the file's URI (see
+    schema_uri_for_path). With a cache, the file content hash is looked up first and
+    a hit skips JSON decoding and pydantic validation entirely.
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Schema file not found: {file_path}")
+
+    base_uri = schema_uri_for_path(path)
+    content = path.read_bytes()
+    key = None
+    if cache is not None:
+        key = cache.key(content, base_uri)
+        node = cache.get(key)
+        if node is not None:
+            return node
+
+    from .schema_models import JSONSchema
+    node = IRBuilder(base_uri).build(JSONSchema(**json.loads(content)))
+    if cache is not None:
+        cache.put(key, node)
+    return node
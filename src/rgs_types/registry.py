@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+from urllib.parse import urlparse
+from .ir import SchemaNode
+from .parser import load_schema_ir, path_for_uri, schema_uri_for_path
+from .resolver import SchemaResolver
+
+if TYPE_CHECKING:
+    from .cache import SchemaCache
+
+DEFAULT_MAX_DOCUMENTS = 256
+
+class DocumentRegistry:
+    """
+    Shared registry of schema documents used to resolve external $refs.
+
+    Documents are identified by their file:// URI and, if they declare them, their
+    root and nested `$id`s. Each document is parsed at most once while it stays in the LRU cache of
+    `max_documents` entries, and its SchemaResolver (with its pointer index) is
+    shared by every schema that references it.
+    """
+    def __init__(
+        self,
+        cache: Optional["SchemaCache"] = None,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        search_paths: Iterable[Union[str, Path]] = (),
+    ):
+        self.cache = cache
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, SchemaResolver]" = OrderedDict()
+        self._ids: Dict[str, str] = {}
+        # Files that may declare an `$id` we have not seen yet (e.g. other CLI inputs)
+        self._search_paths: List[Path] = [Path(p) for p in search_paths]
+
+    def add(self, uri: str, schema: SchemaNode) -> SchemaResolver:
+        """Registers an already parsed document under `uri` (and its `$id`)."""
+        resolver = SchemaResolver(schema, base_uri=uri, registry=self)
+        self._documents[uri] = resolver
+        self._documents.move_to_end(uri)
+        if schema.id:
+            self._ids[schema.id.rstrip("#")] = uri
+        for resource_uri in resolver.resource_uris():
+            self._ids.setdefault(resource_uri, uri)
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+        return resolver
+
+    def load(self, file_path: Union[str, Path]) -> SchemaResolver:
+        """Returns the resolver for a schema file, parsing it on first use."""
+        uri = schema_uri_for_path(file_path)
+        resolver = self._documents.get(uri)
+        if resolver is not None:
+            self._documents.move_to_end(uri)
+            return resolver
+        return self.add(uri, load_schema_ir(file_path, cache=self.cache))
+
+    def get(self, uri: str) -> SchemaResolver:
+        """
+        Returns the resolver for a document URI (without fragment).
+
+        Looks up loaded documents by URI and `$id`, then loads file:// URIs from disk
+        and finally scans the search paths for a matching `$id`.
+        """
+        uri = self._ids.get(uri, uri)
+        resolver = self._documents.get(uri)
+        if resolver is not None:
+            self._documents.move_to_end(uri)
+            return resolver
+
+        if urlparse(uri).scheme in ("", "file"):
+            path = path_for_uri(uri)
+            if path.exists():
+                return self.load(path)
+
+        while self._search_paths:
+            self.load(self._search_paths.pop(0))
+            if uri in self._ids:
+                return self.get(uri)
+
+        raise ValueError(f"Cannot find schema document for reference: {uri}")
@@ -1,39 +1,185 @@
-from typing import Any, Union, Optional
-from .schema_models import JSONSchema
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, Set, Union, Optional
+from urllib.parse import urldefrag, urljoin
+from .ir import SchemaNode
+
+if TYPE_CHECKING:
+    from .registry import DocumentRegistry
+    from .schema_models import JSONSchema
 
 class SchemaResolver:
     """
     A resolver for JSON Schema $ref tags.
-    Currently supports internal references (starting with #) using JSON Pointer (RFC 6901).
+    Supports internal references (starting with #) using JSON Pointer (RFC 6901) and,
+    given a DocumentRegistry, references into other documents by relative path or `$id`.
+
+    On first use, every subschema reachable through `properties`, `$defs` and `items`
+    is indexed in a single traversal by its JSON Pointer, its `$anchor` ("#name") and,
+    for nested resources, its `$id`. Lookups are therefore O(1) and repeated
+    resolution of a ref returns the identical node object.
     """
-    def __init__(self, root_schema: JSONSchema):
+    def __init__(
+        self,
+        root_schema: Union["JSONSchema", SchemaNode],
+        base_uri: Optional[str] = None,
+        registry: Optional["DocumentRegistry"] = None,
+    ):
         self.root = root_schema
+        self.base_uri = base_uri
+        self.registry = registry
+        self._index: Optional[Dict[str, Any]] = None
+        self._external: Dict[str, Any] = {}
+        # Base URIs of the other documents this resolver has resolved refs into
+        self.dependencies: Set[str] = set()
+        # URIs naming the root resource: the document location and its `$id`
+        self._root_uris = {base_uri}
+        if root_schema.id:
+            self._root_uris.add(urljoin(base_uri or "", root_schema.id).rstrip("#"))
+        self._root_uris.discard(None)
 
     def _decode_pointer(self, part: str) -> str:
         """Decodes JSON Pointer escape sequences ~0 and ~1."""
         return part.replace("~1", "/").replace("~0", "~")
 
-    def resolve(self, ref: str) -> JSONSchema:
+    def _encode_pointer(self, part: str) -> str:
+        """Encodes a key as a JSON Pointer reference token."""
+        return part.replace("~", "~0").replace("/", "~1")
+
+    def _build_index(self) -> Dict[str, Any]:
+        """
+        Maps every reachable subschema to its node, keyed by canonical pointer
+        ("#/..."), by anchor ("#name") and, inside nested `$id` resources, by the
+        resource URI ("<uri>", "<uri>#/...", "<uri>#name").
+        """
+        index: Dict[str, Any] = {"#": self.root, "#/": self.root}
+        # Stack entries: (pointer, node, URIs of the enclosing nested resource, pointer within it)
+        stack = [("#", self.root, (), "#")]
+        while stack:
+            pointer, node, resources, local = stack.pop()
+            if node.anchor:
+                if not resources:
+                    index.setdefault(f"#{node.anchor}", node)
+                for uri in resources:
+                    index.setdefault(f"{uri}#{node.anchor}", node)
+
+            children = []
+            for attr, token in (("properties", "properties"), ("defs", "$defs")):
+                mapping = getattr(node, attr)
+                if mapping:
+                    for name, child in mapping.items():
+                        children.append((f"/{token}/{self._encode_pointer(name)}", child))
+            items = node.items
+            if isinstance(items, (list, tuple)):
+                for idx, child in enumerate(items):
+                    children.append((f"/items/{idx}", child))
+            elif items is not None:
+                children.append(("/items", items))
+
+            for suffix, child in children:
+                child_pointer = pointer + suffix
+                if child_pointer in index:
+                    continue
+                index[child_pointer] = child
+                child_resources, child_local = resources, local + suffix
+                if child.id:
+                    parents = resources or self._root_uris
+                    child_resources = tuple(urljoin(uri, child.id).rstrip("#") for uri in parents)
+                    child_local = "#"
+                    for uri in child_resources:
+                        index.setdefault(uri, child)
+                for uri in child_resources:
+                    index.setdefault(f"{uri}{child_local}", child)
+                stack.append((child_pointer, child, child_resources, child_local))
+        return index
+
+    def resource_uris(self):
+        """Returns the absolute URIs of all nested `$id` resources in this document."""
+        if self._index is None:
+            self._index = self._build_index()
+        return [key for key in self._index if not key.startswith("#") and "#" not in key]
+
+    def resolve(self, ref: str) -> Union["JSONSchema", SchemaNode]:
         """
-        Resolves a $ref string to a JSONSchema object.
+        Resolves a $ref string to a schema node of the same kind as the root
+        (JSONSchema or SchemaNode).
+
+        A target that is itself only a `$ref` (an alias) is followed until a real
+        definition is reached.
         
         Args:
-            ref: The $ref string (e.g., "#/$defs/myType").
+            ref: The $ref string (e.g., "#/$defs/myType" or "common.json#/$defs/myType").
             
         Returns:
-            The resolved JSONSchema object.
+            The resolved JSONSchema or SchemaNode object.
             
         Raises:
-            ValueError: If the reference is invalid or cannot be resolved.
-            NotImplementedError: If the reference is external (not starting with #).
+            ValueError: If the reference is invalid, cannot be resolved or forms a cycle of aliases.
+            NotImplementedError: If the reference is external and no registry is configured.
         """
+        node = self._lookup(ref)
+        chain = [ref]
+        while self._is_alias(node):
+            if node.ref in chain:
+                raise ValueError(f"Circular $ref chain: {' -> '.join(chain + [node.ref])}")
+            chain.append(node.ref)
+            node = self._lookup(node.ref)
+        return node
+
+    def _is_alias(self, node: Union["JSONSchema", SchemaNode]) -> bool:
+        return bool(node.ref) and not (node.type or node.properties or node.items or node.enum)
+
+    def _lookup(self, ref: str) -> Union["JSONSchema", SchemaNode]:
+        """Resolves a single reference without following aliases."""
         if not ref:
             raise ValueError("Empty reference")
 
         if not ref.startswith("#"):
-            # Future: handle file paths or URLs
-            raise NotImplementedError(f"External references are not supported yet: {ref}")
+            node = self._external.get(ref)
+            if node is None:
+                node = self._external[ref] = self._lookup_external(ref)
+            return node
+
+        if self._index is None:
+            self._index = self._build_index()
+
+        node = self._index.get(ref)
+        if node is None:
+            if ref != "#" and not ref.startswith("#/"):
+                raise ValueError(f"Unknown anchor '{ref[1:]}' in reference '{ref}'")
+            # Non-canonical pointers (e.g. "#/defs/...") take the slow path once;
+            # memoizing the result keeps later lookups O(1) and identity-stable.
+            node = self._walk(ref)
+            self._index[ref] = node
+        return node
+
+    def _lookup_external(self, ref: str) -> Union["JSONSchema", SchemaNode]:
+        target = urljoin(self.base_uri, ref) if self.base_uri else ref
+        uri, fragment = urldefrag(target)
+        return self._lookup_uri(uri, fragment)
+
+    def _lookup_uri(self, uri: str, fragment: str, local_only: bool = False) -> Union["JSONSchema", SchemaNode]:
+        """Resolves an absolute URI plus fragment, delegating to the registry if needed."""
+        if uri in self._root_uris:
+            return self._lookup(f"#{fragment}")
+
+        if self._index is None:
+            self._index = self._build_index()
+        node = self._index.get(f"{uri}#{fragment}" if fragment else uri)
+        if node is not None:
+            return node
+
+        if local_only:
+            raise ValueError(f"Could not resolve '{uri}#{fragment}'")
+        if self.registry is None:
+            raise NotImplementedError(f"External references require a DocumentRegistry: {uri}#{fragment}")
+        document = self.registry.get(uri)
+        if document.base_uri:
+            self.dependencies.add(document.base_uri)
+        # Aliases are followed by the caller, which tracks the whole chain for cycles
+        return document._lookup_uri(uri, fragment, local_only=True)
 
+    def _walk(self, ref: str) -> Union["JSONSchema", SchemaNode]:
+        """Resolves a pointer by walking the schema tree part by part."""
         if ref == "#":
             return self.root
 
@@ -58,16 +204,16 @@ class SchemaResolver:
             if decoded_part in ("$defs", "defs"):
                 if hasattr(current, "defs") and current.defs is not None:
                     current = current.defs
-                elif isinstance(current, dict) and decoded_part in current:
+                elif isinstance(current, Mapping) and decoded_part in current:
                     current = current[decoded_part]
                 else:
                     raise ValueError(f"No definitions found while resolving {ref} at {decoded_part}")
-            elif isinstance(current, dict):
+            elif isinstance(current, Mapping):
                 if decoded_part in current:
                     current = current[decoded_part]
                 else:
                     raise ValueError(f"Part '{decoded_part}' not found in dictionary while resolving {ref}")
-            elif isinstance(current, list):
+            elif isinstance(current, (list, tuple)):
                 try:
                     idx = int(decoded_part)
                     current = current[idx]
@@ -81,7 +227,8 @@ class SchemaResolver:
             else:
                 raise ValueError(f"Could not resolve part '{decoded_part}' in reference '{ref}'")
 
-        if not isinstance(current, JSONSchema):
+        from .schema_models import JSONSchema
+        if not isinstance(current, (JSONSchema, SchemaNode)):
             # Fallback: if we reached a dict that should have been a JSONSchema, 
             # pydantic might not have converted it if it was in a generic Dict[str, Any].
             # But our model uses Dict[str, 'JSONSchema'] so it should be fine.
@@ -1,5 +1,5 @@
 from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 class JSONSchema(BaseModel):
     schema_uri: Optional[str] = Field(None, alias="$schema")
@@ -15,6 +15,7 @@ class JSONSchema(BaseModel):
     enum: Optional[List[Any]] = None
     default: Optional[Any] = None
     ref: Optional[str] = Field(None, alias="$ref")
+    anchor: Optional[str] = Field(None, alias="$anchor")
     defs: Optional[Dict[str, 'JSONSchema']] = Field(None, alias="$defs")
     readOnly: Optional[bool] = None
     writeOnly: Optional[bool] = None
@@ -29,6 +30,9 @@ class JSONSchema(BaseModel):
     minItems: Optional[int] = None
     maxItems: Optional[int] = None
 
+    # Cached compact IR (see rgs_types.ir.build_ir)
+    _ir: Optional[Any] = PrivateAttr(default=None)
+
     model_config = {
         "populate_by_name": True
     }
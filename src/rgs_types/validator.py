@@ -0,0 +1,305 @@
+import pickle
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Union
+from .files import digest_bytes
+from .ir import SchemaNode, build_ir
+from .resolver import SchemaResolver
+
+if TYPE_CHECKING:
+    from .schema_models import JSONSchema
+
+DEFAULT_MAX_VALIDATORS = 256
+
+Validator = Callable[[Any], None]
+
+class ValidationError(ValueError):
+    """
+    An instance that does not match its schema. `path` lists the property names and
+    array indices leading from the instance root to the invalid value.
+    """
+    def __init__(self, message: str, path: Sequence[Union[str, int]] = ()):
+        super().__init__(message)
+        self.message = message
+        self.path = list(path)
+
+    def __str__(self) -> str:
+        if not self.path:
+            return self.message
+        pointer = "".join(f"/{str(part).replace('~', '~0').replace('/', '~1')}" for part in self.path)
+        return f"{pointer}: {self.message}"
+
+# Marks absent properties, since None is a valid JSON value
+_MISSING = object()
+
+_JSON_TYPES = {dict: "object", list: "array", str: "string", int: "integer", float: "number", bool: "boolean", type(None): "null"}
+
+def _json_type(value: Any) -> str:
+    return _JSON_TYPES.get(type(value), type(value).__name__)
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """JSON equality: booleans are not numbers, 1 and 1.0 are equal."""
+    if type(a) is bool or type(b) is bool:
+        return type(a) is type(b) and a == b
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(map(_json_equal, a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[key], b[key]) for key in a)
+    return a == b
+
+def _in_enum(value: Any, values: Sequence[Any]) -> bool:
+    return any(_json_equal(value, candidate) for candidate in values)
+
+# Condition that `{v}` is NOT of the JSON type. Instances are what json.loads returns,
+# so exact type checks suffice (and keep bool apart from int)
+_NOT_TYPE = {
+    "object": "type({v}) is not dict",
+    "array": "type({v}) is not list",
+    "string": "type({v}) is not str",
+    "integer": "type({v}) is not int and not (type({v}) is float and {v}.is_integer())",
+    "number": "type({v}) is not int and type({v}) is not float",
+    "boolean": "type({v}) is not bool",
+    "null": "{v} is not None",
+}
+
+# Condition that `{v}` is of the type a group of keywords applies to
+_IS_TYPE = {
+    "number": "type({v}) is int or type({v}) is float",
+    "string": "type({v}) is str",
+    "array": "type({v}) is list",
+    "object": "type({v}) is dict",
+}
+
+# Keywords that only apply to instances of one type, grouped by that type
+_KEYWORDS = {
+    "number": ("minimum", "exclusiveMinimum", "maximum", "exclusiveMaximum"),
+    "string": ("minLength", "maxLength", "pattern"),
+    "array": ("minItems", "maxItems", "items"),
+    "object": ("properties", "required"),
+}
+
+# Numeric keyword -> (comparison that fails the check, requirement in the message), also
+# used by the validate() of generated Python classes so both report violations alike
+NUMERIC_CHECKS = {
+    "minimum": ("<", ">="),
+    "exclusiveMinimum": ("<=", ">"),
+    "maximum": (">", "<="),
+    "exclusiveMaximum": (">=", "<"),
+}
+
+def _literal(text: str) -> str:
+    """A Python f-string literal for `text`, whose `{...}` fields refer to generated names."""
+    return f"f{text!r}"
+
+def _escape(text: str) -> str:
+    """Escapes schema-provided text for use in a message f-string."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+class _Compiler:
+    """
+    Translates a schema into the source of one Python function per schema and per
+    `$ref` target, with every other subschema inlined as straight-line checks.
+    """
+    def __init__(self, resolver: SchemaResolver):
+        self.resolver = resolver
+        self.namespace: Dict[str, Any] = {
+            "ValidationError": ValidationError,
+            "_MISSING": _MISSING,
+            "_json_type": _json_type,
+            "_in_enum": _in_enum,
+            "_SCALARS": (str, int, float),
+        }
+        self.functions: Dict[SchemaNode, str] = {}
+        self.pending: List[SchemaNode] = []
+        self.lines: List[str] = []
+        self._names = 0
+
+    def _name(self, prefix: str) -> str:
+        self._names += 1
+        return f"{prefix}{self._names}"
+
+    def _constant(self, value: Any) -> str:
+        name = self._name("_c")
+        self.namespace[name] = value
+        return name
+
+    def function(self, node: SchemaNode) -> str:
+        """Name of the function validating `node`, compiled once per node."""
+        name = self.functions.get(node)
+        if name is None:
+            name = self.functions[node] = self._name("_validate")
+            self.pending.append(node)
+        return name
+
+    def compile(self, root: SchemaNode) -> Validator:
+        name = self.function(root)
+        while self.pending:
+            node = self.pending.pop()
+            body: List[str] = []
+            self._emit(node, "value", [], 1, body)
+            self.lines.append(f"def {self.functions[node]}(value):")
+            self.lines.extend(body or ["    pass"])
+        exec(compile("\n".join(self.lines), "<rgs_types.validator>", "exec"), self.namespace)
+        return self.namespace[name]
+
+    def _emit(self, node: SchemaNode, value: str, path: List[str], depth: int, lines: List[str]):
+        """Appends the checks of `node` on the variable `value`, indented `depth` levels."""
+        pad = "    " * depth
+        if node.ref:
+            call = f"{self.function(self.resolver.resolve(node.ref))}({value})"
+            if not path:
+                lines.append(f"{pad}{call}")
+            else:
+                # Errors raised by the shared function are relative to its own instance
+                lines.extend((
+                    f"{pad}try:",
+                    f"{pad}    {call}",
+                    f"{pad}except ValidationError as error:",
+                    f"{pad}    error.path[:0] = [{', '.join(path)}]",
+                    f"{pad}    raise",
+                ))
+
+        json_type = node.type
+        if json_type in _NOT_TYPE:
+            self._fail(lines, depth, path, _NOT_TYPE[json_type].format(v=value), _literal(f"must be of type {json_type}, got {{_json_type({value})}}"))
+
+        if node.enum is not None:
+            values = tuple(node.enum)
+            message = _literal(f"must be one of {_escape(repr(list(values)))}, got {{{value}!r}}")
+            if all(type(item) in (str, int, float) for item in values):
+                # Set lookup, where hashing equates 1 and 1.0 like JSON does; the type
+                # test keeps out booleans and unhashable values
+                condition = f"type({value}) not in _SCALARS or {value} not in {self._constant(frozenset(values))}"
+            else:
+                condition = f"not _in_enum({value}, {self._constant(values)})"
+            self._fail(lines, depth, path, condition, message)
+
+        for group, keywords in _KEYWORDS.items():
+            if not any(getattr(node, keyword) is not None for keyword in keywords):
+                continue
+            declared = "number" if json_type == "integer" else json_type
+            if declared is not None and declared != group:
+                continue  # e.g. minLength on a number never applies
+            checks: List[str] = []
+            # Without a declared type the keywords apply only to instances of their type
+            inner = depth if declared else depth + 1
+            getattr(self, f"_emit_{group}")(node, value, path, inner, checks)
+            if checks and not declared:
+                lines.append(f"{pad}if {_IS_TYPE[group].format(v=value)}:")
+            lines.extend(checks)
+
+    def _fail(self, lines: List[str], depth: int, path: List[str], condition: str, message: str):
+        pad = "    " * depth
+        lines.append(f"{pad}if {condition}:")
+        lines.append(f"{pad}    raise ValidationError({message}, [{', '.join(path)}])")
+
+    def _emit_number(self, node: SchemaNode, value: str, path: List[str], depth: int, lines: List[str]):
+        for keyword, (failed, expected) in NUMERIC_CHECKS.items():
+            limit = getattr(node, keyword)
+            if limit is not None:
+                self._fail(lines, depth, path, f"{value} {failed} {limit!r}", _literal(f"must be {expected} {limit!r}, got {{{value}!r}}"))
+
+    def _emit_string(self, node: SchemaNode, value: str, path: List[str], depth: int, lines: List[str]):
+        if node.minLength is not None:
+            self._fail(lines, depth, path, f"len({value}) < {node.minLength}", _literal(f"length must be >= {node.minLength}, got {{len({value})}}"))
+        if node.maxLength is not None:
+            self._fail(lines, depth, path, f"len({value}) > {node.maxLength}", _literal(f"length must be <= {node.maxLength}, got {{len({value})}}"))
+        if node.pattern is not None:
+            try:
+                compiled = re.compile(node.pattern)
+            except re.error as e:
+                raise ValueError(f"Pattern {node.pattern!r} is not supported by Python's re module: {e}") from e
+            pattern = self._constant(compiled)
+            self._fail(lines, depth, path, f"{pattern}.search({value}) is None", _literal(f"must match {{{pattern}.pattern!r}}, got {{{value}!r}}"))
+
+    def _emit_array(self, node: SchemaNode, value: str, path: List[str], depth: int, lines: List[str]):
+        if node.minItems is not None:
+            self._fail(lines, depth, path, f"len({value}) < {node.minItems}", _literal(f"item count must be >= {node.minItems}, got {{len({value})}}"))
+        if node.maxItems is not None:
+            self._fail(lines, depth, path, f"len({value}) > {node.maxItems}", _literal(f"item count must be <= {node.maxItems}, got {{len({value})}}"))
+        pad = "    " * depth
+        if isinstance(node.items, SchemaNode):
+            index, item = self._name("i"), self._name("v")
+            checks: List[str] = []
+            self._emit(node.items, item, path + [index], depth + 1, checks)
+            if checks:
+                lines.append(f"{pad}for {index}, {item} in enumerate({value}):")
+                lines.extend(checks)
+        elif node.items:
+            # Positional item schemas
+            for position, schema in enumerate(node.items):
+                item = self._name("v")
+                checks = []
+                self._emit(schema, item, path + [str(position)], depth + 1, checks)
+                if checks:
+                    lines.append(f"{pad}if len({value}) > {position}:")
+                    lines.append(f"{pad}    {item} = {value}[{position}]")
+                    lines.extend(checks)
+
+    def _emit_object(self, node: SchemaNode, value: str, path: List[str], depth: int, lines: List[str]):
+        pad = "    " * depth
+        required = node.required or frozenset()
+        properties = node.properties or {}
+        for name in sorted(required - properties.keys()):
+            self._fail(lines, depth, path, f"{name!r} not in {value}", repr(f"missing required property {name!r}"))
+        for name, schema in properties.items():
+            child = self._name("v")
+            if name in required:
+                lines.append(f"{pad}{child} = {value}.get({name!r}, _MISSING)")
+                self._fail(lines, depth, path, f"{child} is _MISSING", repr(f"missing required property {name!r}"))
+                self._emit(schema, child, path + [repr(name)], depth, lines)
+            else:
+                checks: List[str] = []
+                self._emit(schema, child, path + [repr(name)], depth + 1, checks)
+                if checks:
+                    lines.append(f"{pad}{child} = {value}.get({name!r}, _MISSING)")
+                    lines.append(f"{pad}if {child} is not _MISSING:")
+                    lines.extend(checks)
+
+_validators: "OrderedDict[str, Validator]" = OrderedDict()
+
+def schema_hash(schema: SchemaNode, resolver: SchemaResolver) -> str:
+    """
+    Digest of `schema` together with the document its `$ref`s are resolved in, so equal
+    schemas share a compiled validator.
+    """
+    data = pickle.dumps((resolver.base_uri, resolver.root, schema), protocol=pickle.HIGHEST_PROTOCOL)
+    return digest_bytes(data)
+
+def compile_validator(
+    schema: Union["JSONSchema", SchemaNode],
+    resolver: Optional[SchemaResolver] = None,
+    max_cached: int = DEFAULT_MAX_VALIDATORS,
+) -> Validator:
+    """
+    Compiles `schema` into a function that validates a decoded JSON instance (dicts,
+    lists, str, int, float, bool and None as returned by json.loads) and raises
+    ValidationError for the first violation.
+
+    Checked keywords: `type`, `enum`, `properties`, `required`, `items` (one schema or
+    one per position), `$ref` (resolved through `resolver`, recursion included), the
+    numeric bounds, `minLength`/`maxLength`/`pattern` and `minItems`/`maxItems`.
+    The schema is translated into Python source once, with each subschema unrolled into
+    inline checks and one function per `$ref` target. Validators are cached per schema
+    hash (the `max_cached` most recently used), so compiling an equal schema again is a
+    lookup. Hashing walks the schema: keep the returned function rather than calling
+    this per instance.
+
+    Raises:
+        ValueError: If a `pattern` cannot be compiled by Python's re module.
+    """
+    node = build_ir(schema)
+    resolver = resolver or SchemaResolver(node)
+    key = schema_hash(node, resolver)
+    validator = _validators.get(key)
+    if validator is not None:
+        _validators.move_to_end(key)
+        return validator
+    validator = _validators[key] = _Compiler(resolver).compile(node)
+    while len(_validators) > max_cached:
+        _validators.popitem(last=False)
+    return validator
+
+def clear_validator_cache():
+    """Drops all compiled validators."""
+    _validators.clear()
@@ -4,3 +4,8 @@ import sys
 
 # Add src to python path so we can import the module under test
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the parsed-schema cache out of the user's home directory during tests."""
+    monkeypatch.setenv("RGS_CACHE_DIR", str(tmp_path_factory.mktemp("rgs_cache")))
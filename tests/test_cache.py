@@ -0,0 +1,156 @@
+import os
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+import rgs_types.cache as cache_module
+import rgs_types.schema_models as schema_models_module
+import rgs_types.generators.environment as environment_module
+from rgs_types.cache import SchemaCache, default_cache_dir
+from rgs_types.generators.environment import clear_bytecode_cache, get_template, use_bytecode_cache
+from rgs_types.ir import SchemaNode
+from rgs_types.main import app
+from rgs_types.parser import load_schema_ir
+
+runner = CliRunner()
+
+def _count_pydantic_parses(monkeypatch):
+    calls = []
+    original = schema_models_module.JSONSchema
+    def counting(**data):
+        calls.append(1)
+        return original(**data)
+    # The parser imports JSONSchema lazily, so patching the defining module is enough
+    monkeypatch.setattr(schema_models_module, "JSONSchema", counting)
+    return calls
+
+def test_default_cache_dir_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("RGS_CACHE_DIR", str(tmp_path / "custom"))
+    assert default_cache_dir() == tmp_path / "custom"
+
+def test_cache_hit_skips_parsing(tmp_path, monkeypatch):
+    cache = SchemaCache(tmp_path / "cache")
+    calls = _count_pydantic_parses(monkeypatch)
+
+    cold = load_schema_ir("test_cases/7_refs/schema.json", cache=cache)
+    warm = load_schema_ir("test_cases/7_refs/schema.json", cache=cache)
+
+    assert len(calls) == 1
+    assert isinstance(warm, SchemaNode)
+    assert warm.title == cold.title
+    assert list(warm.defs) == list(cold.defs)
+    # Sharing inside the IR survives the round trip
+    assert warm.properties["primaryAddress"] is warm.properties["secondaryAddress"]
+
+def test_cache_key_depends_on_content_and_version(tmp_path, monkeypatch):
+    cache = SchemaCache(tmp_path)
+    key = cache.key(b'{"title": "A"}')
+    assert key != cache.key(b'{"title": "B"}')
+    monkeypatch.setattr(cache_module, "__version__", "999.0.0")
+    assert key != cache.key(b'{"title": "A"}')
+
+def test_changed_file_is_reparsed(tmp_path, monkeypatch):
+    cache = SchemaCache(tmp_path / "cache")
+    schema_file = tmp_path / "schema.json"
+    schema_file.write_text('{"title": "First", "type": "object"}')
+    assert load_schema_ir(schema_file, cache=cache).title == "First"
+    schema_file.write_text('{"title": "Second", "type": "object"}')
+    assert load_schema_ir(schema_file, cache=cache).title == "Second"
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = SchemaCache(tmp_path)
+    key = cache.key(b"{}")
+    cache.schema_dir.mkdir(parents=True)
+    (cache.schema_dir / f"{key}.pickle").write_bytes(b"not a pickle")
+    assert cache.get(key) is None
+    assert not (cache.schema_dir / f"{key}.pickle").exists()
+
+def test_lru_eviction(tmp_path):
+    node = SchemaNode(title="X" * 1000)
+    cache = SchemaCache(tmp_path)
+    cache.put("a", node)
+    entry_size = cache.size()
+    cache.max_bytes = entry_size * 2
+
+    cache.put("b", node)
+    # Make "a" the oldest, then touch it so "b" becomes least recently used
+    os.utime(cache.schema_dir / "a.pickle", (1, 1))
+    os.utime(cache.schema_dir / "b.pickle", (2, 2))
+    assert cache.get("a") is not None
+
+    cache.put("c", node)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size() <= cache.max_bytes
+
+def test_clear(tmp_path):
+    cache = SchemaCache(tmp_path)
+    cache.put("a", SchemaNode(title="A"))
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.size() == 0
+
+def test_cli_populates_and_uses_cache(monkeypatch):
+    with runner.isolated_filesystem():
+        Path("schema.json").write_text('{"title": "Cached", "type": "object"}')
+        args = ["schema.json", "--lang", "python", "--output", "out", "--cache-dir", "cache"]
+
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0
+        assert len(list(Path("cache/schemas").glob("*.pickle"))) == 1
+
+        calls = _count_pydantic_parses(monkeypatch)
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0
+        assert calls == []
+
+        result = runner.invoke(app, args + ["--no-cache"])
+        assert result.exit_code == 0
+        assert len(calls) == 1
+
+def test_cli_clear_cache_without_schemas():
+    with runner.isolated_filesystem():
+        Path("schema.json").write_text('{"title": "Cached", "type": "object"}')
+        runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out", "--cache-dir", "cache"])
+        assert list(Path("cache/schemas").glob("*.pickle"))
+
+        result = runner.invoke(app, ["--clear-cache", "--cache-dir", "cache"])
+        assert result.exit_code == 0
+        assert not list(Path("cache/schemas").glob("*.pickle"))
+
+def test_cli_requires_schema_without_clear_cache():
+    result = runner.invoke(app, [])
+    assert result.exit_code != 0
+
+@pytest.fixture
+def fresh_environment(monkeypatch):
+    """Gives the test its own process-wide Jinja environment."""
+    monkeypatch.setattr(environment_module, "_environment", None)
+    monkeypatch.setattr(environment_module, "_bytecode_dir", None)
+    yield
+    environment_module._environment = None
+
+def test_templates_compiled_once_per_process(fresh_environment):
+    from rgs_types.generators.python import PythonGenerator
+    from rgs_types.generators.cpp import CppGenerator
+    schema = SchemaNode(title="A", type="object")
+    assert PythonGenerator(schema, Path("out")).env is CppGenerator(schema, Path("out")).env
+    assert get_template("python.py.j2") is get_template("python.py.j2")
+
+def test_template_bytecode_cache(tmp_path, fresh_environment, monkeypatch):
+    use_bytecode_cache(tmp_path)
+    get_template("cpp.hpp.j2")
+    assert list((tmp_path / "templates").iterdir())
+
+    # A new process (fresh environment) loads the bytecode instead of compiling
+    environment_module._environment = None
+    use_bytecode_cache(tmp_path)
+    compiled = []
+    env = environment_module.get_environment()
+    original = env.compile
+    monkeypatch.setattr(env, "compile", lambda *args, **kwargs: compiled.append(args) or original(*args, **kwargs))
+    get_template("cpp.hpp.j2")
+    assert compiled == []
+
+    clear_bytecode_cache(tmp_path)
+    assert not list((tmp_path / "templates").iterdir())
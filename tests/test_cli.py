@@ -1,3 +1,4 @@
+import json
 from typer.testing import CliRunner
 from rgs_types.main import app
 from pathlib import Path
@@ -57,3 +58,125 @@ def test_generate_multiple_files():
         assert "schema2.json" in result.stdout
         assert (Path("out") / "obj1.py").exists()
         assert (Path("out") / "obj2.py").exists()
+
+def test_generate_all_languages_from_one_parse(monkeypatch):
+    import rgs_types.registry as registry_module
+    from rgs_types.graph import TypeGraph
+    loads = []
+    original_load = registry_module.load_schema_ir
+    monkeypatch.setattr(registry_module, "load_schema_ir", lambda path, cache=None: loads.append(path) or original_load(path, cache=cache))
+    graphs = []
+    original_init = TypeGraph.__init__
+    def counting_init(self, *args, **kwargs):
+        graphs.append(self)
+        original_init(self, *args, **kwargs)
+    monkeypatch.setattr(TypeGraph, "__init__", counting_init)
+
+    with runner.isolated_filesystem():
+        with open("schema.json", "w") as f:
+            f.write('{"title": "Obj", "type": "object", "properties": {"a": {"type": "integer"}}}')
+
+        result = runner.invoke(app, ["schema.json", "--lang", "all", "--output", "out"])
+        assert result.exit_code == 0
+        assert (Path("out") / "cpp" / "obj.hpp").exists()
+        assert (Path("out") / "python" / "obj.py").exists()
+        assert (Path("out") / "typescript" / "obj.ts").exists()
+        assert len(loads) == 1
+        assert len(graphs) == 1
+
+def test_generate_repeated_lang():
+    with runner.isolated_filesystem():
+        with open("schema.json", "w") as f:
+            f.write('{"title": "Obj", "type": "object"}')
+
+        result = runner.invoke(app, ["schema.json", "-l", "python", "-l", "typescript", "-l", "python", "--output", "out"])
+        assert result.exit_code == 0
+        assert sorted(p.name for p in Path("out").iterdir() if p.is_dir()) == ["python", "typescript"]
+        assert (Path("out") / "typescript" / "obj.ts").exists()
+
+def test_generate_parallel_jobs():
+    with runner.isolated_filesystem():
+        names = [f"obj{i}" for i in range(6)]
+        for name in names:
+            with open(f"{name}.json", "w") as f:
+                f.write(f'{{"title": "{name}", "type": "object", "properties": {{"a": {{"$ref": "common.json"}}}}}}')
+        with open("common.json", "w") as f:
+            f.write('{"title": "Common", "type": "object", "properties": {"x": {"type": "integer"}}}')
+        args = [f"{name}.json" for name in names] + ["--lang", "all"]
+
+        serial = runner.invoke(app, args + ["--output", "serial"])
+        parallel = runner.invoke(app, args + ["--output", "parallel", "-j", "3"])
+        assert serial.exit_code == 0 and parallel.exit_code == 0
+
+        # Same files, same content, progress reported in input order
+        generated = (".hpp", ".py", ".ts")
+        serial_files = sorted(p.relative_to("serial") for p in Path("serial").rglob("*") if p.suffix in generated)
+        parallel_files = sorted(p.relative_to("parallel") for p in Path("parallel").rglob("*") if p.suffix in generated)
+        assert serial_files == parallel_files and len(serial_files) == 18
+        for rel in serial_files:
+            assert (Path("serial") / rel).read_text() == (Path("parallel") / rel).read_text()
+        positions = [parallel.stdout.index(f"{name}.json") for name in names]
+        assert positions == sorted(positions)
+
+def test_generate_parallel_reports_all_errors_in_order():
+    with runner.isolated_filesystem():
+        with open("bad1.json", "w") as f:
+            f.write("{ invalid json }")
+        with open("good.json", "w") as f:
+            f.write('{"title": "Good", "type": "object"}')
+        with open("bad2.json", "w") as f:
+            f.write('{"minimum": "not_a_number"}')
+
+        result = runner.invoke(app, ["bad1.json", "good.json", "bad2.json", "--lang", "python", "--output", "out", "-j", "2"])
+        assert result.exit_code == 1
+        # Unlike a serial run, schemas after a failure are still generated
+        assert (Path("out") / "good.py").exists()
+        assert result.stdout.index("JSON Parse Error") < result.stdout.index("Schema Validation Error")
+
+def test_cli_import_is_lazy():
+    import subprocess, sys
+    src = Path(__file__).resolve().parent.parent / "src"
+    lazy = ("rich", "pydantic", "jinja2", "rgs_types.generators.cpp", "rgs_types.generators.python",
+            "rgs_types.generators.typescript")
+    probe = (
+        "import sys; sys.modules['rich'] = None; import rgs_types.main; "
+        f"print(','.join(m for m in {lazy!r} if sys.modules.get(m)))"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                            env={"PYTHONPATH": str(src)})
+    assert result.stdout.strip() == ""
+
+def test_version_matches_pyproject():
+    import re
+    import rgs_types
+    pyproject = (Path(__file__).resolve().parent.parent / "pyproject.toml").read_text()
+    assert rgs_types.__version__ == re.search(r'^version = "([^"]+)"', pyproject, re.M).group(1)
+
+def test_plain_console_output_strips_markup(capsys):
+    from rgs_types.console import print as console_print
+    console_print("[bold green]Parsing schema:[/bold green] a[0].json [type=x]")
+    assert capsys.readouterr().out == "Parsing schema: a[0].json [type=x]\n"
+
+def test_nominal_types_option(tmp_path):
+    schema = {
+        "title": "Route",
+        "type": "object",
+        "properties": {
+            "start": {"type": "object", "properties": {"x": {"type": "number"}}},
+            "end": {"type": "object", "properties": {"x": {"type": "number"}}},
+        },
+    }
+    schema_path = tmp_path / "route.json"
+    schema_path.write_text(json.dumps(schema))
+    out = tmp_path / "out"
+
+    result = runner.invoke(app, [str(schema_path), "--lang", "python", "--output", str(out)])
+    assert result.exit_code == 0, result.stdout
+    content = (out / "route.py").read_text()
+    assert "class Start:" in content and "class End:" not in content
+    assert "end: Optional[Start]" in content
+
+    # Switching the option regenerates the schema despite the manifest
+    result = runner.invoke(app, [str(schema_path), "--lang", "python", "--output", str(out), "--nominal-types"])
+    assert result.exit_code == 0, result.stdout
+    assert "class End:" in (out / "route.py").read_text()
@@ -0,0 +1,131 @@
+import json
+from rgs_types.parser import parse_schema_string
+from rgs_types.ir import build_ir
+from rgs_types.generators.base import SchemaContext
+from rgs_types.generators.collector import ARRAY, CLASS, ENUM, MAP, STRING, TypeCollector, collect_types
+from rgs_types.generators.utils import pascal_case
+
+def load(schema: dict):
+    return build_ir(parse_schema_string(json.dumps(schema)))
+
+def test_collects_language_neutral_table():
+    table = collect_types(load({
+        "title": "root object",
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "status": {"type": "string", "enum": ["on", "off"]},
+            "tags": {"type": "array", "items": {"$ref": "#/$defs/tag"}},
+            "extra": {"type": "object"},
+            "other": {"$ref": "#/$defs/tag"}
+        },
+        "required": ["name"],
+        "$defs": {"tag": {"title": "Tag", "type": "object", "properties": {"label": {"type": "string"}}}}
+    }))
+    assert table.root.name == "RootObject"
+    assert [c.name for c in table.classes] == ["Tag", "RootObject"]
+    assert [e.name for e in table.enums] == ["Status"]
+
+    fields = {f.name: f for f in table.root.fields}
+    assert fields["name"].required and not fields["status"].required
+    assert fields["name"].type.kind == STRING
+    assert fields["status"].type.kind == ENUM
+    assert fields["tags"].type.kind == ARRAY
+    assert fields["tags"].type.item.definition is table.classes[0]
+    assert fields["extra"].type.kind == MAP
+    # A ref is collected once however often it is used
+    assert fields["other"].type.kind == CLASS
+    assert fields["other"].type.definition is table.classes[0]
+
+def test_name_collisions_get_suffixes():
+    collector = TypeCollector(load({"type": "object"}))
+    names = [collector._unique_name(base) for base in ("Item", "Item", "Item_1", "Item", "Other")]
+    assert names == ["Item", "Item_1", "Item_1_1", "Item_2", "Other"]
+
+def test_enum_does_not_reuse_class_name():
+    table = collect_types(load({
+        "title": "Status",
+        "type": "object",
+        "properties": {"status": {"type": "string", "enum": ["a"]}}
+    }))
+    assert table.root.name == "Status"
+    assert table.enums[0].name == "Status_1"
+
+def test_context_shares_one_table():
+    context = SchemaContext(load({"title": "Root", "type": "object"}))
+    assert context.types is context.types
+
+def test_case_conversions_are_memoized():
+    pascal_case.cache_clear()
+    pascal_case("some_name")
+    pascal_case("some_name")
+    assert pascal_case.cache_info().hits == 1
+
+class CountingSet(set):
+    """Set counting membership tests, i.e. the names probed while making names unique."""
+    probes = 0
+
+    def __contains__(self, item):
+        self.probes += 1
+        return super().__contains__(item)
+
+def test_same_named_objects_scale_linearly():
+    count = 10000
+    schema = load({
+        "title": "Root",
+        "type": "object",
+        "properties": {
+            f"field{i}": {
+                "title": "Nested",
+                "type": "object",
+                "properties": {"value": {"type": "integer", "minimum": i}}
+            }
+            for i in range(count)
+        }
+    })
+    collector = TypeCollector(schema)
+    collector._used_names = CountingSet()
+    table = collector.collect()
+
+    names = [c.name for c in table.classes]
+    assert len(set(names)) == count + 1
+    assert names[0] == "Nested" and names[-2] == f"Nested_{count - 1}"
+    # Probing Nested_1..Nested_n for every object made this quadratic (~count**2 / 2 probes)
+    assert collector._used_names.probes <= 2 * (count + 1)
+
+SAME_SHAPE = {
+    "title": "Route",
+    "type": "object",
+    "properties": {
+        "start": {"type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}},
+        "end": {
+            "type": "object",
+            "description": "Documentation does not change the shape",
+            "properties": {"x": {"type": "number"}, "y": {"type": "number"}}
+        },
+        "center": {"title": "Point", "type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}},
+        "corner": {"title": "Point", "type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}},
+        "size": {"type": "object", "properties": {"x": {"type": "integer"}, "y": {"type": "number"}}},
+        "path": {
+            "type": "array",
+            "items": {"type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}}
+        }
+    }
+}
+
+def test_inline_objects_of_same_shape_share_a_class():
+    table = collect_types(load(SAME_SHAPE))
+    assert [c.name for c in table.classes] == ["Start", "Point", "Size", "Route"]
+    fields = {f.name: f.type for f in table.root.fields}
+    assert fields["end"].definition is fields["start"].definition
+    assert fields["path"].item.definition is fields["start"].definition
+    # Explicitly titled objects only merge with objects of the same title
+    assert fields["corner"].definition is fields["center"].definition
+    assert fields["center"].definition is not fields["start"].definition
+    assert fields["size"].definition is not fields["start"].definition
+
+def test_nominal_inline_objects():
+    table = collect_types(load(SAME_SHAPE), merge_inline=False)
+    assert [c.name for c in table.classes] == ["Start", "End", "Point", "Point_1", "Size", "PathItem", "Route"]
+    context = SchemaContext(load(SAME_SHAPE), merge_inline=False)
+    assert len(context.types.classes) == 7
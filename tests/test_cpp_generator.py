@@ -1,7 +1,12 @@
+import json
+import os
+import shutil
+import subprocess
 import pytest
 from pathlib import Path
 from typer.testing import CliRunner
 from rgs_types.main import app
+from rgs_types.generators.cpp import cpp_string
 
 runner = CliRunner()
 
@@ -285,4 +290,428 @@ def test_generate_cpp_to_from_json():
         assert "friend void to_json(nlohmann::json& j, const JsonTest& p)" in content
         assert "j = nlohmann::json{" in content
         assert "friend void from_json(const nlohmann::json& j, JsonTest& p)" in content
-        assert "p.val = j.at(\"val\").get<int64_t>();" in content
\ No newline at end of file
+        assert "p.val = j.at(\"val\").get<int64_t>();" in content
+
+def test_generate_cpp_mutual_recursion():
+    with runner.isolated_filesystem():
+        schema_content = """
+        {
+          "title": "Tree",
+          "type": "object",
+          "properties": {
+            "root": { "$ref": "#/$defs/branch" },
+            "leaf": { "$ref": "#/$defs/leaf" }
+          },
+          "$defs": {
+            "branch": {
+              "title": "Branch",
+              "type": "object",
+              "properties": {
+                "twigs": { "type": "array", "items": { "$ref": "#/$defs/twig" } },
+                "leaf": { "$ref": "#/$defs/leaf" }
+              }
+            },
+            "twig": {
+              "title": "Twig",
+              "type": "object",
+              "properties": { "branch": { "$ref": "#/$defs/branch" } },
+              "required": ["branch"]
+            },
+            "leaf": {
+              "title": "Leaf",
+              "type": "object",
+              "properties": { "color": { "type": "string" } }
+            }
+          }
+        }
+        """
+        with open("schema.json", "w") as f:
+            f.write(schema_content)
+
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--output", "out"])
+        assert result.exit_code == 0
+
+        content = Path("out/tree.hpp").read_text()
+        # Every edge inside the Branch <-> Twig cycle is boxed, edges leaving it are not
+        assert "std::optional<std::vector<std::shared_ptr<Twig>>> twigs;" in content
+        assert "std::shared_ptr<Branch> branch;" in content
+        assert "std::optional<Leaf> leaf;" in content
+        assert "std::shared_ptr<Branch> root;" not in content
+        # Both cycle members are forward declared and emitted after their dependencies
+        assert "struct Branch;" in content and "struct Twig;" in content
+        assert "struct Leaf;" not in content
+        assert content.index("struct Leaf {") < content.index("struct Branch {") < content.index("struct Tree {")
+
+STREAM_SCHEMA = """
+{
+  "title": "Stream",
+  "type": "object",
+  "properties": {
+    "userName": { "type": "string" },
+    "count": { "type": "integer" },
+    "ratio": { "type": "number" },
+    "flags": { "type": "array", "items": { "type": "boolean" } },
+    "status": { "type": "string", "enum": ["on", "off"] },
+    "extra": { "type": "object" },
+    "tree": { "$ref": "#/$defs/node" }
+  },
+  "required": ["userName"],
+  "$defs": {
+    "node": {
+      "title": "Node",
+      "type": "object",
+      "properties": { "kids": { "type": "array", "items": { "$ref": "#/$defs/node" } } }
+    }
+  }
+}
+"""
+
+def test_generate_cpp_streaming_decoder():
+    with runner.isolated_filesystem():
+        Path("schema.json").write_text(STREAM_SCHEMA)
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--output", "out"])
+        assert result.exit_code == 0
+
+        content = Path("out/stream.hpp").read_text()
+        assert "namespace rgs_runtime {" in content
+        assert "friend void read_json(rgs_runtime::json_reader& r, Stream& p)" in content
+        assert "inline void read_json(rgs_runtime::json_reader& r, Status& e)" in content
+        # Keys are dispatched on their length, then compared
+        assert "case 8:\n                if (key == \"userName\") {\n                    read_json(r, p.user_name);" in content
+        # JSON keys keep the schema's spelling in both decoders and the encoder
+        assert '{"userName", p.user_name},' in content
+        assert 'p.user_name = j.at("userName").get<std::string>();' in content
+        # The writer appends precomputed key fragments and reserves an estimate from the schema
+        assert 'w.out.append("{\\"userName\\":", 12);\n        write_json(w, p.user_name);' in content
+        assert "static constexpr std::size_t json_size_hint = " in content
+        assert "friend void write_json(std::string& out, const Stream& p)" in content
+        assert cpp_string('say "hi"\\\n') == 'say \\"hi\\"\\\\\\012'
+
+@pytest.mark.slow
+def test_cpp_streaming_decoder_matches_dom(tmp_path):
+    compiler = shutil.which("clang++") or shutil.which("g++")
+    if not compiler:
+        pytest.fail("C++ compiler (clang++ or g++) not found in PATH.")
+    (tmp_path / "schema.json").write_text(STREAM_SCHEMA)
+    result = runner.invoke(app, [str(tmp_path / "schema.json"), "--lang", "cpp", "--output", str(tmp_path)])
+    assert result.exit_code == 0
+
+    documents = [
+        {"userName": "plain", "count": 3, "ratio": 0.5, "flags": [True, False], "status": "off"},
+        # Escapes, surrogate pairs, unknown keys (skipped) and untyped values
+        {"userName": "tab\t\"quote\" é \U0001f600", "unknown": {"a": [1, {"b": None}]}, "extra": {"k": [1.5, "x"]}},
+        {"userName": "nulls", "count": None, "flags": None, "tree": None},
+        {"userName": "deep", "tree": {"kids": [{"kids": []}, {"kids": [{}]}]}, "status": "unknown"},
+        {"userName": "numbers", "count": -9223372036854775808, "ratio": 1e308},
+        {"userName": "\x01\x1f\x7f\b\f\n\r/", "ratio": -0.0, "flags": []},
+        {"userName": "float ints", "count": 2.75, "ratio": 7},
+    ]
+    (tmp_path / "documents.jsonl").write_text("\n".join(json.dumps(d) for d in documents))
+    malformed = ['{"userName": "a",}', '{"userName": "a"} x', '{"userName": 1}', '{"count": 01}', '[' * 1000]
+    (tmp_path / "malformed.jsonl").write_text("\n".join(malformed))
+
+    (tmp_path / "main.cpp").write_text("""
+    #include "stream.hpp"
+    #include <fstream>
+    #include <iostream>
+    int main() {
+        std::ifstream documents("documents.jsonl");
+        for (std::string line; std::getline(documents, line);) {
+            nlohmann::json dom = nlohmann::json::parse(line).get<Stream>();
+            Stream message = rgs_runtime::decode<Stream>(line);
+            nlohmann::json streamed = message;
+            if (dom != streamed) {
+                std::cerr << dom << " != " << streamed << std::endl;
+                return 1;
+            }
+            std::string written;
+            write_json(written, message);
+            if (nlohmann::json::parse(written) != dom) {
+                std::cerr << written << " != " << dom << std::endl;
+                return 1;
+            }
+        }
+        std::ifstream malformed("malformed.jsonl");
+        for (std::string line; std::getline(malformed, line);) {
+            try {
+                rgs_runtime::decode<Stream>(line);
+                std::cerr << "accepted " << line << std::endl;
+                return 1;
+            } catch (const rgs_runtime::json_error&) {
+            }
+        }
+        return 0;
+    }
+    """)
+    include_paths = ["-I/usr/include", "-I/usr/local/include"]
+    if "JSON_INCLUDE_DIR" in os.environ:
+        include_paths.append(f"-I{os.environ['JSON_INCLUDE_DIR']}")
+    try:
+        subprocess.run(
+            [compiler, "-std=c++17", "-Wall"] + include_paths + ["main.cpp", "-o", "main"],
+            cwd=tmp_path, check=True, capture_output=True, text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        pytest.fail(f"C++ Compilation failed.\nStderr: {e.stderr}")
+    run = subprocess.run([str(tmp_path / "main")], cwd=tmp_path, capture_output=True, text=True)
+    assert run.returncode == 0, run.stderr
+
+def test_generate_cpp_pmr():
+    with runner.isolated_filesystem():
+        Path("schema.json").write_text(STREAM_SCHEMA)
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--cpp-pmr", "--output", "out"])
+        assert result.exit_code == 0
+
+        content = Path("out/stream.hpp").read_text()
+        assert "#include <memory_resource>" in content
+        assert "std::pmr::string user_name;" in content
+        assert "std::optional<std::pmr::vector<bool>> flags;" in content
+        # Recursive members are boxes allocated from the struct's memory resource
+        assert "std::optional<std::pmr::vector<rgs_runtime::box<Node>>> kids;" in content
+        assert "std::shared_ptr<Node>" not in content
+        assert "using allocator_type = rgs_runtime::allocator_type;" in content
+        assert "explicit Stream(const allocator_type& alloc)" in content
+        assert "Stream(Stream&& other, const allocator_type& alloc)" in content
+        assert "read_json(r, p.user_name, p.get_allocator());" in content
+        assert "struct adl_serializer<rgs_runtime::box<T>>" in content
+
+        # Without the option the standard containers are used
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--output", "std"])
+        assert result.exit_code == 0
+        content = Path("std/stream.hpp").read_text()
+        assert "std::string user_name;" in content
+        assert "memory_resource" not in content and "allocator_type" not in content
+
+def test_generate_cpp_split_layout():
+    with runner.isolated_filesystem():
+        Path("schema.json").write_text(STREAM_SCHEMA)
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--cpp-layout", "split", "--output", "out"])
+        assert result.exit_code == 0
+
+        # One light header per type, declaring the codecs and only forward declaring the JSON library
+        node = Path("out/stream/node.hpp").read_text()
+        assert '#include "../rgs_runtime_fwd.hpp"' in node
+        assert "nlohmann/json.hpp" not in node and "friend" not in node
+        assert "void read_json(rgs_runtime::json_reader& r, Node& p);" in node
+        status = Path("out/stream/status.hpp").read_text()
+        assert "enum class Status {" in status and "NLOHMANN_JSON_SERIALIZE_ENUM" not in status
+        # Untyped members need the complete nlohmann::json
+        stream = Path("out/stream/stream.hpp").read_text()
+        assert "#include <nlohmann/json.hpp>" in stream
+        assert '#include "status.hpp"' in stream and '#include "node.hpp"' in stream
+
+        umbrella = Path("out/stream.hpp").read_text()
+        assert '#include "stream/stream.hpp"' in umbrella
+        codec = Path("out/stream_json.hpp").read_text()
+        assert '#include "rgs_runtime.hpp"' in codec
+        assert "inline void read_json(rgs_runtime::json_reader& r, Stream& p) {" in codec
+        assert "inline void to_json(nlohmann::json& j, const Status& e) {" in codec
+        # The serializers for optional and shared_ptr members live in the shared runtime only
+        runtime = Path("out/rgs_runtime.hpp").read_text()
+        assert "struct adl_serializer<std::optional<T>>" in runtime
+        assert "adl_serializer" not in umbrella + codec + node + stream
+
+        # Out of line, the codecs are defined once in stream.cpp
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--cpp-layout", "split", "--cpp-codec-source", "--output", "src"])
+        assert result.exit_code == 0
+        assert not Path("src/stream_json.hpp").exists()
+        source = Path("src/stream.cpp").read_text()
+        assert "#pragma once" not in source
+        assert "\nvoid read_json(rgs_runtime::json_reader& r, Stream& p) {" in source
+
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--cpp-codec-source", "--output", "bad"])
+        assert result.exit_code != 0
+
+@pytest.mark.slow
+@pytest.mark.parametrize("pmr", [False, True], ids=["std", "pmr"])
+def test_cpp_split_layout_links(tmp_path, pmr):
+    compiler = shutil.which("clang++") or shutil.which("g++")
+    if not compiler:
+        pytest.fail("C++ compiler (clang++ or g++) not found in PATH.")
+    (tmp_path / "schema.json").write_text(STREAM_SCHEMA)
+    options = ["--cpp-layout", "split", "--cpp-codec-source"] + (["--cpp-pmr"] if pmr else [])
+    result = runner.invoke(app, [str(tmp_path / "schema.json"), "--lang", "cpp", "--output", str(tmp_path)] + options)
+    assert result.exit_code == 0
+
+    # use.cpp only sees the light headers, main.cpp checks the result against the DOM path
+    (tmp_path / "use.cpp").write_text("""
+    #include "stream.hpp"
+    std::string round_trip(std::string_view text) {
+        Stream message;
+        read_json(text, message);
+        std::string out;
+        write_json(out, message);
+        return out;
+    }
+    """)
+    (tmp_path / "main.cpp").write_text("""
+    #include "rgs_runtime.hpp"
+    #include "stream.hpp"
+    #include <iostream>
+    std::string round_trip(std::string_view text);
+    int main() {
+        std::string text = R"({"userName": "a", "status": "off", "extra": {"k": [1]}, "tree": {"kids": [{}]}})";
+        nlohmann::json dom = nlohmann::json::parse(text).get<Stream>();
+        if (nlohmann::json::parse(round_trip(text)) != dom) {
+            std::cerr << round_trip(text) << " != " << dom << std::endl;
+            return 1;
+        }
+        return 0;
+    }
+    """)
+    include_paths = ["-I/usr/include", "-I/usr/local/include"]
+    if "JSON_INCLUDE_DIR" in os.environ:
+        include_paths.append(f"-I{os.environ['JSON_INCLUDE_DIR']}")
+    try:
+        subprocess.run(
+            [compiler, "-std=c++17", "-Wall"] + include_paths + ["main.cpp", "use.cpp", "stream.cpp", "-o", "main"],
+            cwd=tmp_path, check=True, capture_output=True, text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        pytest.fail(f"C++ Compilation failed.\nStderr: {e.stderr}")
+    run = subprocess.run([str(tmp_path / "main")], cwd=tmp_path, capture_output=True, text=True)
+    assert run.returncode == 0, run.stderr
+
+COLOR_SCHEMA = """
+{
+  "title": "Paint",
+  "type": "object",
+  "properties": {
+    "color": { "type": "string", "enum": ["red", "tan", "blue", "gray", "grey", "é", "9"] }
+  }
+}
+"""
+
+def test_generate_cpp_enum_strings():
+    with runner.isolated_filesystem():
+        Path("schema.json").write_text(COLOR_SCHEMA)
+        result = runner.invoke(app, ["schema.json", "--lang", "cpp", "--output", "out"])
+        assert result.exit_code == 0
+
+        content = Path("out/paint.hpp").read_text()
+        assert "NLOHMANN_JSON_SERIALIZE_ENUM" not in content
+        assert "inline constexpr std::array<Color, 7> Color_values = {" in content
+        assert "inline constexpr std::array<std::string_view, 7> Color_strings = {" in content
+        assert 'case Color::TAN:\n        return "tan";' in content
+        # Strings of one length are told apart by the byte that differs most, then compared once
+        assert "constexpr bool from_string(std::string_view text, Color& e) noexcept {" in content
+        assert "case 3:\n        switch (text[0]) {\n        case 'r':\n            if (text == \"red\") {" in content
+        assert "case 4:\n        switch (text[2]) {\n        case 'a':\n            if (text == \"gray\") {" in content
+        # Multi-byte UTF-8 values are dispatched on their length in bytes
+        assert 'case 2:\n        if (text == "é") {' in content
+        assert "if (!j.is_string() || !from_string(j.get_ref<const std::string&>(), e)) {" in content
+
+@pytest.mark.slow
+def test_cpp_enum_strings_compile(tmp_path):
+    compiler = shutil.which("clang++") or shutil.which("g++")
+    if not compiler:
+        pytest.fail("C++ compiler (clang++ or g++) not found in PATH.")
+    (tmp_path / "schema.json").write_text(COLOR_SCHEMA)
+    result = runner.invoke(app, [str(tmp_path / "schema.json"), "--lang", "cpp", "--output", str(tmp_path)])
+    assert result.exit_code == 0
+
+    (tmp_path / "main.cpp").write_text("""
+    #include "paint.hpp"
+    static_assert(to_string(Color::GREY) == "grey");
+    static_assert([] { Color c{}; return from_string("gray", c) && c == Color::GRAY; }());
+    static_assert([] { Color c = Color::TAN; return !from_string("grex", c) && c == Color::TAN; }());
+    static_assert(Color_values.size() == Color_strings.size());
+    int main() {
+        for (std::size_t i = 0; i < Color_values.size(); ++i) {
+            Color c{};
+            if (to_string(Color_values[i]) != Color_strings[i] || !from_string(Color_strings[i], c) || c != Color_values[i]) {
+                return 1;
+            }
+            if (nlohmann::json(Color_values[i]) != std::string(Color_strings[i])) {
+                return 2;
+            }
+            if (rgs_runtime::decode<Paint>(nlohmann::json{{"color", Color_strings[i]}}.dump()).color != Color_values[i]) {
+                return 3;
+            }
+        }
+        // Unknown strings decode to the first member, as before
+        return nlohmann::json("purple").get<Color>() == Color::RED ? 0 : 4;
+    }
+    """)
+    include_paths = ["-I/usr/include", "-I/usr/local/include"]
+    if "JSON_INCLUDE_DIR" in os.environ:
+        include_paths.append(f"-I{os.environ['JSON_INCLUDE_DIR']}")
+    try:
+        subprocess.run(
+            [compiler, "-std=c++17", "-Wall"] + include_paths + ["main.cpp", "-o", "main"],
+            cwd=tmp_path, check=True, capture_output=True, text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        pytest.fail(f"C++ Compilation failed.\nStderr: {e.stderr}")
+    run = subprocess.run([str(tmp_path / "main")], cwd=tmp_path, capture_output=True, text=True)
+    assert run.returncode == 0, run.stderr
+
+def address_schema(title: str, street_type: str = "string") -> str:
+    return json.dumps({
+        "title": title,
+        "type": "object",
+        "properties": {"home": {"$ref": "#/$defs/address"}, "n": {"type": "integer"}},
+        "$defs": {"address": {"title": "Address", "type": "object", "properties": {"street": {"type": street_type}}}},
+    })
+
+def test_cpp_codec_source_rejects_colliding_types():
+    with runner.isolated_filesystem():
+        Path("alpha.json").write_text(address_schema("Alpha"))
+        Path("beta.json").write_text(address_schema("Beta"))
+        split = ["--lang", "cpp", "--cpp-layout", "split", "--output", "out"]
+
+        # Both alpha.cpp and beta.cpp would define the codecs of Address
+        result = runner.invoke(app, ["alpha.json", "beta.json", "--cpp-codec-source", *split])
+        assert result.exit_code == 2
+        # The usage error may be drawn in a wrapped box
+        message = " ".join(result.output.replace("│", " ").split())
+        assert "Address (alpha.json, beta.json)" in message and "--shared-types" in message
+        assert not Path("out").exists()
+        # Inline codecs may be defined in every translation unit
+        assert runner.invoke(app, ["alpha.json", "beta.json", *split]).exit_code == 0
+
+        # Equally named types that differ are not shared
+        Path("beta.json").write_text(address_schema("Beta", street_type="integer"))
+        result = runner.invoke(app, ["alpha.json", "beta.json", "--cpp-codec-source", "--shared-types", *split])
+        assert result.exit_code == 1
+        assert "Address (alpha.json, beta.json)" in result.stdout
+
+@pytest.mark.slow
+def test_cpp_codec_sources_of_schemas_link(tmp_path):
+    compiler = shutil.which("clang++") or shutil.which("g++")
+    if not compiler:
+        pytest.fail("C++ compiler (clang++ or g++) not found in PATH.")
+    (tmp_path / "alpha.json").write_text(address_schema("Alpha"))
+    (tmp_path / "beta.json").write_text(address_schema("Beta"))
+    result = runner.invoke(app, [
+        str(tmp_path / "alpha.json"), str(tmp_path / "beta.json"), "--lang", "cpp", "--output", str(tmp_path),
+        "--cpp-layout", "split", "--cpp-codec-source", "--shared-types",
+    ])
+    assert result.exit_code == 0
+
+    (tmp_path / "main.cpp").write_text("""
+    #include "alpha.hpp"
+    #include "beta.hpp"
+    int main() {
+        Alpha alpha;
+        read_json(R"({"home": {"street": "Main"}, "n": 1})", alpha);
+        Beta beta;
+        read_json(R"({"home": {"street": "Side"}})", beta);
+        std::string out;
+        write_json(out, alpha);
+        return alpha.home->street == "Main" && beta.home->street == "Side" && !out.empty() ? 0 : 1;
+    }
+    """)
+    include_paths = ["-I/usr/include", "-I/usr/local/include"]
+    if "JSON_INCLUDE_DIR" in os.environ:
+        include_paths.append(f"-I{os.environ['JSON_INCLUDE_DIR']}")
+    sources = ["main.cpp", "alpha.cpp", "beta.cpp", "rgs_common.cpp"]
+    try:
+        subprocess.run(
+            [compiler, "-std=c++17", "-Wall"] + include_paths + sources + ["-o", "main"],
+            cwd=tmp_path, check=True, capture_output=True, text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        pytest.fail(f"C++ Compilation failed.\nStderr: {e.stderr}")
+    run = subprocess.run([str(tmp_path / "main")], cwd=tmp_path, capture_output=True, text=True)
+    assert run.returncode == 0, run.stderr
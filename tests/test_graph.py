@@ -0,0 +1,89 @@
+import json
+from rgs_types.parser import parse_schema_string
+from rgs_types.ir import build_ir
+from rgs_types.resolver import SchemaResolver
+from rgs_types.graph import TypeGraph
+
+def make_graph(schema: dict):
+    root = build_ir(parse_schema_string(json.dumps(schema)))
+    return root, TypeGraph(root, SchemaResolver(root))
+
+def test_self_recursion():
+    root, graph = make_graph({
+        "title": "Root",
+        "type": "object",
+        "properties": {"node": {"$ref": "#/$defs/node"}},
+        "$defs": {
+            "node": {
+                "type": "object",
+                "properties": {
+                    "next": {"$ref": "#/$defs/node"},
+                    "children": {"type": "array", "items": {"$ref": "#/$defs/node"}}
+                }
+            }
+        }
+    })
+    node = root.defs["node"]
+    assert graph.successors(root) == (node,)
+    assert graph.successors(node) == (node,)
+    assert graph.is_recursive(node)
+    assert not graph.is_recursive(root)
+    assert graph.needs_indirection(node, node)
+    assert not graph.needs_indirection(root, node)
+    # Dependencies come first
+    assert graph.component(node) < graph.component(root)
+
+def test_mutual_recursion_through_inline_object():
+    root, graph = make_graph({
+        "title": "Root",
+        "type": "object",
+        "properties": {
+            "a": {"$ref": "#/$defs/a"},
+            "leaf": {"$ref": "#/$defs/leaf"}
+        },
+        "$defs": {
+            "a": {
+                "type": "object",
+                "properties": {
+                    "inner": {"type": "object", "properties": {"back": {"$ref": "#/$defs/a"}}},
+                    "leaf": {"$ref": "#/$defs/leaf"}
+                }
+            },
+            "leaf": {"type": "object", "properties": {"value": {"type": "integer"}}},
+            "unused": {"type": "object", "properties": {"x": {"type": "string"}}}
+        }
+    })
+    a, leaf = root.defs["a"], root.defs["leaf"]
+    inner = a.properties["inner"]
+    assert graph.same_component(a, inner)
+    assert graph.is_recursive(a) and graph.is_recursive(inner)
+    assert not graph.is_recursive(leaf)
+    assert graph.component(leaf) < graph.component(a) < graph.component(root)
+    # Unreferenced definitions are still part of the graph
+    assert root.defs["unused"] in graph
+
+def test_enums_and_primitives_are_not_types():
+    root, graph = make_graph({
+        "type": "object",
+        "properties": {
+            "status": {"type": "string", "enum": ["a", "b"]},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "meta": {"type": "object"}
+        }
+    })
+    assert graph.successors(root) == ()
+    assert len(graph) == 1
+
+def test_large_cycle_does_not_recurse():
+    count = 20000
+    _, graph = make_graph({
+        "type": "object",
+        "properties": {"first": {"$ref": "#/$defs/t0"}},
+        "$defs": {
+            f"t{i}": {"type": "object", "properties": {"next": {"$ref": f"#/$defs/t{(i + 1) % count}"}}}
+            for i in range(count)
+        }
+    })
+    assert len(graph) == count + 1
+    assert len(graph.components) == 2
+    assert len(graph.components[0]) == count
@@ -67,7 +67,8 @@ def test_python_integration(schema_path, tmp_path, data):
         
         for sample_data in samples:
             try:
-                instance = cls.from_dict(sample_data)
+                # Samples are valid, so validation must accept them
+                instance = cls.from_dict(sample_data, validate=True)
                 output_dict = instance.to_dict()
                 assert isinstance(output_dict, dict)
             except TypeError as e:
@@ -80,13 +81,14 @@ def test_python_integration(schema_path, tmp_path, data):
 
 @pytest.mark.slow
 @pytest.mark.parametrize("schema_path", schema_files, ids=lambda p: p.parent.name)
+@pytest.mark.parametrize("pmr", [False, True], ids=["std", "pmr"])
 @given(data=st.data())
 @settings(
     deadline=None, 
     max_examples=1, 
     suppress_health_check=[HealthCheck.function_scoped_fixture]
 )
-def test_cpp_integration(schema_path, tmp_path, data):
+def test_cpp_integration(schema_path, pmr, tmp_path, data):
     """
     Generate and compile C++ once, then run multiple samples in a single batch.
     """
@@ -101,7 +103,7 @@ def test_cpp_integration(schema_path, tmp_path, data):
     header_file = tmp_path / f"{root_name.lower()}.hpp"
     bin_file = tmp_path / "test_bin"
 
-    generator = CppGenerator(schema, tmp_path)
+    generator = CppGenerator(schema, tmp_path, pmr=pmr)
     generator.generate()
     
     namespace = schema.cpp_namespace
@@ -109,6 +111,8 @@ def test_cpp_integration(schema_path, tmp_path, data):
         namespace = schema.id.split("/")[-1].split(".")[0]
         namespace = snake_case(namespace)
     ns_prefix = f"{namespace}::" if namespace else ""
+    # In pmr mode every message is decoded into an arena
+    decode_args = "line, &arena" if pmr else "line"
     
     main_cpp = tmp_path / "main.cpp"
     main_cpp.write_text(f"""
@@ -122,12 +126,28 @@ def test_cpp_integration(schema_path, tmp_path, data):
         std::ifstream f(argv[1]);
         if (!f.is_open()) return 1;
         try {{
-            nlohmann::json data_array = nlohmann::json::parse(f);
-            for (auto& data : data_array) {{
+            // One sample per line, as written by Python (non-ASCII characters escaped)
+            std::string line;
+            while (std::getline(f, line)) {{
+                nlohmann::json data = nlohmann::json::parse(line);
                 {ns_prefix}{class_name} obj;
                 from_json(data, obj);
                 nlohmann::json output;
                 to_json(output, obj);
+
+                // The streaming decoder must produce the same object as the DOM path
+                {"std::pmr::monotonic_buffer_resource arena;" if pmr else ""}
+                nlohmann::json streamed = rgs_runtime::decode<{ns_prefix}{class_name}>({decode_args});
+                if (streamed != output) {{
+                    std::cerr << "DOM and streaming decoders differ:\\n" << output << "\\n" << streamed << std::endl;
+                    return 1;
+                }}
+
+                // So must the direct writer and to_json
+                if (nlohmann::json::parse(rgs_runtime::encode(obj)) != output) {{
+                    std::cerr << "direct writer and to_json differ:\\n" << output << std::endl;
+                    return 1;
+                }}
             }}
         }} catch (const std::exception& e) {{
             std::cerr << "Error: " << e.what() << std::endl;
@@ -159,7 +179,7 @@ def test_cpp_integration(schema_path, tmp_path, data):
         raise
 
     data_file = tmp_path / "samples.json"
-    data_file.write_text(json.dumps(samples))
+    data_file.write_text("\n".join(json.dumps(sample) for sample in samples))
     
     try:
         subprocess.run([str(bin_file), "samples.json"], cwd=tmp_path, check=True, capture_output=True, text=True)
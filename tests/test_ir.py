@@ -0,0 +1,96 @@
+import pytest
+from pathlib import Path
+from rgs_types.parser import parse_schema_file, parse_schema_string
+from rgs_types.ir import SchemaNode, build_ir, canonical_key
+from rgs_types.resolver import SchemaResolver
+from rgs_types.generators.python import PythonGenerator
+
+TEST_CASE_DIR = Path(__file__).parent.parent / "test_cases"
+schema_files = list(TEST_CASE_DIR.glob("*/schema.json"))
+
+@pytest.mark.parametrize("schema_path", schema_files, ids=lambda p: p.parent.name)
+def test_build_ir_all_test_cases(schema_path):
+    model = parse_schema_file(schema_path)
+    node = build_ir(model)
+    assert isinstance(node, SchemaNode)
+    assert node.title == model.title
+    assert node.type == model.type
+    if model.properties:
+        assert list(node.properties) == list(model.properties)
+
+def test_build_ir_is_cached_on_model():
+    model = parse_schema_string('{"title": "Root", "type": "object"}')
+    assert build_ir(model) is build_ir(model)
+    node = build_ir(model)
+    assert build_ir(node) is node
+
+def test_ir_is_immutable():
+    node = build_ir(parse_schema_string('{"title": "Root", "type": "object", "properties": {"a": {"type": "string"}}}'))
+    with pytest.raises(AttributeError):
+        node.title = "Other"
+    with pytest.raises(TypeError):
+        node.properties["b"] = node
+    assert not hasattr(node, "__dict__")
+
+def test_ir_shares_identical_subschemas():
+    json_str = """
+    {
+      "type": "object",
+      "properties": {
+        "a": { "type": "object", "properties": { "x": { "type": "integer" } }, "required": ["x"] },
+        "b": { "type": "object", "properties": { "x": { "type": "integer" } }, "required": ["x"] },
+        "c": { "type": "integer", "default": 1 },
+        "d": { "type": "integer", "default": true }
+      }
+    }
+    """
+    node = build_ir(parse_schema_string(json_str))
+    assert node.properties["a"] is node.properties["b"]
+    assert node.properties["a"].properties is node.properties["b"].properties
+    # Values that compare equal across types must not be merged
+    assert node.properties["c"] is not node.properties["d"]
+    assert node.properties["d"].default is True
+
+def test_ir_collections():
+    json_str = """
+    {
+      "type": "object",
+      "required": ["tags"],
+      "properties": {
+        "tags": { "type": "array", "items": { "type": "string" } },
+        "tuple": { "type": "array", "items": [{ "type": "string" }, { "type": "integer" }] },
+        "status": { "type": "string", "enum": ["on", "off"] }
+      }
+    }
+    """
+    node = build_ir(parse_schema_string(json_str))
+    assert node.required == frozenset({"tags"})
+    assert isinstance(node.properties["tags"].items, SchemaNode)
+    assert isinstance(node.properties["tuple"].items, tuple)
+    assert node.properties["status"].enum == ("on", "off")
+
+def test_resolver_on_ir():
+    node = build_ir(parse_schema_file("test_cases/7_refs/schema.json"))
+    resolver = SchemaResolver(node)
+    address = resolver.resolve("#/$defs/address")
+    assert isinstance(address, SchemaNode)
+    assert address is node.defs["address"]
+    assert resolver.resolve("#/properties/node") is node.defs["recursiveNode"]
+
+def test_generator_accepts_ir(tmp_path):
+    model = parse_schema_file("test_cases/7_refs/schema.json")
+    from_model = PythonGenerator(model, tmp_path / "model")
+    from_ir = PythonGenerator(build_ir(model), tmp_path / "ir")
+    assert from_model.schema is from_ir.schema
+    from_model.generate()
+    from_ir.generate()
+    assert (tmp_path / "model" / "references.py").read_text() == (tmp_path / "ir" / "references.py").read_text()
+
+def test_canonical_key():
+    node = build_ir(parse_schema_string('{"type": "object", "properties": {"a": {"enum": [true, 1, 1.0]}}}'))
+    prop = node.properties["a"]
+    # Equal-comparing JSON values of different types get different keys
+    assert len(set(canonical_key(prop.enum, id))) == 3
+    # Nested subschemas are keyed by the caller
+    assert canonical_key(node.properties, lambda child: child.enum) == (("a", prop.enum),)
+    assert canonical_key(frozenset(("b", "a")), id) == ("a", "b")
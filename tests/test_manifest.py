@@ -0,0 +1,196 @@
+import json
+import os
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+import rgs_types.registry as registry_module
+from rgs_types.files import digest_bytes, write_chunks_if_changed, write_if_changed
+from rgs_types.generators.base import strip_chunks
+from rgs_types.main import app
+from rgs_types.manifest import MANIFEST_NAME, BuildManifest, source_fingerprint
+
+runner = CliRunner()
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Records the schema files parsed by the CLI."""
+    loaded = []
+    original = registry_module.load_schema_ir
+    def counting_load(path, cache=None):
+        loaded.append(Path(path).name)
+        return original(path, cache=cache)
+    monkeypatch.setattr(registry_module, "load_schema_ir", counting_load)
+    return loaded
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "common.json").write_text(json.dumps({
+        "title": "Common", "type": "object", "properties": {"x": {"type": "integer"}}
+    }))
+    (tmp_path / "root.json").write_text(json.dumps({
+        "title": "Root", "type": "object", "properties": {"common": {"$ref": "common.json"}}
+    }))
+    (tmp_path / "other.json").write_text(json.dumps({"title": "Other", "type": "object"}))
+    return tmp_path
+
+def run(project, *extra):
+    args = [str(project / "root.json"), str(project / "other.json"), "--output", str(project / "out"), *extra]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.stdout
+    return result
+
+def test_write_if_changed(tmp_path):
+    path = tmp_path / "file.txt"
+    assert write_if_changed(path, "content")
+    os.utime(path, (1, 1))
+    assert not write_if_changed(path, "content")
+    assert path.stat().st_mtime == 1
+    assert write_if_changed(path, "other")
+    assert path.read_text() == "other"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.txt"]
+
+@pytest.mark.parametrize("old, new", [
+    (None, ["ab", "", "cd"]),
+    ("abcd", ["ab", "cd"]),
+    ("abcd", ["ab", "cx"]),
+    ("abcd", ["ab"]),
+    ("ab", ["ab", "cd"]),
+    ("abcd", []),
+    (None, []),
+])
+def test_write_chunks_if_changed(tmp_path, old, new):
+    path = tmp_path / "file.txt"
+    if old is not None:
+        path.write_text(old)
+        os.utime(path, (1, 1))
+    content = "".join(new)
+    written, digest = write_chunks_if_changed(path, iter(new))
+    assert written == (old != content)
+    assert digest == digest_bytes(content.encode())
+    assert path.read_text() == content
+    if not written:
+        assert path.stat().st_mtime == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["file.txt"]
+
+def test_write_chunks_if_changed_keeps_file_on_error(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("abcd")
+    def failing():
+        yield "ax"
+        raise RuntimeError("render failed")
+    with pytest.raises(RuntimeError):
+        write_chunks_if_changed(path, failing())
+    assert path.read_text() == "abcd"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.txt"]
+
+@pytest.mark.parametrize("chunks", [
+    ["\n\n  a", "b  \n", "\n", " c\n\n"],
+    ["  ", "\n", "x", " ", " "],
+    ["", "   ", ""],
+    ["a\n"],
+    [],
+])
+def test_strip_chunks(chunks):
+    assert "".join(strip_chunks(chunks)) == "".join(chunks).strip() + "\n"
+
+def test_unchanged_schemas_are_skipped(project, parses):
+    run(project)
+    assert (project / "out" / MANIFEST_NAME).exists()
+    assert sorted(parses) == ["common.json", "other.json", "root.json"]
+
+    parses.clear()
+    result = run(project)
+    assert parses == []
+    assert "Schema unchanged, skipping" in result.stdout
+
+def test_changed_dependency_regenerates(project, parses):
+    run(project)
+    header = project / "out" / "root.hpp"
+    os.utime(header, (1, 1))
+
+    parses.clear()
+    (project / "common.json").write_text(json.dumps({
+        "title": "Common", "type": "object", "properties": {"y": {"type": "string"}}
+    }))
+    run(project)
+    # Only the schema referencing the changed document is regenerated
+    assert sorted(parses) == ["common.json", "root.json"]
+    assert "y" in header.read_text() and header.stat().st_mtime != 1
+
+def test_regenerated_identical_output_keeps_mtime(project, parses):
+    run(project)
+    header = project / "out" / "root.hpp"
+    os.utime(header, (1, 1))
+    # Whitespace-only change: regenerated, but the output bytes are identical
+    (project / "root.json").write_text((project / "root.json").read_text() + "\n")
+
+    parses.clear()
+    result = run(project)
+    assert "root.json" in parses
+    assert "C++ code unchanged" in result.stdout
+    assert header.stat().st_mtime == 1
+
+def test_missing_or_edited_output_regenerates(project, parses):
+    run(project)
+    (project / "out" / "root.hpp").unlink()
+    (project / "out" / "other.hpp").write_text("// edited")
+
+    parses.clear()
+    run(project)
+    assert sorted(parses) == ["common.json", "other.json", "root.json"]
+    assert (project / "out" / "root.hpp").exists()
+    assert "struct Other" in (project / "out" / "other.hpp").read_text()
+
+def test_options_languages_and_force(project, parses):
+    run(project, "--lang", "python")
+    parses.clear()
+    run(project, "--lang", "cpp")
+    assert "root.json" in parses
+
+    # Both languages are recorded, but a different layout (subdirectories) is not the same build
+    parses.clear()
+    run(project, "--lang", "python")
+    assert parses == []
+    run(project, "--lang", "python", "--lang", "cpp")
+    assert "root.json" in parses
+
+    parses.clear()
+    run(project, "--lang", "python", "--lang", "cpp", "--force")
+    assert "root.json" in parses
+
+def test_manifest_from_other_generator_is_ignored(project):
+    run(project)
+    manifest_path = project / "out" / MANIFEST_NAME
+    data = json.loads(manifest_path.read_text())
+    data["generator"] = "something else"
+    manifest_path.write_text(json.dumps(data))
+    assert BuildManifest.load(project / "out").entries == {}
+
+def test_source_fingerprint_covers_generator_code(tmp_path):
+    (tmp_path / "generators" / "templates").mkdir(parents=True)
+    (tmp_path / "generators" / "cpp.py").write_text("ONE = 1\n")
+    (tmp_path / "generators" / "templates" / "cpp.hpp.j2").write_text("{{ x }}\n")
+    (tmp_path / "README.md").write_text("not a source\n")
+    before = source_fingerprint(tmp_path)
+
+    (tmp_path / "README.md").write_text("edited\n")
+    assert source_fingerprint(tmp_path) == before
+    # Generator logic changes the output as much as the templates do
+    (tmp_path / "generators" / "cpp.py").write_text("ONE = 2\n")
+    assert source_fingerprint(tmp_path) != before
+    (tmp_path / "generators" / "cpp.py").write_text("ONE = 1\n")
+    (tmp_path / "generators" / "templates" / "cpp.hpp.j2").write_text("{{ y }}\n")
+    assert source_fingerprint(tmp_path) != before
+
+def test_parallel_run_records_manifest(project, parses):
+    run(project, "-j", "2")
+    entries = BuildManifest.load(project / "out").entries
+    assert set(entries) == {str(project / "root.json"), str(project / "other.json")}
+    assert entries[str(project / "root.json")]["dependencies"] == {
+        str(project / "common.json"): entries[str(project / "root.json")]["dependencies"][str(project / "common.json")]
+    }
+
+    parses.clear()
+    result = run(project)
+    assert parses == []
+    assert result.stdout.count("Schema unchanged, skipping") == 2
@@ -281,14 +281,6 @@ def test_generate_python_to_from_dict():
             "tags": ["a", "b"],
             "metadata": {"key": "value"}
         }
-        # Note: current simple from_dict implementation doesn't automatically recursive-convert dicts to objects
-        # unless we improved the generator. 
-        # The generator template currently does: return cls(**data)
-        # So passing a dict for 'metadata' will set metadata field to a dict, not a Metadata object,
-        # unless dataclasses or the init handles it. Standard dataclasses do not.
-        # However, to_dict uses dataclasses.asdict which handles recursion for nested dataclasses.
-        
-        # Let's create object manually first to test to_dict
         meta = Metadata(key="value")
         obj = ConversionObject(id=123, name="test", tags=["a", "b"], metadata=meta)
         
@@ -298,20 +290,361 @@ def test_generate_python_to_from_dict():
         assert d["tags"] == ["a", "b"]
         assert d["metadata"] == {"key": "value"}
         
-        # For from_dict with nested objects, if we want it to work with raw dicts,
-        # we'd need a more advanced generator (using dacite or similar, or custom logic).
-        # Our current requirement was just "Provide to_dict/from_dict".
-        # Let's verify basic from_dict works with matching types.
-        
-        obj2 = ConversionObject.from_dict({
-            "id": 456,
-            "name": "from_dict",
-            "tags": [],
-            "metadata": meta # Pass object directly for now as simple impl expects compatible types
-        })
-        assert obj2.id == 456
+        # from_dict converts nested objects into their classes
+        obj2 = ConversionObject.from_dict(data)
+        assert obj2.id == 123
+        assert isinstance(obj2.metadata, Metadata)
         assert obj2.metadata.key == "value"
+        assert obj2.to_dict() == data
+
+
+
+
+
+def test_generate_python_slots_and_typed_conversion():
+    with runner.isolated_filesystem():
+        schema_content = """
+        {
+          "title": "Fleet",
+          "type": "object",
+          "properties": {
+            "status": { "type": "string", "enum": ["active", "retired"] },
+            "levels": { "type": "array", "items": { "type": "integer", "enum": [1, 2] } },
+            "ships": {
+                "type": "array",
+                "items": { "$ref": "#/$defs/ship" }
+            },
+            "grid": {
+                "type": "array",
+                "items": { "type": "array", "items": { "$ref": "#/$defs/ship" } }
+            },
+            "flagship": { "$ref": "#/$defs/ship" },
+            "extra": { "type": "object" }
+          },
+          "required": ["status", "ships"],
+          "$defs": {
+            "ship": {
+              "title": "Ship",
+              "type": "object",
+              "properties": { "name": { "type": "string" } },
+              "required": ["name"]
+            }
+          }
+        }
+        """
+        with open("schema.json", "w") as f:
+            f.write(schema_content)
+
+        result = runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out"])
+        assert result.exit_code == 0
+
+        out_file = Path("out/fleet.py")
+        content = out_file.read_text()
+        assert "dataclasses.asdict" not in content
+        assert '"ships": [item.to_dict() for item in self.ships],' in content
+        assert '"grid": None if self.grid is None else [[item1.to_dict() for item1 in item] for item in self.grid],' in content
+
+        spec = importlib.util.spec_from_file_location("fleet", out_file)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["fleet"] = module
+        spec.loader.exec_module(module)
+
+        data = {
+            "status": "retired",
+            "ships": [{"name": "a"}, {"name": "b"}],
+            "levels": [2, 1],
+            "grid": [[{"name": "c"}], []],
+            "flagship": {"name": "d"},
+            "extra": {"any": ["json"]},
+        }
+        fleet = module.Fleet.from_dict(data)
+        assert fleet.status is module.Status.RETIRED
+        assert fleet.levels == [module.LevelsItem.VALUE_2, module.LevelsItem.VALUE_1]
+        assert isinstance(fleet.ships[1], module.Ship)
+        assert isinstance(fleet.grid[0][0], module.Ship)
+        # Enums are written as their JSON values and nothing else is copied
+        encoded = fleet.to_dict()
+        assert encoded == data
+        assert encoded["extra"] is data["extra"]
+        assert module.Fleet.from_dict({"status": "active", "ships": []}).to_dict()["flagship"] is None
+
+        # Slotted instances have no per-instance __dict__
+        assert not hasattr(fleet, "__dict__")
+        with pytest.raises(AttributeError):
+            fleet.unknown = 1
+
+def test_generate_python_unrolled_from_dict_defaults():
+    with runner.isolated_filesystem():
+        schema_content = """
+        {
+          "title": "Settings",
+          "type": "object",
+          "properties": {
+            "name": { "type": "string" },
+            "mode": { "type": "string", "enum": ["fast", "safe"], "default": "safe" },
+            "retries": { "type": "integer", "default": 3 },
+            "tags": { "type": "array", "items": { "type": "string" }, "default": [] },
+            "owner": { "$ref": "#/$defs/owner" }
+          },
+          "required": ["name"],
+          "$defs": {
+            "owner": { "title": "Owner", "type": "object", "properties": { "id": { "type": "integer" } } }
+          }
+        }
+        """
+        with open("schema.json", "w") as f:
+            f.write(schema_content)
 
+        result = runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out"])
+        assert result.exit_code == 0
+
+        out_file = Path("out/settings.py")
+        content = out_file.read_text()
+        # Straight-line construction, no kwargs dict or per-key membership tests
+        assert "kwargs" not in content
+        assert 'name=data["name"],' in content
+        assert 'mode=None if (value := get("mode", \'safe\')) is None else Mode(value),' in content
+        assert 'mode: Optional[Mode] = Mode("safe")' in content
+
+        spec = importlib.util.spec_from_file_location("settings", out_file)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["settings"] = module
+        spec.loader.exec_module(module)
+
+        settings = module.Settings.from_dict({"name": "a"})
+        assert settings.mode is module.Mode.SAFE
+        assert settings.retries == 3 and settings.tags == [] and settings.owner is None
+        assert settings.to_dict() == {"name": "a", "mode": "safe", "retries": 3, "tags": [], "owner": None}
+        # Defaults are not shared between instances
+        assert module.Settings.from_dict({"name": "b"}).tags is not settings.tags
+
+        settings = module.Settings.from_dict({"name": "c", "mode": "fast", "owner": {"id": 7}, "tags": None})
+        assert settings.mode is module.Mode.FAST and settings.owner.id == 7 and settings.tags is None
+        assert module.Settings(name="d").to_dict()["mode"] == "safe"
+
+        with pytest.raises(KeyError):
+            module.Settings.from_dict({})
+
+TRADE_SCHEMA = """
+{
+  "title": "Trade",
+  "type": "object",
+  "properties": {
+    "id": { "type": "integer" },
+    "price": { "type": "number" },
+    "filled": { "type": "boolean" },
+    "qty": { "type": "integer", "default": 1 },
+    "side": { "type": "string", "enum": ["buy", "sell"] },
+    "venue": { "$ref": "#/$defs/venue" }
+  },
+  "required": ["id", "price", "filled"],
+  "$defs": {
+    "venue": { "title": "Venue", "type": "object", "properties": { "code": { "type": "string" } } }
+  }
+}
+"""
+
+def load_trade_module():
+    with open("schema.json", "w") as f:
+        f.write(TRADE_SCHEMA)
+    result = runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out"])
+    assert result.exit_code == 0
+
+    spec = importlib.util.spec_from_file_location("trade", Path("out/trade.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["trade"] = module
+    spec.loader.exec_module(module)
+    return module
+
+TRADES = [
+    {"id": 1, "price": 10.5, "filled": True, "side": "buy", "venue": {"code": "X"}},
+    {"id": 2, "price": 11, "filled": False, "qty": None},
+    {"id": 3, "price": 9.25, "filled": True, "qty": 7, "side": "sell"},
+]
+
+def test_generate_python_columnar_batches():
+    with runner.isolated_filesystem():
+        module = load_trade_module()
+        from array import array
+
+        columns = module.Trade.from_dicts(iter(TRADES))
+        assert len(columns) == 3
+        assert columns.id == array("q", [1, 2, 3])
+        assert columns.price == array("d", [10.5, 11.0, 9.25])
+        assert columns.filled == array("b", [1, 0, 1])
+        # Optional scalars: missing keys take the default, nulls are masked out
+        assert columns.qty == array("q", [1, 0, 7])
+        assert columns.qty_present == array("b", [1, 0, 1])
+        assert columns.side == [module.Side.BUY, None, module.Side.SELL]
+        assert columns.venue == [module.Venue(code="X"), None, None]
+
+        objects = [module.Trade.from_dict(record) for record in TRADES]
+        assert module.Trade.to_columns(objects) == columns
+        assert columns.to_dicts() == [obj.to_dict() for obj in objects]
+        assert module.Trade.from_dicts([]).to_dicts() == []
+
+        # Integers beyond 64 bits keep the column as a list instead of failing
+        big = module.Trade.from_dicts([{"id": 2**70, "price": 1.0, "filled": False}])
+        assert big.id == [2**70]
+        assert big.to_dicts()[0]["id"] == 2**70
+        # So do JSON integers written as floats, which from_dict accepts as well
+        floats = [{"id": 1.0, "price": 1.0, "filled": False, "qty": 2.0}, {"id": 2, "price": 2.0, "filled": True}]
+        columns = module.Trade.from_dicts(floats)
+        assert columns.id == [1.0, 2] and columns.qty == [2.0, 1]
+        assert columns.to_dicts() == [module.Trade.from_dict(record).to_dict() for record in floats]
+
+def test_generate_python_columns_mask_names():
+    with runner.isolated_filesystem():
+        schema_content = """
+        {
+          "title": "Tally",
+          "type": "object",
+          "properties": {
+            "count": { "type": "integer" },
+            "count_present": { "type": "boolean" },
+            "count_present_": { "type": "string" }
+          }
+        }
+        """
+        with open("schema.json", "w") as f:
+            f.write(schema_content)
+        result = runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out"])
+        assert result.exit_code == 0
+
+        spec = importlib.util.spec_from_file_location("tally", Path("out/tally.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["tally"] = module
+        spec.loader.exec_module(module)
+
+        records = [{"count": 2, "count_present": False, "count_present_": "x"}, {"count_present": True}]
+        columns = module.Tally.from_dicts(records)
+        # The mask of `count` steps past the names of real fields, which keep theirs
+        assert list(columns.count_present__) == [1, 0]
+        assert list(columns.count_present_present) == [1, 1]
+        assert list(columns.count_present) == [0, 1]
+        assert columns.count_present_ == ["x", None]
+        assert columns.to_dicts() == [module.Tally.from_dict(record).to_dict() for record in records]
+
+def test_generate_python_columns_to_numpy():
+    numpy = pytest.importorskip("numpy")
+    with runner.isolated_filesystem():
+        module = load_trade_module()
+        columns = module.Trade.from_dicts(TRADES)
+        arrays = columns.to_numpy()
+        assert arrays["price"].sum() == 30.75
+        assert arrays["filled"].dtype == numpy.bool_
+        assert arrays["qty"][arrays["qty_present"]].tolist() == [1, 7]
+        assert arrays["side"] is columns.side
+        # Views share the column memory
+        columns.id[0] = 42
+        assert arrays["id"][0] == 42
+
+def test_generate_python_validate():
+    with runner.isolated_filesystem():
+        schema_content = r"""
+        {
+          "title": "Order",
+          "type": "object",
+          "properties": {
+            "qty": { "type": "integer", "minimum": 1, "maximum": 100 },
+            "code": { "type": "string", "minLength": 2, "maxLength": 4, "pattern": "^[A-Z]+$" },
+            "alias": { "type": "string", "pattern": "^[A-Z]+$" },
+            "word": { "type": "string", "pattern": "^\\p{L}+$" },
+            "scores": {
+                "type": "array", "maxItems": 2,
+                "items": { "type": "array", "items": { "type": "number", "exclusiveMaximum": 1 } }
+            },
+            "lines": { "type": "array", "items": { "$ref": "#/$defs/line" }, "minItems": 1 }
+          },
+          "required": ["qty"],
+          "$defs": {
+            "line": { "title": "Line", "type": "object", "properties": { "sku": { "type": "string", "minLength": 1 } } }
+          }
+        }
+        """
+        with open("schema.json", "w") as f:
+            f.write(schema_content)
+
+        result = runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out"])
+        assert result.exit_code == 0
+        # Patterns Python cannot compile are reported and skipped
+        assert "pattern of Order.word is not supported" in result.stdout
+
+        out_file = Path("out/order.py")
+        content = out_file.read_text()
+        # One precompiled pattern per distinct regex, checks unrolled per field
+        assert content.count("re.compile(") == 1
+        assert "_PATTERN_0 = re.compile('^[A-Z]+$')" in content
+        assert "if value < 1:" in content and "if item1 >= 1:" in content
+
+        spec = importlib.util.spec_from_file_location("order", out_file)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["order"] = module
+        spec.loader.exec_module(module)
+
+        valid = {"qty": 5, "code": "AB", "word": "été", "scores": [[0.5], []], "lines": [{"sku": "x"}]}
+        assert module.Order.from_dict(valid, validate=True).to_dict()["qty"] == 5
+        # Absent optional fields are not checked
+        module.Order.from_dict({"qty": 100}, validate=True)
+
+        for invalid, message in [
+            ({"qty": 0}, "Order.qty: must be >= 1, got 0"),
+            ({"qty": 101}, "Order.qty: must be <= 100, got 101"),
+            ({"qty": 1, "code": "A"}, "Order.code: length must be >= 2, got 1"),
+            ({"qty": 1, "code": "ABCDE"}, "Order.code: length must be <= 4, got 5"),
+            ({"qty": 1, "alias": "ab"}, "Order.alias: must match '^[A-Z]+$', got 'ab'"),
+            ({"qty": 1, "scores": [[], [], []]}, "Order.scores: item count must be <= 2, got 3"),
+            ({"qty": 1, "scores": [[0.1, 1]]}, "Order.scores[][]: must be < 1, got 1"),
+            ({"qty": 1, "lines": []}, "Order.lines: item count must be >= 1, got 0"),
+            ({"qty": 1, "lines": [{"sku": ""}]}, "Line.sku: length must be >= 1, got 0"),
+        ]:
+            # The trusted path does not validate
+            instance = module.Order.from_dict(invalid)
+            with pytest.raises(ValueError) as excinfo:
+                instance.validate()
+            assert str(excinfo.value) == message
+            with pytest.raises(ValueError):
+                module.Order.from_dict(invalid, validate=True)
+
+def test_generate_python_reserved_field_names():
+    with runner.isolated_filesystem():
+        schema_content = """
+        {
+          "title": "Job",
+          "type": "object",
+          "properties": {
+            "name": { "type": "string" },
+            "validate": { "type": "boolean", "default": false },
+            "validate_": { "type": "integer", "minimum": 0 },
+            "to_dict": { "type": "string" },
+            "Columns": { "type": "integer" }
+          },
+          "required": ["name"]
+        }
+        """
+        with open("schema.json", "w") as f:
+            f.write(schema_content)
+
+        result = runner.invoke(app, ["schema.json", "--lang", "python", "--output", "out"])
+        assert result.exit_code == 0
+
+        spec = importlib.util.spec_from_file_location("job", Path("out/job.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["job"] = module
+        spec.loader.exec_module(module)
 
+        # Fields named like generated members are renamed, their JSON keys are kept
+        job = module.Job(name="x")
+        # (past real properties: "validate_" is taken, so validate becomes validate__)
+        assert job.validate__ is False and callable(job.validate)
+        assert job.to_dict() == {"name": "x", "validate": False, "validate_": None, "to_dict": None, "Columns": None}
 
+        data = {"name": "y", "validate": True, "validate_": 3, "to_dict": "t", "Columns": 2}
+        job = module.Job.from_dict(data, validate=True)
+        assert (job.validate__, job.validate_, job.to_dict_, job.Columns_) == (True, 3, "t", 2)
+        assert job.to_dict() == data
+        with pytest.raises(ValueError, match="Job.validate_: must be >= 0"):
+            module.Job.from_dict({**data, "validate_": -1}, validate=True)
 
+        columns = module.Job.from_dicts([data])
+        assert columns.validate__[0] == 1 and columns.to_dicts() == [data]
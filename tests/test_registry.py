@@ -0,0 +1,186 @@
+import json
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+import rgs_types.registry as registry_module
+from rgs_types.main import app
+from rgs_types.registry import DocumentRegistry
+
+runner = CliRunner()
+
+def write_schema(path: Path, schema: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(schema))
+    return path
+
+@pytest.fixture
+def documents(tmp_path):
+    write_schema(tmp_path / "common" / "types.json", {
+        "$id": "https://example.com/common/types.json",
+        "$defs": {
+            "address": {
+                "title": "Address",
+                "type": "object",
+                "properties": {
+                    "street": {"type": "string"},
+                    "geo": {"$ref": "#/$defs/geo"}
+                },
+                "required": ["street"]
+            },
+            "geo": {
+                "title": "Geo",
+                "type": "object",
+                "properties": {"lat": {"type": "number"}, "lon": {"type": "number"}}
+            }
+        }
+    })
+    write_schema(tmp_path / "person.json", {
+        "title": "Person",
+        "type": "object",
+        "properties": {"home": {"$ref": "common/types.json#/$defs/address"}},
+        "required": ["home"]
+    })
+    write_schema(tmp_path / "company.json", {
+        "title": "Company",
+        "type": "object",
+        "properties": {"office": {"$ref": "https://example.com/common/types.json#/$defs/address"}}
+    })
+    return tmp_path
+
+def test_resolve_relative_file_ref(documents):
+    registry = DocumentRegistry()
+    resolver = registry.load(documents / "person.json")
+
+    address = resolver.resolve(resolver.root.properties["home"].ref)
+    assert address.title == "Address"
+    # Internal refs of the external document resolve against that document
+    geo = resolver.resolve(address.properties["geo"].ref)
+    assert geo.title == "Geo"
+
+def test_resolve_id_ref_through_search_paths(documents):
+    registry = DocumentRegistry(search_paths=[documents / "common" / "types.json"])
+    resolver = registry.load(documents / "company.json")
+
+    address = resolver.resolve(resolver.root.properties["office"].ref)
+    assert address.title == "Address"
+
+def test_unknown_external_document(tmp_path):
+    schema_file = write_schema(tmp_path / "schema.json", {
+        "type": "object",
+        "properties": {"x": {"$ref": "https://example.com/missing.json"}}
+    })
+    resolver = DocumentRegistry().load(schema_file)
+    with pytest.raises(ValueError, match="Cannot find schema document"):
+        resolver.resolve(resolver.root.properties["x"].ref)
+
+def test_shared_document_parsed_once(documents, monkeypatch):
+    loaded = []
+    original = registry_module.load_schema_ir
+    def counting_load(path, cache=None):
+        loaded.append(Path(path).name)
+        return original(path, cache=cache)
+    monkeypatch.setattr(registry_module, "load_schema_ir", counting_load)
+
+    registry = DocumentRegistry()
+    person = registry.load(documents / "person.json")
+    company = registry.load(documents / "company.json")
+    first = person.resolve(person.root.properties["home"].ref)
+    second = company.resolve(company.root.properties["office"].ref)
+
+    assert first is second
+    assert loaded.count("types.json") == 1
+
+def test_lru_eviction(tmp_path):
+    registry = DocumentRegistry(max_documents=2)
+    paths = [write_schema(tmp_path / f"s{i}.json", {"title": f"S{i}"}) for i in range(3)]
+    first = registry.load(paths[0])
+    registry.load(paths[1])
+    assert registry.load(paths[0]) is first  # refreshes recency
+    registry.load(paths[2])
+
+    assert registry.load(paths[0]) is first
+    assert len(registry._documents) == 2
+    assert paths[1].resolve().as_uri() not in registry._documents
+
+def test_circular_alias_chain(tmp_path):
+    write_schema(tmp_path / "a.json", {"$ref": "b.json"})
+    write_schema(tmp_path / "b.json", {"$ref": "a.json"})
+    root = write_schema(tmp_path / "root.json", {
+        "type": "object",
+        "properties": {"x": {"$ref": "a.json"}}
+    })
+    resolver = DocumentRegistry().load(root)
+    with pytest.raises(ValueError, match="Circular \\$ref chain"):
+        resolver.resolve(resolver.root.properties["x"].ref)
+
+def test_cli_external_refs(documents):
+    result = runner.invoke(app, [
+        str(documents / "person.json"), str(documents / "company.json"),
+        "--lang", "python", "--output", str(documents / "out")
+    ])
+    assert result.exit_code == 0, result.stdout
+
+    person = (documents / "out" / "person.py").read_text()
+    company = (documents / "out" / "company.py").read_text()
+    for content in (person, company):
+        assert content.count("class Address:") == 1
+        assert "class Geo:" in content
+    assert "home: Address" in person
+    assert "office: Optional[Address]" in company
+
+def test_cli_mutually_recursive_documents(tmp_path):
+    write_schema(tmp_path / "a.json", {
+        "title": "NodeA",
+        "type": "object",
+        "properties": {"b": {"$ref": "b.json"}}
+    })
+    write_schema(tmp_path / "b.json", {
+        "title": "NodeB",
+        "type": "object",
+        "properties": {"a": {"$ref": "a.json"}}
+    })
+    result = runner.invoke(app, [str(tmp_path / "a.json"), "--lang", "cpp", "--output", str(tmp_path / "out")])
+    assert result.exit_code == 0, result.stdout
+
+    content = (tmp_path / "out" / "nodea.hpp").read_text()
+    assert content.count("struct NodeA {") == 1
+    assert content.count("struct NodeB {") == 1
+
+def test_anchor_and_nested_id_across_documents(tmp_path):
+    write_schema(tmp_path / "shapes.json", {
+        "$id": "https://example.com/shapes.json",
+        "$defs": {
+            "point": {
+                "$id": "point.json",
+                "title": "Point",
+                "type": "object",
+                "properties": {"x": {"$ref": "#/$defs/coord"}, "y": {"$ref": "#coord"}},
+                "$defs": {"coord": {"$anchor": "coord", "type": "number"}}
+            },
+            "size": {"$anchor": "size", "title": "Size", "type": "object", "properties": {"w": {"type": "integer"}}}
+        }
+    })
+    root = write_schema(tmp_path / "canvas.json", {
+        "title": "Canvas",
+        "type": "object",
+        "properties": {
+            "origin": {"$ref": "https://example.com/point.json"},
+            "size": {"$ref": "shapes.json#size"}
+        }
+    })
+    registry = DocumentRegistry(search_paths=[tmp_path / "shapes.json"])
+    resolver = registry.load(root)
+
+    point = resolver.resolve(resolver.root.properties["origin"].ref)
+    assert point.title == "Point"
+    # Refs inside the nested resource resolve against its own $id
+    assert resolver.resolve(point.properties["x"].ref).type == "number"
+    assert resolver.resolve(point.properties["y"].ref).type == "number"
+    assert resolver.resolve(resolver.root.properties["size"].ref).title == "Size"
+
+    # The `$id` of shapes.json is found because it is another input of the same run
+    result = runner.invoke(app, [str(root), str(tmp_path / "shapes.json"), "--lang", "python", "--output", str(tmp_path / "out")])
+    assert result.exit_code == 0, result.stdout
+    content = (tmp_path / "out" / "canvas.py").read_text()
+    assert "origin: Optional[Point]" in content
+    assert "size: Optional[Size]" in content
@@ -122,3 +122,103 @@ def test_resolve_external_unsupported():
     
     with pytest.raises(NotImplementedError):
         resolver.resolve("http://example.com/schema.json")
+
+def test_resolve_returns_identical_node():
+    root = parse_schema_file("test_cases/7_refs/schema.json")
+    resolver = SchemaResolver(root)
+    
+    first = resolver.resolve("#/$defs/address")
+    assert resolver.resolve("#/$defs/address") is first
+    assert first is root.defs["address"]
+    # The "defs" alias takes the slow path once, then is memoized
+    assert resolver.resolve("#/defs/address") is first
+    assert resolver.resolve("#/defs/address") is first
+
+def test_resolve_uses_index_without_walking(monkeypatch):
+    json_str = """
+    {
+      "type": "object",
+      "properties": {
+        "list": { "type": "array", "items": { "$ref": "#/$defs/a~1b" } }
+      },
+      "$defs": {
+        "a/b": { "type": "object", "properties": { "x": { "type": "integer" } } }
+      }
+    }
+    """
+    root = parse_schema_string(json_str)
+    resolver = SchemaResolver(root)
+    resolver.resolve("#")
+    
+    def fail_walk(ref):
+        raise AssertionError(f"unexpected walk for {ref}")
+    monkeypatch.setattr(resolver, "_walk", fail_walk)
+    
+    assert resolver.resolve("#/$defs/a~1b/properties/x").type == "integer"
+    # The items schema is only a $ref, so resolution follows it to the definition
+    assert resolver.resolve("#/properties/list/items") is root.defs["a/b"]
+
+def test_resolve_many_refs_into_defs():
+    defs = {f"type{i}": {"type": "object", "properties": {"v": {"type": "integer"}}} for i in range(2000)}
+    root = JSONSchema(**{"type": "object", "$defs": defs})
+    resolver = SchemaResolver(root)
+    
+    for i in range(2000):
+        assert resolver.resolve(f"#/$defs/type{i}") is root.defs[f"type{i}"]
+
+ANCHOR_SCHEMA = """
+{
+  "$id": "https://example.com/root.json",
+  "type": "object",
+  "properties": {
+    "home": { "$ref": "#home-address" },
+    "geo": { "$ref": "https://example.com/geo.json" }
+  },
+  "$defs": {
+    "address": {
+      "$anchor": "home-address",
+      "type": "object",
+      "properties": { "street": { "type": "string" } }
+    },
+    "geo": {
+      "$id": "geo.json",
+      "type": "object",
+      "properties": {
+        "lat": { "$ref": "#/$defs/coordinate" }
+      },
+      "$defs": {
+        "coordinate": { "$anchor": "coord", "type": "number" }
+      }
+    }
+  }
+}
+"""
+
+def test_resolve_anchor():
+    root = parse_schema_string(ANCHOR_SCHEMA)
+    resolver = SchemaResolver(root)
+    
+    assert root.defs["address"].anchor == "home-address"
+    assert resolver.resolve("#home-address") is root.defs["address"]
+    assert resolver.resolve("https://example.com/root.json#home-address") is root.defs["address"]
+
+def test_resolve_nested_id():
+    root = parse_schema_string(ANCHOR_SCHEMA)
+    resolver = SchemaResolver(root)
+    geo = root.defs["geo"]
+    
+    assert resolver.resolve("https://example.com/geo.json") is geo
+    assert resolver.resolve("https://example.com/geo.json#coord") is geo.defs["coordinate"]
+    assert resolver.resolve("https://example.com/geo.json#/$defs/coordinate") is geo.defs["coordinate"]
+    # Anchors of nested resources are not visible from the root resource
+    with pytest.raises(ValueError, match="Unknown anchor"):
+        resolver.resolve("#coord")
+
+def test_resolve_named_refs_use_index(monkeypatch):
+    root = parse_schema_string(ANCHOR_SCHEMA)
+    resolver = SchemaResolver(root)
+    resolver.resolve("#")
+    
+    monkeypatch.setattr(resolver, "_walk", lambda ref: pytest.fail(f"unexpected walk for {ref}"))
+    assert resolver.resolve("#home-address").properties["street"].type == "string"
+    assert resolver.resolve("https://example.com/geo.json#coord").type == "number"
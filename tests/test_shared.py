@@ -0,0 +1,169 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+from rgs_types.parser import parse_schema_string
+from rgs_types.generators.base import SchemaContext
+from rgs_types.generators.shared import plan_shared_types
+from rgs_types.main import app
+
+runner = CliRunner()
+
+ADDRESS = {
+    "title": "Address",
+    "type": "object",
+    "properties": {
+        "street": {"type": "string"},
+        "kind": {"type": "string", "enum": ["home", "work"]},
+        "geo": {"title": "Geo", "type": "object", "properties": {"lat": {"type": "number"}}},
+    },
+    "required": ["street"],
+}
+NODE = {"title": "Node", "type": "object", "properties": {"next": {"$ref": "#/$defs/node"}}}
+
+def schema(title: str, **defs) -> dict:
+    return {
+        "title": title,
+        "type": "object",
+        "properties": {name: {"$ref": f"#/$defs/{name}"} for name in defs},
+        "$defs": defs,
+    }
+
+def contexts(*schemas):
+    return [SchemaContext(parse_schema_string(json.dumps(s))) for s in schemas]
+
+def names(definitions):
+    return [definition.name for definition in definitions]
+
+def test_identical_definitions_are_shared():
+    order, customer, other = contexts(
+        schema("Order", ship_to=ADDRESS),
+        # Same content under another $defs key
+        schema("Customer", home=ADDRESS),
+        schema("Other", geo=ADDRESS["properties"]["geo"]),
+    )
+    shared = plan_shared_types([order, customer, other])
+    # Dependencies first; roots differ and are not shared
+    assert names(shared.classes) == ["Geo", "Address"]
+    assert names(shared.enums) == ["Kind"]
+    for context in (order, customer):
+        for definition in context.types.classes[:-1] + context.types.enums:
+            assert definition in shared
+        assert context.types.root not in shared
+    assert other.types.classes[0] in shared
+
+def test_different_content_is_not_shared():
+    changed = json.loads(json.dumps(ADDRESS))
+    changed["properties"]["geo"]["properties"]["lat"]["type"] = "integer"
+    shared = plan_shared_types(contexts(schema("Order", a=ADDRESS), schema("Customer", a=changed)))
+    # Geo differs, so Address (which contains it) differs too; the enum is still equal
+    assert names(shared.classes) == []
+    assert names(shared.enums) == ["Kind"]
+
+def test_one_definition_per_name():
+    other_geo = {"title": "Geo", "type": "object", "properties": {"lng": {"type": "number"}}}
+    geo = ADDRESS["properties"]["geo"]
+    shared = plan_shared_types(contexts(
+        schema("A", g=other_geo), schema("B", g=other_geo), schema("C", g=geo), schema("D", g=geo), schema("E", g=geo),
+    ))
+    assert len(shared.classes) == 1
+    assert shared.classes[0].schema.properties.keys() == {"lat"}
+
+def test_dependents_of_unshared_types_are_not_shared():
+    other_geo = {"title": "Geo", "type": "object", "properties": {"lng": {"type": "number"}}}
+    with_other_geo = {**ADDRESS, "properties": {**ADDRESS["properties"], "geo": other_geo}}
+    # The more widespread Geo wins the name, so the Address using the other one stays local
+    shared = plan_shared_types(contexts(
+        schema("A", a=with_other_geo), schema("B", a=with_other_geo),
+        schema("C", g=ADDRESS["properties"]["geo"]), schema("D", g=ADDRESS["properties"]["geo"]),
+        schema("E", g=ADDRESS["properties"]["geo"]),
+    ))
+    assert names(shared.classes) == ["Geo"]
+    assert shared.classes[0].schema.properties.keys() == {"lat"}
+
+def test_recursive_types_are_not_shared():
+    shared = plan_shared_types(contexts(schema("A", node=NODE), schema("B", node=NODE)))
+    assert shared.classes == [] and shared.enums == []
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "order.json").write_text(json.dumps({**schema("Order", ship_to=ADDRESS, node=NODE), "x-cpp-namespace": "shop::orders"}))
+    (tmp_path / "customer.json").write_text(json.dumps(schema("Customer", home=ADDRESS, node=NODE)))
+    return tmp_path
+
+def generate(project, *extra):
+    result = runner.invoke(app, [
+        str(project / "order.json"), str(project / "customer.json"),
+        "--shared-types", "--output", str(project / "out"), *extra,
+    ])
+    assert result.exit_code == 0, result.stdout
+    return result
+
+def test_cli_shared_python_modules(project):
+    result = generate(project, "--lang", "python")
+    assert "Shared types: 3" in result.stdout
+    out = project / "out"
+    assert "from rgs_common import Kind, Geo, Address" in (out / "order.py").read_text()
+    assert "class Address" not in (out / "customer.py").read_text()
+    assert "class Node" in (out / "customer.py").read_text()
+    check = subprocess.run(
+        [sys.executable, "-c", "import order, customer, rgs_common; assert order.Address is customer.Address is rgs_common.Address"],
+        cwd=out, capture_output=True, text=True,
+    )
+    assert check.returncode == 0, check.stderr
+
+def test_cli_shared_typescript_imports(project):
+    generate(project, "--lang", "typescript")
+    out = project / "out"
+    assert 'import { Kind, Geo, Address } from "./rgs_common";' in (out / "customer.ts").read_text()
+    assert "export class Address" in (out / "rgs_common.ts").read_text()
+
+def test_cli_shared_manifest(project):
+    generate(project, "--lang", "cpp")
+    assert "Schema unchanged, skipping" in generate(project, "--lang", "cpp").stdout
+    # Which types are shared depends on every input, so a change anywhere regenerates all
+    customer = json.loads((project / "customer.json").read_text())
+    customer["$defs"]["home"]["properties"]["geo"]["properties"]["lat"]["type"] = "integer"
+    (project / "customer.json").write_text(json.dumps(customer))
+    result = generate(project, "--lang", "cpp")
+    assert "Schema unchanged" not in result.stdout
+    assert "using rgs_common::Address;" not in (project / "out" / "order.hpp").read_text()
+
+@pytest.mark.slow
+def test_cpp_shared_headers_compile_together(project):
+    compiler = shutil.which("clang++") or shutil.which("g++")
+    if not compiler:
+        pytest.fail("C++ compiler (clang++ or g++) not found in PATH.")
+    generate(project, "--lang", "cpp")
+    out = project / "out"
+    header = (out / "order.hpp").read_text()
+    assert '#include "rgs_common.hpp"' in header and "using rgs_common::Address;" in header
+    assert "adl_serializer" not in header
+
+    (out / "main.cpp").write_text("""
+    #include "order.hpp"
+    #include "customer.hpp"
+    int main() {
+        shop::orders::Order order;
+        order.ship_to = rgs_common::Address{"Main St", rgs_common::Kind::WORK, std::nullopt};
+        Customer customer;
+        customer.home = *order.ship_to;  // one type for both schemas
+        nlohmann::json j = customer;
+        return j.get<Customer>().home->street == "Main St" ? 0 : 1;
+    }
+    """)
+    include_paths = ["-I/usr/include", "-I/usr/local/include"]
+    if "JSON_INCLUDE_DIR" in os.environ:
+        include_paths.append(f"-I{os.environ['JSON_INCLUDE_DIR']}")
+    try:
+        subprocess.run(
+            [compiler, "-std=c++17"] + include_paths + ["main.cpp", "-o", "main"],
+            cwd=out, check=True, capture_output=True, text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        pytest.fail(f"C++ Compilation failed.\nStderr: {e.stderr}")
+    subprocess.run([str(out / "main")], check=True)
@@ -0,0 +1,125 @@
+import json
+import jsonschema
+import pytest
+from pathlib import Path
+from hypothesis import given, settings, strategies as st
+from rgs_types.parser import parse_schema_file, parse_schema_string
+from rgs_types.registry import DocumentRegistry
+from rgs_types.validator import ValidationError, clear_validator_cache, compile_validator
+from rgs_types.generators.json_data import JsonDataGenerator
+
+TEST_CASE_DIR = Path(__file__).parent.parent / "test_cases"
+schema_files = list(TEST_CASE_DIR.glob("*/schema.json"))
+
+ORDER = {
+    "title": "Order",
+    "type": "object",
+    "properties": {
+        "qty": {"type": "integer", "minimum": 1, "exclusiveMaximum": 100},
+        "code": {"type": "string", "minLength": 2, "maxLength": 4, "pattern": "^[A-Z]+$"},
+        "side": {"enum": ["buy", "sell"]},
+        "level": {"enum": [1, 2.5, True, None]},
+        "note": {"maxLength": 3},
+        "pair": {"type": "array", "items": [{"type": "string"}, {"type": "number"}]},
+        "lines": {"type": "array", "items": {"$ref": "#/$defs/line"}, "minItems": 1, "maxItems": 2},
+        "tree": {"$ref": "#/$defs/node"},
+    },
+    "required": ["qty", "id"],
+    "$defs": {
+        "line": {
+            "type": "object",
+            "properties": {"sku": {"type": "string"}, "price": {"type": "number", "minimum": 0}},
+            "required": ["sku"],
+        },
+        "node": {
+            "type": "object",
+            "properties": {"children": {"type": "array", "items": {"$ref": "#/$defs/node"}}, "weight": {"type": "number", "exclusiveMinimum": 0}},
+        },
+    },
+}
+
+VALID = {"qty": 5, "id": None, "code": "AB", "side": "buy", "level": 2.5, "note": 7,
+         "pair": ["x", 1], "lines": [{"sku": "a", "price": 0}], "tree": {"children": [{"weight": 1}]}}
+
+INVALID = [
+    ({"qty": 5}, "missing required property 'id'"),
+    ({"id": 1}, "missing required property 'qty'"),
+    ({**VALID, "qty": True}, "/qty: must be of type integer, got boolean"),
+    ({**VALID, "qty": 0}, "/qty: must be >= 1, got 0"),
+    ({**VALID, "qty": 100}, "/qty: must be < 100, got 100"),
+    ({**VALID, "code": "A"}, "/code: length must be >= 2, got 1"),
+    ({**VALID, "code": "ABCDE"}, "/code: length must be <= 4, got 5"),
+    ({**VALID, "code": "ab"}, "/code: must match '^[A-Z]+$', got 'ab'"),
+    ({**VALID, "side": "hold"}, "/side: must be one of ['buy', 'sell'], got 'hold'"),
+    ({**VALID, "level": 1.5}, "/level: must be one of [1, 2.5, True, None], got 1.5"),
+    ({**VALID, "note": "long"}, "/note: length must be <= 3, got 4"),
+    ({**VALID, "pair": ["x", "y"]}, "/pair/1: must be of type number, got string"),
+    ({**VALID, "lines": []}, "/lines: item count must be >= 1, got 0"),
+    ({**VALID, "lines": [{"sku": "a"}, {"sku": "b", "price": -1}]}, "/lines/1/price: must be >= 0, got -1"),
+    ({**VALID, "tree": {"children": [{"children": [{"weight": 0}]}]}}, "/tree/children/0/children/0/weight: must be > 0, got 0"),
+    ([], "must be of type object, got array"),
+]
+
+@pytest.fixture
+def validate():
+    clear_validator_cache()
+    return compile_validator(parse_schema_string(json.dumps(ORDER)))
+
+def test_valid_instances(validate):
+    # 1.0 is an integer and booleans/1 are different enum members, as in JSON Schema
+    for instance in (VALID, {**VALID, "qty": 1.0, "level": True}, {**VALID, "level": 1.0}):
+        validate(instance)
+        assert jsonschema.Draft7Validator(ORDER).is_valid(instance)
+
+@pytest.mark.parametrize("instance, message", INVALID)
+def test_invalid_instances(validate, instance, message):
+    with pytest.raises(ValidationError) as excinfo:
+        validate(instance)
+    assert str(excinfo.value) == message
+    # Positional `items` arrays are draft 7 syntax
+    assert not jsonschema.Draft7Validator(ORDER).is_valid(instance)
+
+def test_error_path(validate):
+    with pytest.raises(ValidationError) as excinfo:
+        validate({**VALID, "lines": [{"sku": "a"}, {"sku": 1}]})
+    assert excinfo.value.path == ["lines", 1, "sku"]
+    assert excinfo.value.message == "must be of type string, got integer"
+    assert isinstance(excinfo.value, ValueError)
+
+def test_validators_are_cached_per_schema_hash():
+    clear_validator_cache()
+    first = compile_validator(parse_schema_string(json.dumps(ORDER)))
+    # Equal content parsed separately hits the cache
+    assert compile_validator(parse_schema_string(json.dumps(ORDER))) is first
+    changed = {**ORDER, "required": ["qty"]}
+    second = compile_validator(parse_schema_string(json.dumps(changed)))
+    assert second is not first
+    second({"qty": 1})
+
+def test_external_refs_resolve_through_registry(tmp_path):
+    (tmp_path / "common.json").write_text(json.dumps({"$defs": {"price": {"type": "number", "minimum": 0}}}))
+    (tmp_path / "item.json").write_text(json.dumps({
+        "type": "object", "properties": {"price": {"$ref": "common.json#/$defs/price"}},
+    }))
+    resolver = DocumentRegistry().load(tmp_path / "item.json")
+    validate = compile_validator(resolver.root, resolver)
+    validate({"price": 1})
+    with pytest.raises(ValidationError, match="/price: must be >= 0"):
+        validate({"price": -1})
+
+def test_unsupported_pattern():
+    schema = parse_schema_string(json.dumps({"type": "string", "pattern": "\\p{L}"}))
+    with pytest.raises(ValueError, match="not supported by Python's re module"):
+        compile_validator(schema)
+
+@pytest.mark.slow
+@pytest.mark.parametrize("schema_path", schema_files, ids=lambda p: p.parent.name)
+@given(data=st.data())
+@settings(deadline=None, max_examples=10)
+def test_accepts_generated_data(schema_path, data):
+    """Samples valid for jsonschema (see test_json_data_generator) must be valid for us."""
+    if "7_refs" in str(schema_path):
+        pytest.xfail("hypothesis-jsonschema does not support recursive references")
+    schema = parse_schema_file(schema_path)
+    sample = data.draw(JsonDataGenerator(schema).get_strategy())
+    compile_validator(schema)(sample)